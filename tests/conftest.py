@@ -0,0 +1,23 @@
+"""
+Shared test setup: make the renderer modules importable without a window.
+
+The tmx_explorer package __init__ pulls in the whole app (glfw, ...).
+When that can't be imported, bare packages are registered instead, so
+the tests only import the renderer modules they exercise. None of them
+need a GL context.
+"""
+
+import sys
+import types
+from pathlib import Path
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent / "tmx_explorer"
+
+try:
+    import tmx_explorer.renderer  # noqa: F401
+except ImportError:
+    for name, path in (("tmx_explorer", PACKAGE_DIR),
+                       ("tmx_explorer.renderer", PACKAGE_DIR / "renderer")):
+        module = types.ModuleType(name)
+        module.__path__ = [str(path)]
+        sys.modules[name] = module
@@ -0,0 +1,110 @@
+"""
+AtlasBuilder packing and Texture._pad_edges tests (no OpenGL context needed).
+
+The GL calls of the builder are replaced: GL_MAX_TEXTURE_SIZE comes from
+a stub, and "uploading" a page returns the composed PIL image, so the
+tests can look at the pixels each UV rect points to.
+"""
+
+import itertools
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from tmx_explorer.renderer import atlas
+from tmx_explorer.renderer.texture import Texture
+
+
+@pytest.fixture
+def make_builder(monkeypatch):
+    monkeypatch.setattr(atlas, "glGetIntegerv", lambda name: 4096)
+    monkeypatch.setattr(Texture, "from_pil",
+                        classmethod(lambda cls, image, add_border=True, mipmaps=False: image))
+    return atlas.AtlasBuilder
+
+
+def _tile(width, height, seed):
+    """An RGBA tile of random pixels (different for every seed)"""
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 256, (height, width, 4), dtype=np.uint8)
+    return Image.fromarray(pixels, 'RGBA')
+
+
+def _pixel_rect(page, uv):
+    """(left, top, right, bottom) of a UV rect in page pixels, image rows"""
+    u_left, v_top, u_right, v_bottom = uv
+    return (round(u_left * page.width), round((1.0 - v_top) * page.height),
+            round(u_right * page.width), round((1.0 - v_bottom) * page.height))
+
+
+def _pack(builder, tiles):
+    for key, image in tiles.items():
+        builder.add(key, image)
+    return builder.build()
+
+
+# Mixed sizes, as in a map with several tilesets
+MIXED = {gid: _tile(w, h, gid)
+         for gid, (w, h) in enumerate([(16, 16)] * 12 + [(32, 48), (8, 24), (24, 8), (16, 32)])}
+
+
+def test_uvs_point_at_the_tile_pixels_inside_the_page(make_builder):
+    regions = _pack(make_builder(), MIXED)
+
+    assert set(regions) == set(MIXED)
+    for gid, (page, uv) in regions.items():
+        u_left, v_top, u_right, v_bottom = uv
+        assert 0.0 <= u_left < u_right <= 1.0
+        assert 0.0 <= v_bottom < v_top <= 1.0
+        left, top, right, bottom = _pixel_rect(page, uv)
+        assert np.array_equal(np.asarray(page)[top:bottom, left:right],
+                              np.asarray(MIXED[gid]))
+
+
+def test_cells_do_not_overlap(make_builder):
+    regions = _pack(make_builder(), MIXED)
+
+    # Each cell with its 1px extruded border
+    cells = [(id(page), left - 1, top - 1, right + 1, bottom + 1)
+             for page, uv in regions.values()
+             for left, top, right, bottom in [_pixel_rect(page, uv)]]
+    for a, b in itertools.combinations(cells, 2):
+        if a[0] != b[0]:
+            continue
+        assert a[3] <= b[1] or b[3] <= a[1] or a[4] <= b[2] or b[4] <= a[2], (a, b)
+
+
+def test_full_pages_start_a_new_page(make_builder):
+    # 14x14 tiles are 16x16 extruded: 2x2 of them fill a 32x32 page
+    tiles = {gid: _tile(14, 14, gid) for gid in range(10)}
+    regions = _pack(make_builder(max_size=32), tiles)
+
+    pages = {id(page): page for page, _ in regions.values()}
+    assert len(regions) == 10
+    assert len(pages) == 3
+    assert all(page.width <= 32 and page.height <= 32 for page in pages.values())
+
+
+def test_images_larger_than_a_page_are_left_out(make_builder):
+    tiles = {1: _tile(14, 14, 1), 2: _tile(40, 8, 2)}
+    regions = _pack(make_builder(max_size=32), tiles)
+
+    assert set(regions) == {1}
+
+
+def test_packing_is_deterministic(make_builder):
+    first = _pack(make_builder(), MIXED)
+    second = _pack(make_builder(), MIXED)
+
+    assert {gid: uv for gid, (_, uv) in first.items()} == \
+           {gid: uv for gid, (_, uv) in second.items()}
+
+
+@pytest.mark.parametrize("height, width", [(1, 1), (1, 5), (4, 1), (16, 16), (7, 13)])
+def test_pad_edges_matches_np_pad(height, width):
+    pixels = np.random.default_rng(height * 100 + width).integers(
+        0, 256, (height, width, 4), dtype=np.uint8)
+
+    expected = np.pad(pixels, ((1, 1), (1, 1), (0, 0)), mode='edge')
+    assert np.array_equal(Texture._pad_edges(pixels), expected)
@@ -0,0 +1,80 @@
+"""
+Debug line/rectangle vertex packing tests (no OpenGL context needed).
+
+draw_lines and draw_rects only stage vertices (flush_simple() uploads
+them), so they run on a renderer built without __init__. The compiled
+kernels (_kernels.pack_lines / pack_rects) must produce the same bytes
+as the numpy code they replace.
+"""
+
+import numpy as np
+import pytest
+
+from tmx_explorer.renderer import _kernels, opengl_renderer
+from tmx_explorer.renderer.opengl_renderer import OpenGLRenderer, SIMPLE_VERTEX
+
+needs_numba = pytest.mark.skipif(_kernels.njit is None, reason="Numba not installed")
+
+# Halfway values (rounded to even), and far outside the int16 range
+COORDS = np.array([[0.5, 1.5, 2.5, -0.5],
+                   [-40000.0, 40000.0, 1e9, -1e9],
+                   [10.2, 20.7, -3.49, 32767.6],
+                   [-32768.6, 5.0, 100.0, 0.0]], dtype=np.float32)
+
+
+def _staging_renderer():
+    """Just the debug geometry staging state of an OpenGLRenderer"""
+    renderer = OpenGLRenderer.__new__(OpenGLRenderer)
+    renderer._simple_staging = {kind: np.empty(4, dtype=SIMPLE_VERTEX)
+                                for kind in ('tris', 'lines')}
+    renderer._simple_used = {'tris': 0, 'lines': 0}
+    renderer._simple_staging_ptrs = {}
+    renderer._color_cache = {}
+    return renderer
+
+
+def _staged(renderer, kind):
+    return renderer._simple_staging[kind][:renderer._simple_used[kind]].tobytes()
+
+
+def _both_paths(monkeypatch, draw):
+    """Bytes staged by `draw` with the compiled kernels, then without"""
+    compiled = _staging_renderer()
+    draw(compiled)
+    monkeypatch.setattr(opengl_renderer, "pack_lines", None)
+    monkeypatch.setattr(opengl_renderer, "pack_rects", None)
+    plain = _staging_renderer()
+    draw(plain)
+    return compiled, plain
+
+
+@needs_numba
+def test_pack_lines_matches_numpy_path(monkeypatch):
+    def draw(renderer):
+        renderer.draw_lines(COORDS, (10, 20, 30))
+        renderer.draw_lines(COORDS[:1].tolist(), (1, 2, 3))
+
+    compiled, plain = _both_paths(monkeypatch, draw)
+    assert _staged(compiled, 'lines') == _staged(plain, 'lines')
+
+
+@needs_numba
+def test_pack_rects_matches_numpy_path(monkeypatch):
+    colors = np.array([[255, 0, 0, 128], [0, 255, 0, 64],
+                       [0, 0, 255, 255], [9, 8, 7, 6]], dtype=np.uint8)
+
+    def draw(renderer):
+        renderer.draw_rects(COORDS, colors)           # One color per rect
+        renderer.draw_rects(COORDS, (1, 2, 3, 4))     # One for all
+
+    compiled, plain = _both_paths(monkeypatch, draw)
+    assert _staged(compiled, 'tris') == _staged(plain, 'tris')
+
+
+def test_positions_are_rounded_and_clamped_to_int16(monkeypatch):
+    monkeypatch.setattr(opengl_renderer, "pack_lines", None)
+    renderer = _staging_renderer()
+    renderer.draw_lines(COORDS[1:2], (0, 0, 0))
+
+    staged = renderer._simple_staging['lines'][:2]
+    assert staged['pos'].tolist() == [[-32768, 32767], [32767, -32768]]
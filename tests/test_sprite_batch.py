@@ -0,0 +1,78 @@
+"""
+SpriteBatch CPU-side tests (no OpenGL context needed).
+
+The batch's GPU buffers are replaced by plain numpy memory, so only the
+staging side is exercised: what add_* and set_color write.
+"""
+
+import numpy as np
+import pytest
+
+from tmx_explorer.renderer import sprite_batch
+
+SpriteBatch = sprite_batch.SpriteBatch
+
+
+def _cpu_buffers(self):
+    """Stand-in for _setup_buffers: one batch of staging memory, no GL"""
+    self.persistent = False
+    self._offsets = self._stream_offsets(1)
+    self._memory = np.zeros(self.max_sprites * self.sprite_bytes, dtype=np.uint8)
+    self._bind_views(self._memory, self._offsets, 0)
+
+
+@pytest.fixture
+def make_batch(monkeypatch):
+    monkeypatch.setattr(SpriteBatch, "_setup_buffers", _cpu_buffers)
+    return lambda **kwargs: SpriteBatch(max_sprites=16, **kwargs)
+
+
+# In range, above 1.0, negative, and halfway between two bytes (0.5 / 255)
+TINTS = [(1.0, 1.0, 1.0, 1.0),
+         (1.2, 1.0, 1.0, 1.0),
+         (-0.3, 0.5, 2.0, 0.25),
+         (0.5 / 255, 1.5 / 255, 254.5 / 255, -1e9)]
+
+
+def _add_each(batch, uv_rect=None):
+    for tint in TINTS:
+        batch.add_sprite(0, 0, 8, 8, color=tint, uv_rect=uv_rect)
+    return batch.colors[:batch.sprite_count].tolist()
+
+
+def test_tints_are_clamped_the_same_by_every_entry_point(make_batch, monkeypatch):
+    expected = [[255, 255, 255, 255],
+                [255, 255, 255, 255],
+                [0, 128, 255, 64],
+                [1, 2, 255, 0]]
+
+    # add_sprite: compiled writer (if Numba is installed) ...
+    assert _add_each(make_batch()) == expected
+    # ... its Python body, through the color cache ...
+    monkeypatch.setattr(sprite_batch, "write_sprite", None)
+    assert _add_each(make_batch()) == expected
+    # ... and the Python body taken for explicit UV rects
+    assert _add_each(make_batch(), uv_rect=(0.0, 1.0, 1.0, 0.0)) == expected
+
+    # Bulk paths, one tint per sprite or one for all
+    batch = make_batch()
+    zeros = np.zeros(len(TINTS), dtype=np.float32)
+    batch.add_sprites_bulk(zeros, zeros, zeros + 8, zeros + 8, zeros,
+                           colors=np.array(TINTS))
+    assert batch.colors[:batch.sprite_count].tolist() == expected
+
+    batch = make_batch()
+    for tint in TINTS:
+        batch.add_quads(np.zeros((1, 4), dtype=np.float32),
+                        np.zeros((1, 4), dtype=np.float32), color=tint)
+    assert batch.colors[:batch.sprite_count].tolist() == expected
+
+
+def test_set_color_clamps_the_batch_tint(make_batch, monkeypatch):
+    for writer in (sprite_batch.write_sprite, None):
+        monkeypatch.setattr(sprite_batch, "write_sprite", writer)
+        batch = make_batch()
+        batch.set_color((1.5, 1.0, -0.5, 0.5))
+        batch.add_sprite(0, 0, 8, 8)
+        batch.add_sprite(0, 0, 8, 8, uv_rect=(0.0, 1.0, 1.0, 0.0))
+        assert batch.colors[:2].tolist() == [[255, 255, 0, 128]] * 2
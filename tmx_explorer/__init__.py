@@ -12,6 +12,7 @@ from .map.tileset_renderer import TilesetRenderer
 from .renderer.opengl_renderer import OpenGLRenderer
 from .renderer.texture import Texture
 from .renderer.sprite_batch import SpriteBatch
+from .renderer.instanced_batch import InstancedBatch
 from .entities import (
     AnimatedSprite, Direction, AnimationState,
     Character, EntityManager
@@ -26,6 +27,7 @@ __all__ = [
     "OpenGLRenderer",
     "Texture",
     "SpriteBatch",
+    "InstancedBatch",
     "AnimatedSprite",
     "Direction",
     "AnimationState",
@@ -3,6 +3,7 @@ TMX Map Explorer - Main Application (GLFW Version)
 """
 
 import glfw
+import numpy as np
 from OpenGL.GL import *
 import time
 from pathlib import Path
@@ -19,6 +20,9 @@ from .gamepad import GamepadManager
 
 DARK_GRAY = (64, 64, 64)
 
+# Map tiles are uploaded to the GPU once per chunk of CHUNK_TILES x CHUNK_TILES
+CHUNK_TILES = 16
+
 
 class TMXExplorer:
     """Main TMX map explorer application - GLFW version"""
@@ -86,7 +90,9 @@ class TMXExplorer:
             max_z=self.map_3d.H
         )
         
-        print(f"\nTotal textures cached: {len(self.renderer.texture_cache)}")
+        tiles = self.tileset_renderer
+        print(f"\nTile textures: {tiles.atlas_pages} atlas page(s), "
+              f"{tiles.oversize_textures} oversize")
 
         # Initialize camera
         self.camera = Camera(self.screen_width, self.screen_height)
@@ -107,6 +113,9 @@ class TMXExplorer:
         self.show_collision_debug = False
         self.layer_visibility = [True] * self.map_3d.N
 
+        # View state the static tile chunks were built for
+        self._static_view_key = None
+
         # Mouse panning
         self.panning = False
         self.pan_start_pos = (0, 0)
@@ -290,10 +299,8 @@ class TMXExplorer:
         else:
             player.move(dx, dy, dz)
 
-    def collect_visible_tiles_ordered(self) -> Dict:
-        """Collect visible tiles with culling and depth ordering"""
-        tile_batches = defaultdict(list)
-        
+    def _visible_tile_range(self):
+        """Visible (start_x, end_x, start_y, end_y) tile range with margin"""
         tile_w = self.map_3d.tile_width
         tile_h = self.map_3d.tile_height
         margin_tiles = 3
@@ -307,45 +314,101 @@ class TMXExplorer:
         end_x = min(self.map_3d.W, int(screen_right / tile_w) + 1)
         start_y = max(0, int(screen_top / tile_h))
         end_y = min(self.map_3d.D, int(screen_bottom / tile_h) + 1)
+        return start_x, end_x, start_y, end_y
+
+    def collect_visible_tiles_ordered(self) -> Dict:
+        """Collect visible tiles with culling and depth ordering"""
+        return self._collect_tiles(*self._visible_tile_range())
+
+    def _collect_tiles(self, start_x: int, end_x: int, start_y: int, end_y: int) -> Dict:
+        """Collect the tiles of a map rectangle, grouped by texture, with depth"""
+        tile_batches = defaultdict(list)
 
         if start_x >= end_x or start_y >= end_y:
             return tile_batches
 
+        map_3d = self.map_3d
+        tile_w = map_3d.tile_width
+        tile_h = map_3d.tile_height
         base_offset = -1000.0
+        mapa = map_3d.mapa
+
+        # Everything that doesn't depend on x/y, looked up once instead of
+        # once per tile: for each level, its offset and the visible layers
+        # that belong to it
+        levels = []
+        for z in range(0, self.current_z + 1):
+            level_value = map_3d.get_level_value(z)
+            layers = [n for n in range(map_3d.N)
+                      if self.layer_visibility[n] and map_3d.layer_levels[n] == level_value]
+            if layers:
+                levels.append((z, z * self.level_height_offset, layers))
+
+        # tile_id -> (texture, width, height, uv) or None, resolved once
+        get_texture = self.tileset_renderer.get_tile_texture
+        get_surface = self.tileset_renderer.get_tile_surface
+        get_uv = self.tileset_renderer.get_tile_uv
+        tile_info = {}
 
         for y in range(start_y, end_y):
             for x in range(start_x, end_x):
-                for z in range(0, self.current_z + 1):
-                    level_y_offset = z * self.level_height_offset
-
-                    for n in range(self.map_3d.N):
-                        if not self.layer_visibility[n]:
-                            continue
-                        if self.map_3d.layer_levels[n] != self.map_3d.get_level_value(z):
-                            continue
-
-                        tile_id = self.map_3d.mapa[z, y, x, n]
+                world_x = x * tile_w
+                for z, level_y_offset, layers in levels:
+                    for n in layers:
+                        tile_id = mapa[z, y, x, n]
                         if tile_id == 0:
                             continue
 
-                        texture = self.tileset_renderer.get_tile_texture(tile_id)
-                        surface = self.tileset_renderer.get_tile_surface(tile_id)
-                        if not texture or not surface:
+                        info = tile_info.get(tile_id, False)
+                        if info is False:
+                            texture = get_texture(tile_id)
+                            surface = get_surface(tile_id)
+                            uv = get_uv(tile_id)
+                            if texture and surface and uv:
+                                info = (texture, surface[0], surface[1], uv)
+                            else:
+                                info = None
+                            tile_info[tile_id] = info
+                        if info is None:
                             continue
 
-                        tile_height = surface[1]
-                        world_x = x * tile_w
+                        texture, width, tile_height, uv = info
                         world_y = (y + 1) * tile_h - tile_height - level_y_offset
 
                         depth = base_offset + y + z + (n * 0.1)
                         tile_batches[texture].append((
                             world_x, world_y,
-                            surface[0], surface[1],
-                            depth
+                            width, tile_height,
+                            depth,
+                            *uv
                         ))
 
         return tile_batches
 
+    def draw_static_tiles(self):
+        """Draw the visible map chunks, uploading each one the first time it is seen"""
+        view_key = (self.current_z, self.level_height_offset, tuple(self.layer_visibility))
+        if view_key != self._static_view_key:
+            self.renderer.clear_static_tiles()
+            self._static_view_key = view_key
+
+        start_x, end_x, start_y, end_y = self._visible_tile_range()
+        if start_x >= end_x or start_y >= end_y:
+            return
+
+        keys = []
+        for cy in range(start_y // CHUNK_TILES, (end_y - 1) // CHUNK_TILES + 1):
+            for cx in range(start_x // CHUNK_TILES, (end_x - 1) // CHUNK_TILES + 1):
+                key = (cx, cy)
+                if not self.renderer.has_static_tiles(key):
+                    x0, y0 = cx * CHUNK_TILES, cy * CHUNK_TILES
+                    self.renderer.upload_static_tiles(key, self._collect_tiles(
+                        x0, min(x0 + CHUNK_TILES, self.map_3d.W),
+                        y0, min(y0 + CHUNK_TILES, self.map_3d.D)))
+                keys.append(key)
+
+        self.renderer.draw_static_tiles(keys)
+
     def draw_grid(self):
         """Draw tile grid overlay"""
         if not self.show_grid:
@@ -386,8 +449,23 @@ class TMXExplorer:
         end_x = min(collision.W, int((self.camera.x + self.screen_width / self.camera.zoom) / tile_w) + 2)
         end_y = min(collision.D, int((self.camera.y + self.screen_height / self.camera.zoom) / tile_h) + 2)
         
+        if start_x >= end_x or start_y >= end_y:
+            return
+        
         player_z = int(self.entity_manager.player.z) if self.entity_manager.player else 0
         
+        # Screen rectangles of the visible tiles, one row per tile
+        zoom = self.camera.zoom
+        ys, xs = np.mgrid[start_y:end_y, start_x:end_x]
+        rects = np.empty(xs.shape + (4,), dtype=np.float32)
+        rects[..., 0] = (xs * tile_w - self.camera.x) * zoom
+        rects[..., 2] = tile_w * zoom
+        rects[..., 3] = tile_h * zoom
+        
+        # Todos los niveles en una sola llamada, con un color por rectángulo
+        level_rects = []
+        level_colors = []
+        
         # Dibujar cada nivel Z por separado con su offset
         for z in range(self.map_3d.H):
             level_value = self.map_3d.get_level_value(z)
@@ -402,26 +480,20 @@ class TMXExplorer:
             else:
                 alpha = 30
             
-            solid_rects = []
-            empty_rects = []
+            rects[..., 1] = (ys * tile_h - level_y_offset - self.camera.y) * zoom
+            solid = collision.data[z, start_y:end_y, start_x:end_x] != 0
             
-            for y in range(start_y, end_y):
-                for x in range(start_x, end_x):
-                    screen_x = (x * tile_w - self.camera.x) * self.camera.zoom
-                    screen_y = (y * tile_h - level_y_offset - self.camera.y) * self.camera.zoom
-                    screen_w = tile_w * self.camera.zoom
-                    screen_h = tile_h * self.camera.zoom
-                    
-                    if collision.is_solid(x, y, z):
-                        solid_rects.append((screen_x, screen_y, screen_w, screen_h))
-                    else:
-                        empty_rects.append((screen_x, screen_y, screen_w, screen_h))
-            
-            if empty_rects:
-                self.renderer.draw_rects(empty_rects, (0, 200, 0, alpha))
-            
-            if solid_rects:
-                self.renderer.draw_rects(solid_rects, (200, 0, 0, alpha))
+            # Empty (green) first, then solid (red), as before
+            for mask, color in ((~solid, (0, 200, 0, alpha)), (solid, (200, 0, 0, alpha))):
+                block = rects[mask]
+                if len(block):
+                    level_rects.append(block)
+                    level_colors.append(np.broadcast_to(
+                        self.renderer.color_row(color), (len(block), 4)))
+        
+        if level_rects:
+            self.renderer.draw_rects(np.concatenate(level_rects),
+                                     np.concatenate(level_colors))
 
     def draw_ui(self):
         """Draw UI info"""
@@ -432,7 +504,8 @@ class TMXExplorer:
         lines = [
             f"FPS: {int(self.current_fps)} | Zoom: {self.camera.zoom:.2f}x",
             f"View Height: {self.current_z}/{self.map_3d.H-1} (level={level_value})",
-            f"Textures: {len(self.renderer.texture_cache)}",
+            f"Textures: {self.tileset_renderer.atlas_pages} atlas + "
+            f"{self.tileset_renderer.oversize_textures} oversize",
         ]
         
         # Mostrar info del jugador si existe
@@ -471,15 +544,15 @@ class TMXExplorer:
         self.renderer.set_camera(self.camera.x, self.camera.y, self.camera.zoom)
 
         t1 = time.perf_counter()
-        tile_batches = self.collect_visible_tiles_ordered()
+        self.draw_static_tiles()
         t2 = time.perf_counter()
 
-        self.renderer.draw_batched_tiles(tile_batches)
         self._draw_characters()
         t3 = time.perf_counter()
 
         self.draw_collision_debug()
         self.draw_grid()
+        self.renderer.flush_simple()
         t4 = time.perf_counter()
 
         self.draw_ui()
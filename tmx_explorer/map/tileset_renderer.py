@@ -77,6 +77,8 @@ from typing import Dict, Optional, Tuple, TYPE_CHECKING
 
 from tmx_manager import TiledMap
 
+from ..renderer.atlas import AtlasBuilder, UVRect, texture_uv
+
 # TYPE_CHECKING block: imports only used for type hints, not at runtime.
 # This avoids circular import issues while still getting type checking benefits.
 if TYPE_CHECKING:
@@ -174,11 +176,25 @@ class TilesetRenderer:
         # tile_texture_cache: GID → Texture object
         # The actual GPU texture for each tile, ready for rendering.
         # This is the primary lookup used during rendering.
+        # Usually an atlas page shared by many GIDs (see _build_atlas).
         self.tile_texture_cache: Dict[int, 'Texture'] = {}
         
+        # tile_uv_cache: GID → (u_left, v_top, u_right, v_bottom)
+        # Where the tile lives inside its texture.
+        self.tile_uv_cache: Dict[int, UVRect] = {}
+        
+        # Tile images waiting to be packed, filled while loading tilesets
+        self._pending_tiles: Dict[int, Image.Image] = {}
+        
+        # GPU textures made by _build_atlas: atlas pages, and tiles too big
+        # for a page that got their own (for the debug overlay)
+        self.atlas_pages = 0
+        self.oversize_textures = 0
+        
         # Load all tilesets immediately
         # By the time __init__ returns, all tiles are in GPU memory
         self._load_tilesets()
+        self._build_atlas()
 
     # =========================================================================
     # TILESET LOADING
@@ -330,10 +346,8 @@ class TilesetRenderer:
                     # Cache tile dimensions (original size, no border)
                     self.tile_size_cache[gid] = (tile_img.width, tile_img.height)
                     
-                    # Create GPU texture and cache it
-                    self.tile_texture_cache[gid] = self.gl_renderer.preload_texture(
-                        gid, tile_img
-                    )
+                    # Queue for the atlas (uploaded by _build_atlas)
+                    self._pending_tiles[gid] = tile_img
                     
                 except Exception as e:
                     print(f"  Warning: {e}")
@@ -449,16 +463,52 @@ class TilesetRenderer:
             # Store original tile dimensions (without border)
             self.tile_size_cache[gid] = (tw, th)
             
-            # Create GPU texture and cache it
-            # preload_texture() handles border addition via Texture.from_pil()
-            self.tile_texture_cache[gid] = self.gl_renderer.preload_texture(
-                gid, tile_img
-            )
+            # Queue for the atlas (uploaded by _build_atlas, which adds
+            # the border like Texture.from_pil() does)
+            self._pending_tiles[gid] = tile_img
             
             tiles_loaded += 1
 
         print(f"  Pre-loaded {tiles_loaded} tiles")
 
+    def _build_atlas(self):
+        """
+        Pack every loaded tile into atlas textures and upload them.
+        
+        =======================================================================
+        WHY?
+        =======================================================================
+        
+        Tiles are batched by texture: one texture per GID meant one draw
+        call per distinct tile on screen. With an atlas all the tiles of
+        the map share one texture (a few pages for very large tilesets),
+        so the whole map is drawn with one call per page. Each tile's
+        place in the atlas is kept in tile_uv_cache.
+        
+        A tile too big for an atlas page gets its own texture through
+        gl_renderer.preload_texture(), as before.
+        
+        =======================================================================
+        """
+        builder = AtlasBuilder()
+        for gid, tile_img in self._pending_tiles.items():
+            builder.add(gid, tile_img)
+        regions = builder.build()
+        
+        for gid, tile_img in self._pending_tiles.items():
+            if gid in regions:
+                texture, uv = regions[gid]
+            else:
+                texture = self.gl_renderer.preload_texture(gid, tile_img)
+                uv = texture_uv(tile_img.width, tile_img.height)
+            self.tile_texture_cache[gid] = texture
+            self.tile_uv_cache[gid] = uv
+        
+        self.atlas_pages = len({id(texture) for texture, _ in regions.values()})
+        self.oversize_textures = len(self._pending_tiles) - len(regions)
+        print(f"  Packed {len(regions)} tiles into {self.atlas_pages} atlas page(s)")
+        self._pending_tiles.clear()
+
     # =========================================================================
     # PUBLIC LOOKUP METHODS
     # =========================================================================
@@ -500,6 +550,13 @@ class TilesetRenderer:
         # Lookup in cache (returns None if not found)
         return self.tile_texture_cache.get(gid)
 
+    def get_tile_uv(self, gid: int) -> Optional[UVRect]:
+        """
+        Get the UV rect (u_left, v_top, u_right, v_bottom) of a tile GID
+        inside the texture returned by get_tile_texture().
+        """
+        return self.tile_uv_cache.get(gid)
+
     def get_tile_surface(self, gid: int) -> Optional[Tuple[int, int]]:
         """
         Get tile size (width, height) for GID.
@@ -1,7 +1,12 @@
 """OpenGL rendering components"""
 
 from .opengl_renderer import OpenGLRenderer
-from .texture import Texture
+from .texture import Texture, TextureArray
 from .sprite_batch import SpriteBatch
+from .instanced_batch import InstancedBatch
+from .arena import ArrayArena
+from .gl_state import GLState
+from .atlas import AtlasBuilder
+from .glyph_atlas import GlyphAtlas
 
-__all__ = ["OpenGLRenderer", "Texture", "SpriteBatch"]
+__all__ = ["OpenGLRenderer", "Texture", "TextureArray", "SpriteBatch", "InstancedBatch", "ArrayArena", "GLState", "AtlasBuilder", "GlyphAtlas"]
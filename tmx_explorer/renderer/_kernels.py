@@ -0,0 +1,201 @@
+"""
+Compiled vertex kernels (optional, needs Numba)
+
+=============================================================================
+WHY?
+=============================================================================
+
+Filling sprite records (and expanding debug lines/rectangles into
+their vertices) is plain numeric work: a few adds and divides per sprite.
+In the interpreter that costs a bytecode dispatch per operation; numpy
+removes most of it but still makes a temporary array per expression.
+Numba compiles the loop to machine code that writes each value once,
+straight into the batch's buffer, and `prange` spreads the sprites
+over all CPU cores.
+
+Numba is optional. Without it the names below are None and callers use
+their numpy code path instead.
+
+    pip install numba
+=============================================================================
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+
+    @njit(cache=True)
+    def _unorm8(value):
+        """Clamp a 0.0-1.0 color channel and round it to 0-255 (see _rgba8)"""
+        return int(min(max(value, 0.0), 1.0) * 255.0 + 0.5)
+
+    @njit(cache=True, fastmath=True, boundscheck=False)
+    def write_sprite(memory, stride, row, x, y, w, h, border,
+                     r, g, b, a, depth, layer):
+        """
+        Write ONE sprite record (row `row` of every SpriteBatch stream).
+
+        Same output as the Python body of SpriteBatch.add_sprite, which
+        calls this when Numba is available: UV rect skipping the border,
+        V flipped (v_max at the top).
+
+        Takes the batch's whole byte buffer instead of one array per
+        stream. Every array argument costs the dispatcher a type check
+        and an unboxing on EACH call - for one sprite that is most of
+        the work - so the streams are sliced out here instead, from the
+        stream-major layout of SpriteBatch._stream_offsets:
+
+            [ rects: 16 B/row | uvs: 8 | colors: 4 | depths: 4 | layers: 1 ]
+            (each stream `stride` rows long; keep in sync with STREAMS)
+
+        Parameters:
+        -----------
+        memory : uint8 array (SpriteBatch._memory)
+        stride : int
+            Rows per stream in `memory` (all ring segments)
+        row : int
+            Row to write (segment start + sprite index)
+        x, y, w, h, border, r, g, b, a, depth : float
+            (r, g, b, a in 0.0-1.0, clamped and stored as 0-255)
+        layer : int
+            TextureArray layer
+        """
+        rects = memory[:stride * 16].view(np.float32)
+        uvs = memory[stride * 16:stride * 24].view(np.uint16)
+        colors = memory[stride * 24:stride * 28]
+        depths = memory[stride * 28:stride * 32].view(np.float32)
+        layers = memory[stride * 32:stride * 33]
+
+        total_w = w + border * 2
+        total_h = h + border * 2
+        k = row * 4
+        rects[k] = x
+        rects[k + 1] = y
+        rects[k + 2] = w
+        rects[k + 3] = h
+        uvs[k] = int(border / total_w * 65535.0 + 0.5)
+        uvs[k + 1] = int((border + h) / total_h * 65535.0 + 0.5)
+        uvs[k + 2] = int((border + w) / total_w * 65535.0 + 0.5)
+        uvs[k + 3] = int(border / total_h * 65535.0 + 0.5)
+        colors[k] = _unorm8(r)
+        colors[k + 1] = _unorm8(g)
+        colors[k + 2] = _unorm8(b)
+        colors[k + 3] = _unorm8(a)
+        depths[row] = depth
+        layers[row] = layer
+
+    @njit(parallel=True, cache=True, fastmath=True, boundscheck=False)
+    def fill_sprites(tiles, border, tint, rects, uvs, colors, depths):
+        """
+        Write sprite records for rows of x, y, w, h, depth.
+
+        Same output as SpriteBatch.add_sprite for each row: UV rects
+        skipping the border, V flipped (v_max at the top).
+
+        Compiled like write_sprite (fastmath, no bounds checks), so LLVM
+        may merge each row's four rect/UV/color stores into vector
+        stores. Past that the loop is bound by memory traffic (about 20
+        bytes read and 33 written per sprite), not arithmetic.
+
+        Parameters:
+        -----------
+        tiles : (N, 5) float32 array
+        border : float
+        tint : (1, 4) or (N, 4) uint8 array (one tint, or one per sprite)
+        rects : (N, 4) float32 array to fill (batch streams)
+        uvs : (N, 4) uint16 array to fill
+        colors : (N, 4) uint8 array to fill
+        depths : (N,) float32 array to fill
+        """
+        step = 0 if tint.shape[0] == 1 else 1   # Same tint row, or row i
+        for i in prange(tiles.shape[0]):
+            w = tiles[i, 2]
+            h = tiles[i, 3]
+            total_w = w + border * 2
+            total_h = h + border * 2
+            c = i * step
+
+            rects[i, 0] = tiles[i, 0]
+            rects[i, 1] = tiles[i, 1]
+            rects[i, 2] = w
+            rects[i, 3] = h
+            uvs[i, 0] = int(border / total_w * 65535.0 + 0.5)
+            uvs[i, 1] = int((border + h) / total_h * 65535.0 + 0.5)
+            uvs[i, 2] = int((border + w) / total_w * 65535.0 + 0.5)
+            uvs[i, 3] = int(border / total_h * 65535.0 + 0.5)
+            for k in range(4):
+                colors[i, k] = tint[c, k]
+            depths[i] = tiles[i, 4]
+
+    @njit(cache=True)
+    def _pixel(value):
+        """Round to a whole pixel and clamp to int16 (see draw_lines)"""
+        return min(max(np.rint(value), -32768.0), 32767.0)
+
+    @njit(cache=True)
+    def pack_lines(lines, colors, pos, col):
+        """
+        Write debug line vertices: two per (x1, y1, x2, y2) row.
+
+        Same output as the numpy path of OpenGLRenderer.draw_lines.
+
+        Parameters:
+        -----------
+        lines : (N, 4) float32 array
+        colors : (1, 4) or (N, 4) uint8 array (one color, or one per line)
+        pos : (2N, 4) int16 view of the vertices (x, y in columns 0-1)
+        col : (2N, 8) uint8 view of the vertices (RGBA in columns 4-7)
+        """
+        shared = colors.shape[0] == 1
+        for i in range(lines.shape[0]):
+            c = 0 if shared else i
+            for k in range(2):
+                v = 2 * i + k
+                pos[v, 0] = _pixel(lines[i, 2 * k])
+                pos[v, 1] = _pixel(lines[i, 2 * k + 1])
+                for j in range(4):
+                    col[v, 4 + j] = colors[c, j]
+
+    @njit(cache=True)
+    def pack_rects(rects, colors, pos, col):
+        """
+        Write debug rectangle vertices: two triangles per (x, y, w, h) row.
+
+        Same output as the numpy path of OpenGLRenderer.draw_rects:
+        top-left, top-right, bottom-right, then top-left, bottom-right,
+        bottom-left.
+
+        Parameters:
+        -----------
+        rects : (N, 4) float32 array
+        colors : (1, 4) or (N, 4) uint8 array (one color, or one per rect)
+        pos : (6N, 4) int16 view of the vertices (x, y in columns 0-1)
+        col : (6N, 8) uint8 view of the vertices (RGBA in columns 4-7)
+        """
+        shared = colors.shape[0] == 1
+        for i in range(rects.shape[0]):
+            c = 0 if shared else i
+            left = _pixel(rects[i, 0])
+            top = _pixel(rects[i, 1])
+            right = _pixel(rects[i, 0] + rects[i, 2])
+            bottom = _pixel(rects[i, 1] + rects[i, 3])
+            xs = (left, right, right, left, right, left)
+            ys = (top, top, bottom, top, bottom, bottom)
+            for k in range(6):
+                v = 6 * i + k
+                pos[v, 0] = xs[k]
+                pos[v, 1] = ys[k]
+                for j in range(4):
+                    col[v, 4 + j] = colors[c, j]
+
+else:
+    write_sprite = None
+    fill_sprites = None
+    pack_lines = None
+    pack_rects = None
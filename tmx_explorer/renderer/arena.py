@@ -0,0 +1,89 @@
+"""
+Reusable staging arrays for sprite batches (GLFW version)
+
+=============================================================================
+WHY A POOL?
+=============================================================================
+
+A SpriteBatch without a persistently mapped ring keeps its sprite
+streams in CPU-side staging memory, uploaded on every flush. That memory
+is replaced whenever the batch grows (auto_grow doubles it), and a batch
+that is thrown away and rebuilt at the same size needs the same amount
+again. Getting each of those blocks fresh from the allocator, in varying
+sizes, churns and fragments memory.
+
+The batches share one pool (sprite_batch._STAGING): a batch that grows
+or is deleted hands its old block back, and the next batch of that size
+picks it up instead of allocating.
+
+=============================================================================
+HOW IT WORKS
+=============================================================================
+
+Arrays are kept in buckets by size, rounded up to the next power of two:
+
+    acquire(300)  -> takes a 512-element array from bucket 512
+                     (allocates one if the bucket is empty)
+    release(arr)  -> puts it back in bucket 512
+
+Rounding means a caller asking for 300 one frame and 400 the next still
+reuses the same array, and lookup is a single dict access.
+
+=============================================================================
+"""
+
+import numpy as np
+from typing import Dict, List
+
+
+class ArrayArena:
+    """
+    Free-list pool of flat numpy arrays, bucketed by power-of-two size.
+
+    ==========================================================================
+    USAGE PATTERN
+    ==========================================================================
+
+    ```python
+    arena = ArrayArena(np.uint8)
+
+    memory = arena.acquire(max_sprites * sprite_bytes)
+    ... view it as the batch's streams, fill and upload them every flush ...
+    arena.release(memory)     # on grow/delete: reused by the next acquire
+    ```
+
+    Don't keep using an array after releasing it.
+    ==========================================================================
+    """
+
+    def __init__(self, dtype=np.float32):
+        """
+        Parameters:
+        -----------
+        dtype : numpy dtype
+            Element type of every array handed out (uint8 for
+            SpriteBatch's raw stream bytes)
+        """
+        self.dtype = dtype
+        self._free: Dict[int, List[np.ndarray]] = {}
+
+    @staticmethod
+    def _bucket(count: int) -> int:
+        """Smallest power of two >= count"""
+        return 1 << max(0, count - 1).bit_length()
+
+    def acquire(self, count: int) -> np.ndarray:
+        """
+        Get a flat array of exactly `count` elements (contents undefined).
+
+        Returns a view into a pooled array of bucket size.
+        """
+        bucket = self._bucket(count)
+        free = self._free.get(bucket)
+        array = free.pop() if free else np.empty(bucket, dtype=self.dtype)
+        return array[:count]
+
+    def release(self, array: np.ndarray):
+        """Return an array obtained from acquire() (or any view of it)"""
+        owner = array if array.base is None else array.base
+        self._free.setdefault(owner.size, []).append(owner)
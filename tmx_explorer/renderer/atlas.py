@@ -0,0 +1,176 @@
+"""
+Texture atlas packing (GLFW version - uses PIL)
+
+=============================================================================
+WHY AN ATLAS?
+=============================================================================
+
+Every tile GID used to get its own small GL texture. Batching groups tiles
+by texture, so a map using 200 different tiles needs 200 texture binds and
+200 draw calls per frame, no matter how well the rest is batched.
+
+An atlas packs many tile images into ONE big texture. Each tile then only
+needs to know WHERE in the atlas it lives - a UV rectangle - and all of
+them can be drawn together:
+
+    +-------+---+---+---+--+
+    | tall  | a | b | c |  |      tiles sorted by height,
+    | tile  +---+---+---+--+      placed left to right in rows ("shelves"),
+    |       | d | e |          <- a new shelf starts when a row is full
+    +---+---+---+---+
+    | f | g | h |
+    +---+---+---+
+
+=============================================================================
+SHELF PACKING
+=============================================================================
+
+1. Sort tiles by height, tallest first (ties by width, then insertion
+   order - so the same tilesets always give the same atlas)
+2. Place them left to right; a tile that doesn't fit the row width starts
+   a new row below, as tall as its first tile
+3. When the rows reach the maximum texture size, start a new page
+
+Tilesets are mostly same-sized tiles, for which this wastes almost nothing.
+
+Each tile is extruded by 1 pixel before packing (Texture.extrude_border),
+exactly like a standalone tile texture, so neighbours never bleed into
+each other.
+
+=============================================================================
+"""
+
+import math
+from typing import Dict, Hashable, List, Tuple
+from OpenGL.GL import GL_MAX_TEXTURE_SIZE, glGetIntegerv
+from PIL import Image
+from .texture import Texture
+
+# (u_left, v_top, u_right, v_bottom) of a tile inside its texture
+UVRect = Tuple[float, float, float, float]
+
+
+def texture_uv(width: int, height: int, border: int = 1) -> UVRect:
+    """
+    UV rectangle of a whole standalone texture, skipping its border.
+
+    Textures are flipped for OpenGL (see Texture.from_pil), so the top of
+    the image is at the HIGH v.
+    """
+    total_w = width + border * 2
+    total_h = height + border * 2
+    return (border / total_w, 1.0 - border / total_h,
+            1.0 - border / total_w, border / total_h)
+
+
+class AtlasBuilder:
+    """
+    Collects images, then packs them into as few atlas textures as possible.
+
+    ==========================================================================
+    USAGE PATTERN
+    ==========================================================================
+
+    ```python
+    builder = AtlasBuilder(max_size=4096)
+    for gid, image in tiles:
+        builder.add(gid, image)
+
+    regions = builder.build()          # {gid: (atlas_texture, uv_rect)}
+    texture, uv = regions[gid]
+    ```
+
+    Images larger than a page are left out of `regions`; give them their
+    own texture.
+    ==========================================================================
+    """
+
+    def __init__(self, max_size: int = 4096):
+        """
+        Parameters:
+        -----------
+        max_size : int
+            Maximum atlas page width/height in pixels. Clamped to the
+            driver's GL_MAX_TEXTURE_SIZE (needs a current GL context).
+        """
+        self.max_size = min(max_size, int(glGetIntegerv(GL_MAX_TEXTURE_SIZE)))
+        self._images: List[Tuple[Hashable, Image.Image]] = []
+
+    def add(self, key: Hashable, image: Image.Image):
+        """Queue an image for packing under `key` (e.g. its GID)"""
+        if image.mode != 'RGBA':
+            image = image.convert('RGBA')
+        self._images.append((key, Texture.extrude_border(image)))
+
+    def _page_width(self) -> int:
+        """Power-of-two width close to a square page for all the images"""
+        area = sum(img.width * img.height for _, img in self._images)
+        widest = max(img.width for _, img in self._images)
+        width = max(widest, math.isqrt(area) + 1)
+        return min(self.max_size, 1 << (width - 1).bit_length())
+
+    def build(self) -> Dict[Hashable, Tuple[Texture, UVRect]]:
+        """
+        Pack every added image and upload the atlas pages.
+
+        Returns:
+        --------
+        Dict mapping each packed key to (atlas texture, uv rect). The UV
+        rect covers the tile without its extruded border.
+        """
+        if not self._images:
+            return {}
+
+        page_w = self._page_width()
+        order = sorted(range(len(self._images)),
+                       key=lambda i: (-self._images[i][1].height,
+                                      -self._images[i][1].width, i))
+
+        # ---------------------------------------------------------------------
+        # PLACE: (key, image, page, x, y)
+        # ---------------------------------------------------------------------
+        placements = []
+        page_heights = [0]
+        x = y = shelf_h = 0
+        for i in order:
+            key, img = self._images[i]
+            if img.width > page_w or img.height > self.max_size:
+                continue  # Can't fit any page
+
+            if x + img.width > page_w:
+                # Row full - next shelf
+                x, y, shelf_h = 0, y + shelf_h, 0
+            if y + img.height > self.max_size:
+                # Page full - next page
+                page_heights.append(0)
+                x = y = shelf_h = 0
+
+            placements.append((key, img, len(page_heights) - 1, x, y))
+            x += img.width
+            shelf_h = max(shelf_h, img.height)
+            page_heights[-1] = max(page_heights[-1], y + shelf_h)
+
+        # ---------------------------------------------------------------------
+        # COMPOSE + UPLOAD pages
+        # ---------------------------------------------------------------------
+        pages = [Image.new('RGBA', (page_w, h), (0, 0, 0, 0)) if h else None
+                 for h in page_heights]
+        for _, img, page, px, py in placements:
+            pages[page].paste(img, (px, py))
+        textures = [Texture.from_pil(page, add_border=False) if page is not None else None
+                    for page in pages]
+
+        # UVs of the tile interior (border skipped), V flipped like the
+        # texture: top of the tile = high v
+        regions = {}
+        for key, img, page, px, py in placements:
+            page_h = page_heights[page]
+            regions[key] = (textures[page], (
+                (px + 1) / page_w,
+                1.0 - (py + 1) / page_h,
+                (px + img.width - 1) / page_w,
+                1.0 - (py + img.height - 1) / page_h,
+            ))
+
+        self._images.clear()
+        return regions
@@ -0,0 +1,134 @@
+"""
+Cached OpenGL binding state (GLFW version)
+
+=============================================================================
+WHY?
+=============================================================================
+
+OpenGL is a state machine: a program, VAO, buffer or texture stays bound until
+something else is bound. Every draw method used to bind what it needed
+and then unbind it again ("glUseProgram(0)", "glBindVertexArray(0)"), so
+the next draw - very often using the SAME program or VAO - had to bind it
+all over again. Each of those calls goes through PyOpenGL and the driver.
+
+GLState remembers what is currently bound and only talks to OpenGL when
+the binding actually changes. Nothing is unbound after drawing; leaving
+state bound is normal practice as long as every bind goes through here.
+
+=============================================================================
+RULES
+=============================================================================
+
+- Bind programs, VAOs, GL_ARRAY_BUFFERs and textures (2D and 2D array)
+  through GLState, not directly.
+- Code that changes bindings behind its back (e.g. Texture creation,
+  which binds the new texture to upload it) must call forget_textures().
+- Deleted objects must be forgotten too: OpenGL may hand the same ID to
+  a new object, which would then wrongly look "already bound".
+- The depth test is the same story: each draw turns it on or off as IT
+  needs (set_depth_test), and nobody turns it back afterwards. A frame
+  of tiles followed by overlays then switches it twice, not twice per
+  overlay draw.
+
+=============================================================================
+"""
+
+from OpenGL.GL import *
+from typing import Dict, Optional
+
+
+class GLState:
+    """
+    Process-wide cache of the current program, VAO, array buffer and
+    texture bindings, and of the depth test switch.
+
+    There is one OpenGL context per application, so the cache is simply
+    kept on the class.
+    """
+
+    program: int = 0
+    vao: int = 0
+    array_buffer: int = 0
+    textures: Dict[int, int] = {}   # texture unit -> texture ID
+    depth_test: Optional[bool] = None   # None = unknown
+
+    @classmethod
+    def use_program(cls, program: int):
+        """glUseProgram, skipped if the program is already active"""
+        if cls.program != program:
+            glUseProgram(program)
+            cls.program = program
+
+    @classmethod
+    def bind_vertex_array(cls, vao: int):
+        """glBindVertexArray, skipped if the VAO is already bound"""
+        if cls.vao != vao:
+            glBindVertexArray(vao)
+            cls.vao = vao
+
+    @classmethod
+    def bind_array_buffer(cls, buffer: int):
+        """
+        glBindBuffer(GL_ARRAY_BUFFER, ...), skipped if already bound.
+        
+        The GL_ARRAY_BUFFER binding is NOT part of VAO state (only the
+        buffer captured by glVertexAttribPointer is), so switching VAOs
+        doesn't invalidate it and a batch that re-uploads every frame
+        binds its VBO once, not once per flush.
+        """
+        if cls.array_buffer != buffer:
+            glBindBuffer(GL_ARRAY_BUFFER, buffer)
+            cls.array_buffer = buffer
+
+    @classmethod
+    def bind_texture(cls, unit: int, texture_id: int, target: int = GL_TEXTURE_2D):
+        """
+        glActiveTexture + glBindTexture, skipped if already bound there.
+        
+        `target` is GL_TEXTURE_2D_ARRAY for a TextureArray. Texture IDs
+        are unique across targets, so one cached ID per unit is enough.
+        """
+        if cls.textures.get(unit) != texture_id:
+            glActiveTexture(GL_TEXTURE0 + unit)
+            glBindTexture(target, texture_id)
+            cls.textures[unit] = texture_id
+
+    @classmethod
+    def set_depth_test(cls, enabled: bool):
+        """glEnable/glDisable(GL_DEPTH_TEST), skipped if already so"""
+        if cls.depth_test != enabled:
+            if enabled:
+                glEnable(GL_DEPTH_TEST)
+            else:
+                glDisable(GL_DEPTH_TEST)
+            cls.depth_test = enabled
+
+    @classmethod
+    def forget_textures(cls, texture_id: Optional[int] = None):
+        """
+        Drop cached texture bindings.
+
+        Parameters:
+        -----------
+        texture_id : int or None
+            Forget only the units holding this texture (e.g. it was
+            deleted), or every unit if None (bindings changed externally).
+        """
+        if texture_id is None:
+            cls.textures.clear()
+        else:
+            for unit, bound in list(cls.textures.items()):
+                if bound == texture_id:
+                    del cls.textures[unit]
+
+    @classmethod
+    def forget_vertex_array(cls, vao: int):
+        """Drop the cached VAO binding if it is `vao` (e.g. it was deleted)"""
+        if cls.vao == vao:
+            cls.vao = 0
+
+    @classmethod
+    def forget_array_buffer(cls, buffer: int):
+        """Drop the cached array buffer binding if it is `buffer` (deleted)"""
+        if cls.array_buffer == buffer:
+            cls.array_buffer = 0
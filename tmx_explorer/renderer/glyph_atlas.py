@@ -0,0 +1,243 @@
+"""
+Glyph atlas for text rendering (GLFW version - uses PIL)
+
+=============================================================================
+WHY A GLYPH ATLAS?
+=============================================================================
+
+The simple way to draw text with PIL is to render the whole text block
+into an image and upload it as a texture. But then ANY change - one digit
+of the FPS counter - means rasterizing every line again and uploading a
+whole new 350xN texture.
+
+A glyph atlas turns this around: each CHARACTER is rasterized once, the
+first time it is seen, into a free cell of one shared texture. Only that
+cell is uploaded (glTexSubImage2D). Text is then drawn as one textured
+quad per character, pointing at its cell:
+
+    atlas texture (512x512)           text "Hi!"
+    +---+---+---+---+---+--          +---+---+---+
+    | H | i | ! | F | P | ...        | H | i | ! |   3 quads, 1 texture,
+    +---+---+---+---+---+--          +---+---+---+   1 draw call
+    |###|                             ^ UVs of the H cell, etc.
+    +---+  <- a solid white cell for untextured quads (panel backgrounds)
+
+Changing text now only changes a few vertices; the texture is untouched.
+
+=============================================================================
+CELLS
+=============================================================================
+
+Every cell is one line tall (line_height) and as wide as the glyph's
+advance, so glyphs are laid out by simply adding up widths. Cells are
+packed in rows; if the atlas ever fills up it is cleared and refilled on
+demand, and `generation` is bumped so users can drop stale UVs.
+
+Glyphs are stored white with the coverage in alpha; the sprite color
+tints them.
+
+=============================================================================
+UPLOADS
+=============================================================================
+
+New glyphs are drawn into a CPU copy of the atlas first; upload() then
+sends all rows changed since the last call in ONE transfer, through a
+pixel buffer object (PBO):
+
+    glyph() -> CPU copy (dirty rows) --upload()--> PBO --> texture
+
+glTexSubImage2D from client memory must finish copying before it
+returns. From a bound GL_PIXEL_UNPACK_BUFFER it returns immediately and
+the driver moves the pixels to the texture in the background, while the
+CPU goes on with the frame. Two PBOs are used in turn, and each is
+invalidated when mapped, so writing one never waits for the GPU to finish
+reading the other.
+
+=============================================================================
+"""
+
+import ctypes
+import math
+import numpy as np
+from OpenGL.GL import *
+from PIL import Image
+from typing import Dict, Optional, Tuple
+from .atlas import UVRect
+from .texture import Texture
+
+# "Start of the bound PBO" as a pointer argument, made once (see upload)
+_PBO_START = ctypes.c_void_p(0)
+
+
+class GlyphAtlas:
+    """
+    One texture holding every glyph drawn so far, rasterized on demand.
+
+    ==========================================================================
+    USAGE PATTERN
+    ==========================================================================
+
+    ```python
+    glyphs = GlyphAtlas(font, line_height=18)
+
+    advance, uv = glyphs.glyph("A")   # uv is None for blank glyphs
+    ... more glyph() calls ...
+    glyphs.upload()                   # new glyphs -> texture
+    batch.begin(glyphs.texture)
+    ... one quad per character, UVs from glyph() ...
+    ```
+    ==========================================================================
+    """
+
+    SIZE = 512
+
+    def __init__(self, font, line_height: int):
+        """
+        Parameters:
+        -----------
+        font : PIL.ImageFont
+            Font to rasterize with
+        line_height : int
+            Cell height in pixels (one line of text)
+        """
+        self.font = font
+        self.line_height = line_height
+        # Allocated empty - filled by upload() as glyphs appear
+        self.texture = Texture(self.SIZE, self.SIZE, None)
+        self.generation = 0
+
+        # CPU copy of the texture (rows bottom-to-top, like the texture)
+        # and the range of rows changed since the last upload()
+        self._pixels = np.zeros((self.SIZE, self.SIZE, 4), dtype=np.uint8)
+        self._dirty: Optional[Tuple[int, int]] = None
+
+        # Two PBOs used in turn (see UPLOADS above)
+        self._pbos = glGenBuffers(2)
+        self._pbo_index = 0
+        for pbo in self._pbos:
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, pbo)
+            glBufferData(GL_PIXEL_UNPACK_BUFFER, self._pixels.nbytes, None, GL_STREAM_DRAW)
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+
+        self._reset()
+
+    def _reset(self):
+        """Forget every cell (the texture contents are simply overwritten)"""
+        self._glyphs: Dict[str, Tuple[int, Optional[UVRect]]] = {}
+        self._x = 0
+        self._y = 0
+        self.generation += 1
+
+        # Solid white cell, sampled at its center, for untextured quads
+        self.white_uv = self._place(np.full((4, 4, 4), 255, dtype=np.uint8), inset=1.5)
+
+    def _place(self, pixels: np.ndarray, inset: float = 0.0) -> Optional[UVRect]:
+        """
+        Copy an (h, w, 4) RGBA array into the next free cell (CPU copy).
+
+        Returns its UV rect, or None if the atlas is full.
+        """
+        h, w = pixels.shape[:2]
+        if self._x + w > self.SIZE:
+            # Row full - next row
+            self._x = 0
+            self._y += self.line_height
+        if self._y + h > self.SIZE:
+            return None
+        px, py = self._x, self._y
+        self._x += w
+
+        # The texture is stored flipped (see Texture.from_pil): image row
+        # py is texture row SIZE - py - 1
+        row = self.SIZE - py - h
+        self._pixels[row:row + h, px:px + w] = pixels[::-1]
+        if self._dirty is None:
+            self._dirty = (row, row + h)
+        else:
+            self._dirty = (min(self._dirty[0], row), max(self._dirty[1], row + h))
+
+        size = float(self.SIZE)
+        return ((px + inset) / size, 1.0 - (py + inset) / size,
+                (px + w - inset) / size, 1.0 - (py + h - inset) / size)
+
+    def _rasterize(self, char: str) -> Tuple[int, np.ndarray]:
+        """
+        Render one character into a white RGBA cell, coverage in alpha.
+
+        Uses the font's glyph mask directly (font.getmask) and places it
+        with numpy, instead of drawing through ImageDraw.text - which
+        builds the same mask plus a drawing context and a compositing
+        pass per call. The result is the same pixels as
+        ImageDraw.text((0, 0), char) into the cell.
+        """
+        advance = max(1, math.ceil(self.font.getlength(char)))
+        pixels = np.full((self.line_height, advance, 4), 255, dtype=np.uint8)
+        alpha = pixels[:, :, 3]
+        alpha[:] = 0
+
+        # The mask only covers the glyph's ink; getbbox says where that
+        # starts relative to the pen position (e.g. below the ascender)
+        left, top = self.font.getbbox(char)[:2]
+        mask = Image.Image()._new(self.font.getmask(char, mode='L'))
+        if mask.mode != 'L':
+            mask = mask.convert('L')   # Bitmap fonts give 1-bit masks
+        mask = np.asarray(mask)
+
+        # Clip to the cell (overhanging glyphs lose the overhang)
+        x0, y0 = max(left, 0), max(top, 0)
+        src = mask[y0 - top:, x0 - left:][:self.line_height - y0, :advance - x0]
+        alpha[y0:y0 + src.shape[0], x0:x0 + src.shape[1]] = src
+        return advance, pixels
+
+    def glyph(self, char: str) -> Tuple[int, Optional[UVRect]]:
+        """
+        Get a character's advance width and atlas UV rect.
+
+        Rasterizes and uploads the glyph the first time it is asked for.
+        The UV rect is None for glyphs with nothing to draw (spaces).
+        """
+        cached = self._glyphs.get(char)
+        if cached is not None:
+            return cached
+
+        advance, pixels = self._rasterize(char)
+        uv = None
+        if pixels[:, :, 3].any():
+            uv = self._place(pixels)
+            if uv is None:
+                # Atlas full: start over (callers see the new generation)
+                self._reset()
+                uv = self._place(pixels)
+        self._glyphs[char] = (advance, uv)
+        return advance, uv
+
+    def upload(self):
+        """
+        Send the glyphs added since the last call to the texture.
+
+        Call before drawing with the texture. One transfer for the whole
+        changed row range, staged in a PBO (see UPLOADS above).
+        """
+        if self._dirty is None:
+            return
+        y0, y1 = self._dirty
+        self._dirty = None
+        rows = self._pixels[y0:y1]
+
+        pbo = self._pbos[self._pbo_index]
+        self._pbo_index ^= 1
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, pbo)
+        # INVALIDATE: we overwrite it all, so the driver never waits for
+        # a transfer still reading the old contents
+        ptr = glMapBufferRange(GL_PIXEL_UNPACK_BUFFER, 0, rows.nbytes,
+                               GL_MAP_WRITE_BIT | GL_MAP_INVALIDATE_BUFFER_BIT)
+        if ptr:
+            ctypes.memmove(ptr, rows.ctypes.data, rows.nbytes)
+            glUnmapBuffer(GL_PIXEL_UNPACK_BUFFER)
+            # With a PBO bound, the "data" argument is an offset into it
+            self.texture.update(0, y0, self.SIZE, y1 - y0, _PBO_START)
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+        else:
+            # Mapping failed - plain synchronous upload
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+            self.texture.update(0, y0, self.SIZE, y1 - y0, rows)
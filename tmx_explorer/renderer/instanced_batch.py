@@ -0,0 +1,363 @@
+"""
+Instanced tile rendering (GLFW version)
+
+=============================================================================
+WHY INSTANCING?
+=============================================================================
+
+Expanding every tile into 4 vertices × 9 floats = 36 floats on the CPU
+means uploading all of them every frame. But for a tile, most of that
+data is redundant: the four corners only differ by which side of the
+rectangle they sit on, the UVs follow from the size, and the color is
+always white.
+
+With hardware instancing we upload:
+- ONE unit quad, once, at startup (4 corners in [0, 1])
+- ONE record per tile per frame: (x, y, w, h, depth, u0, v0, u1, v1)
+  = 28 bytes (INSTANCE_RECORD below)
+
+and let the GPU combine them: the vertex shader runs 4 times per instance
+and places corner * size + offset, and picks the UVs from the rect.
+That is 4x less data per tile and no per-corner work on the CPU at all.
+
+The UV rect is stored as 0-65535 uint16 and normalized back to 0.0-1.0
+by OpenGL (like SpriteBatch's UVs): 1/65535 of a 4096 pixel atlas is
+0.06 pixel, far below what shows. Positions and depth stay float32 -
+they are world coordinates, and big maps or objects placed between
+whole pixels don't fit int16.
+
+=============================================================================
+HOW THIS CLASS WORKS
+=============================================================================
+
+    batch.draw(texture, instances)   # instances: (N,) INSTANCE_RECORD array
+
+draw() uploads the instance records and issues
+glDrawArraysInstanced(GL_TRIANGLE_STRIP, 0, 4, N) - one call per texture
+(more only if N exceeds max_instances).
+
+    batch.draw_many([(texture, instances), ...])
+
+draw_many() packs several textures' records into one upload and draws
+each texture's range of it.
+
+The shader is INSTANCED_VERTEX_SHADER + the regular FRAGMENT_SHADER;
+the renderer activates it before calling draw().
+
+=============================================================================
+MEMORY LAYOUT
+=============================================================================
+
+Unit quad (attribute 0, per vertex), drawn as a triangle strip:
+
+    (0,0)---(1,0)       strip order: (0,0), (1,0), (0,1), (1,1)
+      |    /  |
+      |  /    |
+    (0,1)---(1,1)
+
+Instance record (attributes 1-3, divisor 1 = advance once per instance):
+
+    [x, y, w, h, depth, u0, v0, u1, v1]
+     └────────┘  └───┘  └────────────┘
+     attr 1      attr 2  attr 3
+     4 × f32     f32     4 × u16 -> vec4 (u_left, v_top, u_right, v_bottom)
+     16 bytes    4       8                              = 28 bytes
+
+=============================================================================
+"""
+
+import ctypes
+import numpy as np
+from OpenGL.GL import *
+from typing import List, Tuple
+from .gl_state import GLState
+from .texture import Texture
+
+# One tile instance: world rect, depth, UV rect as normalized uint16
+INSTANCE_RECORD = np.dtype([('rect', np.float32, 4), ('depth', np.float32),
+                            ('uv', np.uint16, 4)])
+
+
+class InstancedBatch:
+    """
+    Draws many same-texture tiles with one instanced draw call.
+
+    ==========================================================================
+    USAGE PATTERN
+    ==========================================================================
+
+    ```python
+    batch = InstancedBatch(max_instances=20000)
+
+    # In render loop (instanced shader active):
+    instances = np.zeros(len(tiles), dtype=INSTANCE_RECORD)
+    ... fill instances['rect'], ['depth'], ['uv'] ...
+    batch.draw(tileset_texture, instances)
+    ```
+
+    ==========================================================================
+    """
+
+    # Layout: [x, y, w, h, depth | u0, v0, u1, v1] = 5 floats + 4 uint16
+    STRIDE = INSTANCE_RECORD.itemsize
+
+    # Unit quad corners in triangle-strip order
+    UNIT_QUAD = np.array([
+        0.0, 0.0,   # Top-left
+        1.0, 0.0,   # Top-right
+        0.0, 1.0,   # Bottom-left
+        1.0, 1.0,   # Bottom-right
+    ], dtype=np.float32)
+
+    def __init__(self, max_instances: int = 20000):
+        """
+        Initialize the instanced batch.
+
+        Parameters:
+        -----------
+        max_instances : int
+            Maximum number of tiles per draw call. Larger inputs are split.
+            20,000 × 28 bytes = 560 KB of instance buffer.
+        """
+        self.max_instances = max_instances
+        
+        # GL 4.2 (or ARB_base_instance): draw a sub-range of the instance
+        # buffer without touching the attribute pointers
+        self.base_instance = bool(glDrawArraysInstancedBaseInstance)
+        
+        self._setup_buffers()
+
+    def _setup_buffers(self):
+        """
+        Create the VAO, the static unit-quad VBO and the instance VBO.
+
+        =======================================================================
+        VERTEX ATTRIBUTE LAYOUT
+        =======================================================================
+
+        Attribute 0: corner (vec2)  - quad_vbo, per vertex
+        Attribute 1: rect (vec4)    - instance_vbo, offset 0,  divisor 1
+        Attribute 2: depth (float)  - instance_vbo, offset 16, divisor 1
+        Attribute 3: uv (vec4)      - instance_vbo, offset 20, divisor 1
+                                      (uint16, normalized)
+
+        glVertexAttribDivisor(index, 1) tells OpenGL to advance that
+        attribute once per INSTANCE instead of once per vertex.
+        =======================================================================
+        """
+        self.vao = glGenVertexArrays(1)
+        self.quad_vbo = glGenBuffers(1)
+        self.instance_vbo = glGenBuffers(1)
+
+        # ---------------------------------------------------------------------
+        # UNIT QUAD - uploaded once, never changes
+        # ---------------------------------------------------------------------
+        GLState.bind_array_buffer(self.quad_vbo)
+        glBufferData(GL_ARRAY_BUFFER, self.UNIT_QUAD.nbytes,
+                     self.UNIT_QUAD, GL_STATIC_DRAW)
+
+        # ---------------------------------------------------------------------
+        # INSTANCE DATA - rewritten every draw
+        # ---------------------------------------------------------------------
+        GLState.bind_array_buffer(self.instance_vbo)
+        glBufferData(GL_ARRAY_BUFFER, self.max_instances * self.STRIDE,
+                     None, GL_DYNAMIC_DRAW)
+
+        GLState.bind_vertex_array(self.vao)
+        self._setup_attributes(self.instance_vbo)
+        GLState.bind_vertex_array(0)
+
+    def _setup_attributes(self, instance_vbo: int):
+        """Record the quad + instance attribute layout in the bound VAO"""
+        # Attribute 0: unit quad corner
+        GLState.bind_array_buffer(self.quad_vbo)
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(0, 2, GL_FLOAT, GL_FALSE, 2 * 4, ctypes.c_void_p(0))
+
+        stride = self.STRIDE
+        GLState.bind_array_buffer(instance_vbo)
+
+        # Attribute 1: x, y, w, h
+        glEnableVertexAttribArray(1)
+        glVertexAttribPointer(1, 4, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(0))
+        glVertexAttribDivisor(1, 1)
+
+        # Attribute 2: depth (after 4 floats = 16 bytes)
+        glEnableVertexAttribArray(2)
+        glVertexAttribPointer(2, 1, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(16))
+        glVertexAttribDivisor(2, 1)
+
+        # Attribute 3: UV rect (after 5 floats = 20 bytes), 0-65535 ->
+        # 0.0-1.0 (normalized = GL_TRUE)
+        glEnableVertexAttribArray(3)
+        glVertexAttribPointer(3, 4, GL_UNSIGNED_SHORT, GL_TRUE, stride, ctypes.c_void_p(20))
+        glVertexAttribDivisor(3, 1)
+
+    def draw(self, texture: Texture, instances: np.ndarray):
+        """
+        Draw tiles as instances of the unit quad.
+
+        Parameters:
+        -----------
+        texture : Texture
+            Texture shared by all the tiles (bound to unit 0)
+        instances : np.ndarray
+            (N,) INSTANCE_RECORD array of x, y, w, h, depth, u0, v0, u1, v1
+            in world coordinates
+            (the camera is part of the projection uniform).
+            Uploaded as-is if C-contiguous (a copy is made otherwise).
+        """
+        # Uploaded by raw address below, so it must be one packed block
+        instances = np.ascontiguousarray(instances, dtype=INSTANCE_RECORD)
+        count = len(instances)
+        if count == 0:
+            return
+
+        texture.bind(0)
+        GLState.bind_vertex_array(self.vao)
+        GLState.bind_array_buffer(self.instance_vbo)
+
+        # Usually a single iteration; split only if over capacity
+        for start in range(0, count, self.max_instances):
+            chunk = instances[start:start + self.max_instances]
+            glBufferSubData(GL_ARRAY_BUFFER, 0, chunk.nbytes,
+                            ctypes.c_void_p(chunk.ctypes.data))
+            self._draw_range(0, len(chunk))
+
+    def draw_many(self, batches: List[Tuple[Texture, np.ndarray]]):
+        """
+        Draw several textures' instances with a single upload.
+        
+        =======================================================================
+        WHY?
+        =======================================================================
+        
+        Calling draw() once per texture rewrites the start of the same
+        buffer again and again within a frame. Each rewrite has to wait
+        until the GPU has finished reading the previous draw's data - an
+        implicit sync per texture.
+        
+        Here every batch is packed back to back into the instance buffer
+        with ONE glBufferSubData, and each texture draws its own range of
+        it. A texture switch still needs its own draw call (the tilesets
+        are separate textures of different sizes), but the calls no longer
+        stall on each other.
+        
+        Parameters:
+        -----------
+        batches : List[Tuple[Texture, np.ndarray]]
+            (texture, (N,) INSTANCE_RECORD instances) pairs, drawn in order
+        """
+        group = []
+        group_size = 0
+        for texture, instances in batches:
+            count = len(instances)
+            if count == 0:
+                continue
+            if count > self.max_instances:
+                # Too big to share the buffer - draw on its own
+                self._draw_group(group)
+                group, group_size = [], 0
+                self.draw(texture, instances)
+                continue
+            if group_size + count > self.max_instances:
+                self._draw_group(group)
+                group, group_size = [], 0
+            group.append((texture, instances))
+            group_size += count
+        self._draw_group(group)
+
+    def _draw_group(self, group: List[Tuple[Texture, np.ndarray]]):
+        """Upload a group that fits the buffer at once, then draw each range"""
+        if not group:
+            return
+        packed = np.concatenate([instances for _, instances in group])
+
+        GLState.bind_vertex_array(self.vao)
+        GLState.bind_array_buffer(self.instance_vbo)
+        # Raw address + size: PyOpenGL passes it straight through, with
+        # none of the checks (and possible conversion copy) its array
+        # handler does for a numpy argument
+        glBufferSubData(GL_ARRAY_BUFFER, 0, packed.nbytes,
+                        ctypes.c_void_p(packed.ctypes.data))
+
+        first = 0
+        for texture, instances in group:
+            texture.bind(0)
+            self._draw_range(first, len(instances))
+            first += len(instances)
+
+    def _draw_range(self, first: int, count: int):
+        """
+        Draw instances [first, first + count) of the bound instance buffer.
+        
+        Without base-instance support (GL 3.3), the instance attributes are
+        re-pointed at the range instead - three cheap state changes.
+        """
+        if self.base_instance:
+            glDrawArraysInstancedBaseInstance(GL_TRIANGLE_STRIP, 0, 4, count, first)
+            return
+        stride = self.STRIDE
+        offset = first * stride
+        glVertexAttribPointer(1, 4, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(offset))
+        glVertexAttribPointer(2, 1, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(offset + 16))
+        glVertexAttribPointer(3, 4, GL_UNSIGNED_SHORT, GL_TRUE, stride, ctypes.c_void_p(offset + 20))
+        glDrawArraysInstanced(GL_TRIANGLE_STRIP, 0, 4, count)
+
+    # =========================================================================
+    # STATIC INSTANCES
+    # =========================================================================
+
+    def create_static(self, instances: np.ndarray) -> Tuple[int, int, int]:
+        """
+        Upload instances into their own GPU buffer, once.
+        
+        =======================================================================
+        WHY STATIC BUFFERS?
+        =======================================================================
+        
+        Map tiles don't move - only the camera does, and the camera lives in
+        the projection uniform. So the instance records of a piece of the
+        map are the same every frame, and re-uploading them is wasted work.
+        
+        A static buffer (GL_STATIC_DRAW) is uploaded once and then drawn
+        with draw_static() as often as needed, with no CPU work per tile.
+        
+        Parameters:
+        -----------
+        instances : np.ndarray
+            (N,) INSTANCE_RECORD array of x, y, w, h, depth, u0, v0, u1, v1
+            in world coordinates
+            
+        Returns:
+        --------
+        (vao, vbo, count) handle for draw_static() / delete_static()
+        """
+        instances = np.ascontiguousarray(instances, dtype=INSTANCE_RECORD)
+        vao = glGenVertexArrays(1)
+        vbo = glGenBuffers(1)
+
+        GLState.bind_array_buffer(vbo)
+        glBufferData(GL_ARRAY_BUFFER, instances.nbytes, instances, GL_STATIC_DRAW)
+
+        GLState.bind_vertex_array(vao)
+        self._setup_attributes(vbo)
+        GLState.bind_vertex_array(0)
+        return vao, vbo, len(instances)
+
+    def draw_static(self, texture: Texture, static: Tuple[int, int, int]):
+        """Draw a buffer made by create_static() - no upload at all"""
+        vao, _, count = static
+        if count == 0:
+            return
+        texture.bind(0)
+        GLState.bind_vertex_array(vao)
+        glDrawArraysInstanced(GL_TRIANGLE_STRIP, 0, 4, count)
+
+    def delete_static(self, static: Tuple[int, int, int]):
+        """Free the GPU objects of a buffer made by create_static()"""
+        vao, vbo, _ = static
+        GLState.forget_vertex_array(vao)
+        GLState.forget_array_buffer(vbo)
+        glDeleteVertexArrays(1, [vao])
+        glDeleteBuffers(1, [vbo])
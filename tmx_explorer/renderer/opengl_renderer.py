@@ -41,21 +41,83 @@ OPENGL CONCEPTS USED
 
 import ctypes
 import numpy as np
+from collections import OrderedDict
 from OpenGL.GL import *
 from OpenGL.GL.shaders import compileProgram, compileShader
 from typing import Dict, List, Tuple, Optional
-from PIL import Image
+from PIL import Image, ImageFont
 
-from .texture import Texture
-from .sprite_batch import SpriteBatch
+from ._kernels import pack_lines, pack_rects
+from .gl_state import GLState
+from .glyph_atlas import GlyphAtlas
+from .texture import Texture, TextureArray
+from .sprite_batch import SpriteBatch, pack_uvs
+from .instanced_batch import InstancedBatch, INSTANCE_RECORD
 from ..shaders.sources import (
-    VERTEX_SHADER, FRAGMENT_SHADER,
-    SIMPLE_VERTEX_SHADER, SIMPLE_FRAGMENT_SHADER
+    VERTEX_SHADER, FRAGMENT_SHADER, ARRAY_FRAGMENT_SHADER,
+    INSTANCED_VERTEX_SHADER, SIMPLE_VERTEX_SHADER, SIMPLE_FRAGMENT_SHADER
 )
 
 # Default color constant - full white means "don't tint the texture"
 WHITE = (255, 255, 255)
 
+# Debug geometry vertex: int16 screen position + uint8 RGBA color (8 bytes)
+SIMPLE_VERTEX = np.dtype([('pos', np.int16, 2), ('col', np.uint8, 4)])
+
+# Range representable by the int16 positions
+_INT16_MIN, _INT16_MAX = -32768, 32767
+
+# Debug geometry VBO ring: one segment per flush_simple() in flight
+SIMPLE_RING_SEGMENTS = 3
+SIMPLE_SEGMENT_BYTES = 256 * 1024   # 32768 vertices, grown on demand
+
+# Rectangle vertices as indices into its (left, top, right, bottom) edges:
+# triangle 1 top-left -> top-right -> bottom-right,
+# triangle 2 top-left -> bottom-right -> bottom-left
+_RECT_CORNERS = np.array([[0, 1], [2, 1], [2, 3],
+                          [0, 1], [2, 3], [0, 3]], dtype=np.intp)
+
+
+def _instance_records(tiles) -> np.ndarray:
+    """
+    Pack tile tuples into (N,) INSTANCE_RECORD instance records.
+    
+    Tiles carrying their own UV rect (9 values, e.g. atlas cells) keep it.
+    Plain (x, y, w, h, depth) tiles cover their whole texture minus the
+    1px border; that UV rect is computed here for all rows at once. UVs
+    are stored as uint16 (pack_uvs), like SpriteBatch's.
+    """
+    arr = np.asarray(tiles, dtype=np.float32)
+    records = np.empty(len(arr), dtype=INSTANCE_RECORD)
+    records['rect'] = arr[:, :4]
+    records['depth'] = arr[:, 4]
+    if arr.shape[1] == 9:
+        records['uv'] = pack_uvs(arr[:, 5:])
+        return records
+    inv_w = 1.0 / (arr[:, 2] + 2.0)
+    inv_h = 1.0 / (arr[:, 3] + 2.0)
+    records['uv'] = pack_uvs(np.stack((
+        inv_w,          # u_left
+        1.0 - inv_h,    # v_top (textures are V-flipped)
+        1.0 - inv_w,    # u_right
+        inv_h,          # v_bottom
+    ), axis=1))
+    return records
+
+
+# Laid out text lines kept by draw_text_lines (least recently used dropped)
+TEXT_CACHE_SIZE = 64
+
+# Text panel layout, in pixels
+TEXT_LINE_HEIGHT = 18
+TEXT_PANEL_WIDTH = 350
+TEXT_PADDING = 5
+
+# Text colors as the uint8 RGBA rows SpriteBatch stores, so add_quads
+# copies them as they are instead of converting on every draw
+TEXT_PANEL_COLOR = np.array((0, 0, 0, 180), dtype=np.uint8)   # ~70% opacity
+TEXT_COLOR = np.full(4, 255, dtype=np.uint8)                  # White
+
 
 class OpenGLRenderer:
     """
@@ -81,9 +143,11 @@ class OpenGLRenderer:
     
     1. begin_frame() - Clear screen
     2. draw_batched_tiles() - Render all map tiles (main content)
-    3. draw_lines() / draw_rects() - Render debug shapes (optional)
-    4. draw_text_lines() - Render UI text overlay
-    5. (GLFW swaps buffers externally)
+    3. draw_lines() / draw_rects() - Queue debug shapes (optional)
+    4. flush_simple() - Draw all queued shapes at once
+       (draw_text_lines() does this first, so it's implicit with text)
+    5. draw_text_lines() - Render UI text overlay
+    6. (GLFW swaps buffers externally)
     
     ==========================================================================
     """
@@ -109,6 +173,7 @@ class OpenGLRenderer:
         self._init_shaders()
         self._init_buffers()
         self._init_state()
+        self._init_text()
         
         # Debug info - useful for troubleshooting driver/version issues
         print(f"OpenGL Renderer: {glGetString(GL_VERSION).decode()}")
@@ -122,14 +187,22 @@ class OpenGLRenderer:
         Compile and link shader programs.
         
         =======================================================================
-        WHY TWO SHADER PROGRAMS?
+        WHY FOUR SHADER PROGRAMS?
         =======================================================================
         
-        1. shader_program (Main): For textured sprites (tiles, text)
+        1. shader_program (Main): For textured sprites (text, UI)
            - Vertex shader: Transforms positions, passes UVs to fragment
            - Fragment shader: Samples texture, applies color
            
-        2. simple_shader: For colored primitives (lines, rectangles)
+           array_shader_program: the same sprites from a TextureArray
+           - Same vertex shader; the fragment shader samples the layer
+             each sprite names (see begin_sprites)
+           
+        2. instanced_shader: For tiles drawn by InstancedBatch
+           - Vertex shader builds each quad from a unit quad + per-tile rect
+           - Same fragment shader as the main program
+           
+        3. simple_shader: For colored primitives (lines, rectangles)
            - No texture sampling needed
            - Just transforms positions and outputs solid colors
            
@@ -154,6 +227,18 @@ class OpenGLRenderer:
             compileShader(FRAGMENT_SHADER, GL_FRAGMENT_SHADER)
         )
         
+        # Same sprites, sampling a texture array (see begin_sprites)
+        self.array_shader_program = compileProgram(
+            compileShader(VERTEX_SHADER, GL_VERTEX_SHADER),
+            compileShader(ARRAY_FRAGMENT_SHADER, GL_FRAGMENT_SHADER)
+        )
+        
+        # Compile instanced shader for tiles (shares the fragment shader)
+        self.instanced_shader = compileProgram(
+            compileShader(INSTANCED_VERTEX_SHADER, GL_VERTEX_SHADER),
+            compileShader(FRAGMENT_SHADER, GL_FRAGMENT_SHADER)
+        )
+        
         # Compile simple shader for lines/shapes (no texture)
         self.simple_shader = compileProgram(
             compileShader(SIMPLE_VERTEX_SHADER, GL_VERTEX_SHADER),
@@ -164,9 +249,29 @@ class OpenGLRenderer:
         # These integers identify WHERE in the shader to send data
         self.proj_loc = glGetUniformLocation(self.shader_program, "projection")
         self.tex_loc = glGetUniformLocation(self.shader_program, "texture0")
+        self.array_proj_loc = glGetUniformLocation(self.array_shader_program, "projection")
+        self.array_tex_loc = glGetUniformLocation(self.array_shader_program, "texture0")
+        
+        # Cache uniform locations for the instanced shader
+        self.instanced_proj_loc = glGetUniformLocation(self.instanced_shader, "projection")
+        self.instanced_tex_loc = glGetUniformLocation(self.instanced_shader, "texture0")
         
         # Cache uniform location for simple shader
         self.simple_proj_loc = glGetUniformLocation(self.simple_shader, "projection")
+        
+        # Uniform values are stored IN the program and survive switching
+        # programs, so constant ones are set once, here: both textured
+        # shaders always sample unit 0.
+        for program, tex_loc in ((self.shader_program, self.tex_loc),
+                                 (self.array_shader_program, self.array_tex_loc),
+                                 (self.instanced_shader, self.instanced_tex_loc)):
+            GLState.use_program(program)
+            glUniform1i(tex_loc, 0)
+        GLState.use_program(0)
+        
+        # Programs whose projection uniform holds the current matrix
+        # (see _set_matrix); emptied whenever a matrix changes
+        self._matrix_current = set()
 
     def _init_buffers(self):
         """
@@ -176,16 +281,23 @@ class OpenGLRenderer:
         BUFFER STRATEGY
         =======================================================================
         
-        1. SpriteBatch: Handles all textured sprite rendering (tiles, text).
+        1. SpriteBatch: Handles textured sprite rendering (text, UI).
            Internally manages its own VAO/VBO. Max 20,000 sprites per batch
            is a good balance - high enough to render most screens in one
            draw call, low enough to not waste GPU memory.
         
-        2. simple_vao/vbo: For debug geometry (lines, rectangles).
-           Pre-allocated 10MB buffer because:
-           - Dynamic allocation per frame would be slow
-           - 10MB is plenty for debug visualization
-           - GL_DYNAMIC_DRAW hints to driver that data changes frequently
+        2. InstancedBatch: Renders tiles as instances of one unit quad,
+           uploading one 28-byte INSTANCE_RECORD per tile: rect and depth
+           as float32, UV rect as normalized uint16 (see _instance_records).
+        
+        3. simple_vao/vbo: For debug geometry (lines, rectangles).
+           A ring of SIMPLE_RING_SEGMENTS segments of SIMPLE_SEGMENT_BYTES
+           each (grown on demand), see _allocate_simple_ring:
+           - Each flush_simple() writes the next segment and drops a
+             fence after its draws, so it never waits on a segment the
+             GPU is still reading
+           - Persistently mapped (GL 4.4) and written in place, or filled
+             with glBufferSubData where glBufferStorage is missing
         
         =======================================================================
         VAO/VBO SETUP EXPLAINED
@@ -199,63 +311,157 @@ class OpenGLRenderer:
         - Stores the actual vertex DATA on the GPU
         - We update this every frame with new geometry
         
-        Vertex Format for simple_vbo (6 floats per vertex):
-        [x, y, r, g, b, a]
-         ^  ^  ^  ^  ^  ^
-         |  |  |__|__|__|-- Color (4 floats, RGBA normalized 0-1)
-         |__|-- Position (2 floats, screen coordinates)
+        Vertex Format for simple_vbo (8 bytes per vertex, SIMPLE_VERTEX):
+        [x, y | r, g, b, a]
+         ^  ^   ^  ^  ^  ^
+         |  |   |__|__|__|-- Color (4 × uint8, 0-255)
+         |__|-- Position (2 × int16, screen pixels)
+        
+        Debug shapes are drawn in whole screen pixels, and colors come in
+        as 0-255, so int16/uint8 lose nothing visible while using a third
+        of the bandwidth of 6 floats (24 bytes).
         
         glVertexAttribPointer arguments:
         - attribute index (0=position, 1=color)
         - component count (2 for xy, 4 for rgba)
-        - data type (GL_FLOAT)
-        - normalized (GL_FALSE - we provide values directly)
-        - stride (24 bytes = 6 floats * 4 bytes per float)
-        - offset (0 for position, 8 for color = 2 floats * 4 bytes)
+        - data type (GL_SHORT for xy, GL_UNSIGNED_BYTE for rgba)
+        - normalized (GL_FALSE for xy: 12 -> 12.0;
+                      GL_TRUE for rgba: 255 -> 1.0, as the shader expects)
+        - stride (8 bytes)
+        - offset (0 for position, 4 for color = 2 shorts * 2 bytes)
         """
         # Main sprite batch for tiles and textured quads
-        # 20,000 sprites = 120,000 vertices = plenty for any screen
+        # 20,000 sprites = 20,000 instance records = plenty for any screen
         self.batch = SpriteBatch(max_sprites=20000)
         
+        # Instanced batch for map tiles and characters
+        self.instanced_batch = InstancedBatch(max_instances=20000)
+        
         # =====================================================================
         # Simple geometry VAO/VBO setup (for lines and rectangles)
         # =====================================================================
         
-        # Generate and bind VAO - this "records" the following setup
+        # The VAO "records" the attribute setup done in _allocate_simple_ring
         self.simple_vao = glGenVertexArrays(1)
+        self.simple_vbo = 0
+        
+        # Create VBO as a small ring of segments (see _allocate_simple_ring)
+        self._simple_segment_vertices = SIMPLE_SEGMENT_BYTES // SIMPLE_VERTEX.itemsize
+        self._simple_fences = [None] * SIMPLE_RING_SEGMENTS
+        self._allocate_simple_ring()
+        
+        # CPU staging for debug geometry: draw_lines/draw_rects write their
+        # vertices straight into these persistent arrays and flush_simple()
+        # uploads them from there - no per-call or per-frame allocation.
+        # One array per primitive (rectangles are drawn before lines);
+        # grown on demand by _stage(), never shrunk.
+        self._simple_staging: Dict[str, np.ndarray] = {
+            'tris': np.empty(4096, dtype=SIMPLE_VERTEX),
+            'lines': np.empty(4096, dtype=SIMPLE_VERTEX),
+        }
+        self._simple_used: Dict[str, int] = {'tris': 0, 'lines': 0}
+        # Their addresses for glBufferSubData, as ready c_void_p objects:
+        # array.ctypes builds a new helper object on every access
+        self._simple_staging_ptrs: Dict[str, ctypes.c_void_p] = {
+            kind: ctypes.c_void_p(staging.ctypes.data)
+            for kind, staging in self._simple_staging.items()
+        }
+        
+        # Debug colors as ready-to-assign uint8 RGBA rows (see color_row)
+        self._color_cache: Dict[Tuple[int, ...], np.ndarray] = {}
+
+    def _allocate_simple_ring(self):
+        """
+        (Re)allocate the debug geometry VBO as SIMPLE_RING_SEGMENTS segments.
+        
+        =======================================================================
+        WHY A RING?
+        =======================================================================
+        
+        Debug geometry is a few KB per frame, and it used to be rewritten
+        at offset 0 of one buffer every flush. If the GPU was still drawing
+        last frame's shapes, glBufferSubData had to wait for it.
+        
+        Instead each flush_simple() writes the NEXT segment:
+        
+            [ segment 0 | segment 1 | segment 2 ]
+               drawing     drawing     writing
+        
+        and drops a fence after its draws. A segment is only reused after
+        its fence has signalled, which with three segments is normally
+        long ago - so the wait is free. glDrawArrays' `first` argument
+        selects the segment, so the attribute pointers never change.
+        
+        =======================================================================
+        PERSISTENT MAPPING
+        =======================================================================
+        
+        With glBufferStorage (GL 4.4 / ARB_buffer_storage) the ring is
+        mapped ONCE, persistently and coherently: self._simple_mapped is a
+        numpy view of GPU-visible memory and flush_simple() copies the
+        staged vertices straight into the segment, with no glBufferSubData
+        at all. Otherwise the ring is a plain GL_DYNAMIC_DRAW buffer that
+        flush_simple() fills with glBufferSubData.
+        
+        Growing creates a NEW buffer (storage from glBufferStorage is
+        immutable) and re-points the VAO at it; old fences no longer matter.
+        """
+        for fence in self._simple_fences:
+            if fence is not None:
+                glDeleteSync(fence)
+        self._simple_fences = [None] * SIMPLE_RING_SEGMENTS
+        self._simple_segment = 0
+        
+        if self.simple_vbo:
+            GLState.forget_array_buffer(self.simple_vbo)
+            glDeleteBuffers(1, [self.simple_vbo])
         self.simple_vbo = glGenBuffers(1)
-        glBindVertexArray(self.simple_vao)
         
-        # Create VBO with pre-allocated space (10MB)
-        # GL_DYNAMIC_DRAW = we'll update this frequently but also draw frequently
-        glBindBuffer(GL_ARRAY_BUFFER, self.simple_vbo)
-        glBufferData(GL_ARRAY_BUFFER, 10 * 1024 * 1024, None, GL_DYNAMIC_DRAW)
+        GLState.bind_vertex_array(self.simple_vao)
+        GLState.bind_array_buffer(self.simple_vbo)
+        
+        total = SIMPLE_RING_SEGMENTS * self._simple_segment_vertices
+        size = total * SIMPLE_VERTEX.itemsize
+        self._simple_mapped = None
+        if bool(glBufferStorage):
+            flags = GL_MAP_WRITE_BIT | GL_MAP_PERSISTENT_BIT | GL_MAP_COHERENT_BIT
+            # DYNAMIC_STORAGE keeps glBufferSubData legal if mapping fails
+            glBufferStorage(GL_ARRAY_BUFFER, size, None, flags | GL_DYNAMIC_STORAGE_BIT)
+            ptr = glMapBufferRange(GL_ARRAY_BUFFER, 0, size, flags)
+            if ptr:
+                raw = np.ctypeslib.as_array(
+                    ctypes.cast(ptr, ctypes.POINTER(ctypes.c_uint8)), shape=(size,))
+                self._simple_mapped = raw.view(SIMPLE_VERTEX)
+        else:
+            # GL_DYNAMIC_DRAW = we'll update this frequently but also draw frequently
+            glBufferData(GL_ARRAY_BUFFER, size, None, GL_DYNAMIC_DRAW)
         
         # Attribute 0: Position (vec2 at offset 0)
-        # Stride = 6 floats * 4 bytes = 24 bytes between vertices
+        # Stride = 2 shorts + 4 bytes = 8 bytes between vertices
+        stride = SIMPLE_VERTEX.itemsize
         glEnableVertexAttribArray(0)
         glVertexAttribPointer(
             0,                      # Attribute index
             2,                      # 2 components (x, y)
-            GL_FLOAT,               # Data type
-            GL_FALSE,               # Don't normalize
-            6 * 4,                  # Stride: 24 bytes to next vertex
+            GL_SHORT,               # Data type: int16
+            GL_FALSE,               # Don't normalize (pixels stay pixels)
+            stride,                 # Stride: 8 bytes to next vertex
             ctypes.c_void_p(0)      # Offset: starts at byte 0
         )
         
-        # Attribute 1: Color (vec4 at offset 8 bytes)
+        # Attribute 1: Color (vec4 at offset 4 bytes)
         glEnableVertexAttribArray(1)
         glVertexAttribPointer(
             1,                      # Attribute index
             4,                      # 4 components (r, g, b, a)
-            GL_FLOAT,               # Data type
-            GL_FALSE,               # Don't normalize
-            6 * 4,                  # Stride: 24 bytes
-            ctypes.c_void_p(8)      # Offset: 8 bytes (after x,y)
+            GL_UNSIGNED_BYTE,       # Data type: uint8
+            GL_TRUE,                # Normalize: 0-255 -> 0.0-1.0
+            stride,                 # Stride: 8 bytes
+            ctypes.c_void_p(SIMPLE_VERTEX.fields['col'][1])  # Offset: 4 bytes
         )
         
         # Unbind VAO to prevent accidental modification
-        glBindVertexArray(0)
+        GLState.bind_vertex_array(0)
 
     def _init_state(self):
         """
@@ -277,7 +483,8 @@ class OpenGLRenderer:
         - Each tile has a depth value (z-coordinate)
         - GPU automatically discards pixels that are "behind" existing pixels
         - This means we don't need to sort tiles back-to-front!
-        - GL_LESS = keep pixel if its depth is LESS than existing (closer to camera)
+        - GL_LESS = keep pixel if its window depth is LESS than existing;
+          the projection negates Z, so a HIGHER tile depth is closer to camera
         
         CULLING (disabled):
         - Face culling removes triangles facing away from camera
@@ -292,17 +499,20 @@ class OpenGLRenderer:
         - camera_x/y: World position that maps to screen center
         - camera_zoom: Scale factor (1.0 = normal, 2.0 = zoomed in 2x)
         
-        These are applied when rendering tiles in draw_batched_tiles().
+        They are folded into view_projection, the matrix the tile shader
+        receives, so tiles are uploaded in world coordinates.
         """
-        # Initialize projection matrix (updated in update_projection)
-        self.projection = np.eye(4, dtype=np.float32)
-        self.update_projection()
-        
         # Camera state - start at origin with no zoom
+        # (set before the projection, which combines them into view_projection)
         self.camera_x = 0.0
         self.camera_y = 0.0
         self.camera_zoom = 1.0
         
+        # Initialize projection matrix (updated in update_projection)
+        self.projection = np.eye(4, dtype=np.float32)
+        self._projection_size: Optional[Tuple[int, int]] = None   # (w, h) it was built for
+        self.update_projection()
+        
         # ---------------------------------------------------------------------
         # Configure OpenGL state
         # ---------------------------------------------------------------------
@@ -313,8 +523,8 @@ class OpenGLRenderer:
         
         # Enable depth testing for automatic layer ordering
         # Range -10000 to 10000 gives plenty of depth precision
-        glEnable(GL_DEPTH_TEST)
-        glDepthFunc(GL_LESS)  # Closer objects (lower depth) win
+        GLState.set_depth_test(True)
+        glDepthFunc(GL_LESS)  # Closer objects (higher depth, negated by the projection) win
         
         # Disable backface culling - not needed for 2D
         glDisable(GL_CULL_FACE)
@@ -327,9 +537,45 @@ class OpenGLRenderer:
         # Avoids re-uploading same texture to GPU multiple times
         self.texture_cache: Dict[int, Texture] = {}
         
-        # Text rendering cache - avoid re-rendering unchanged text
-        self._text_texture: Optional[Texture] = None
-        self._text_cache_key = ""  # Hash of current text content
+        # Static tile buffers: key (e.g. map chunk) -> [(texture, handle)]
+        # Uploaded once, drawn every frame (see upload_static_tiles)
+        self._static_tiles: Dict[object, List[Tuple[Texture, Tuple[int, int, int]]]] = {}
+
+    def _init_text(self):
+        """
+        Load the font and set up text rendering (see draw_text_lines).
+        
+        Loading a font is slow, so it is done once here rather than on the
+        first draw_text_lines() call - which also keeps "is it loaded yet?"
+        checks out of the per-frame text path.
+        
+        Try to use DejaVu Sans Mono (common on Linux), fall back to default.
+        """
+        try:
+            self._cached_font = ImageFont.truetype(
+                "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf", 14)
+        except:
+            # Fallback to PIL's built-in bitmap font
+            self._cached_font = ImageFont.load_default()
+        
+        # Glyph atlas: every character drawn so far, in one texture
+        self._glyph_atlas = GlyphAtlas(self._cached_font, TEXT_LINE_HEIGHT)
+        
+        # Line -> laid out (rects, uvs), least recently used first
+        self._text_cache: 'OrderedDict[str, Tuple[np.ndarray, np.ndarray]]' = OrderedDict()
+        self._text_generation = 0   # Atlas generation the cache is valid for
+        # Quads of the last text block drawn, and its (lines, x, y)
+        self._text_quads: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self._text_quads_key: Optional[Tuple] = None
+        # Buffers the quads are laid out into, reused by every layout
+        # (glyph rects/uvs grow as needed; the panel is one quad)
+        self._text_rects = np.empty((256, 4), dtype=np.float32)
+        self._text_uvs = np.empty((256, 4), dtype=np.uint16)
+        self._text_panel = np.empty((1, 4), dtype=np.float32)
+        self._text_panel_uv = np.empty((1, 4), dtype=np.uint16)
+        # FPS lines shown, refreshed every few frames
+        self._fps_lines: Tuple[str, ...] = ()
+        self._text_frame_counter = 0
 
     # =========================================================================
     # PROJECTION AND CAMERA
@@ -376,20 +622,21 @@ class OpenGLRenderer:
         --------
         4x4 numpy array (float32) - the projection matrix
         """
-        mat = np.zeros((4, 4), dtype=np.float32)
-        
-        # Scale factors - map range to [-1, 1]
-        mat[0, 0] = 2.0 / (right - left)      # X scale
-        mat[1, 1] = 2.0 / (top - bottom)      # Y scale
-        mat[2, 2] = -2.0 / (far - near)       # Z scale (negated for OpenGL convention)
-        mat[3, 3] = 1.0                        # Homogeneous coordinate
-        
-        # Translation factors - center the range
-        mat[0, 3] = -(right + left) / (right - left)    # X offset
-        mat[1, 3] = -(top + bottom) / (top - bottom)    # Y offset
-        mat[2, 3] = -(far + near) / (far - near)        # Z offset
-        
-        return mat
+        rl = right - left
+        tb = top - bottom
+        fn = far - near
+        
+        # Built as one literal rather than element by element: every
+        # mat[i, j] = ... goes through numpy's scalar indexing path.
+        # Diagonal = scale factors mapping each range to [-1, 1]
+        # (Z negated for the OpenGL convention); last column = offsets
+        # centering the range.
+        return np.array([
+            [2.0 / rl, 0.0,      0.0,       -(right + left) / rl],
+            [0.0,      2.0 / tb, 0.0,       -(top + bottom) / tb],
+            [0.0,      0.0,      -2.0 / fn, -(far + near) / fn],
+            [0.0,      0.0,      0.0,       1.0],
+        ], dtype=np.float32)
 
     def update_projection(self):
         """
@@ -403,12 +650,74 @@ class OpenGLRenderer:
         
         This gives us a coordinate system where (0,0) is top-left,
         which is standard for 2D graphics and matches how TMX maps work.
+        
+        Does nothing if the screen size hasn't changed since the last
+        call: the matrix would come out identical, and rebuilding it would
+        force a re-upload to every shader.
         """
+        size = (self.screen_width, self.screen_height)
+        if size == self._projection_size:
+            return
+        self._projection_size = size
+        
         self.projection = self._ortho_matrix(
             0, self.screen_width,           # X range: 0 to width
             self.screen_height, 0,          # Y range: height to 0 (Y-down!)
             -10000, 10000                   # Z range: large range for many layers
         )
+        
+        # OpenGL wants column-major, numpy is row-major. Rather than keep
+        # a transposed copy, the matrices are uploaded as-is (contiguous,
+        # row-major) with transpose=GL_TRUE and the driver reorders them.
+        self._matrix_current.clear()
+        self._update_view_projection()
+
+    def _update_view_projection(self):
+        """
+        Combine the camera with the projection into view_projection.
+        
+        =======================================================================
+        CAMERA ON THE GPU
+        =======================================================================
+        
+        screen_pos = (world_pos - camera_pos) * zoom is an affine transform,
+        so it fits in a 4x4 matrix:
+        
+            view = | zoom  0    0  -cam_x*zoom |
+                   |  0   zoom  0  -cam_y*zoom |
+                   |  0    0    1       0      |
+                   |  0    0    0       1      |
+        
+        view_projection = projection @ view is computed once per camera
+        change (16 multiply-adds) instead of transforming every tile on the
+        CPU every frame. Depth (Z) passes through untouched.
+        
+        Screen-space drawing (text, debug shapes) keeps using projection.
+        """
+        zoom = self.camera_zoom
+        view = np.array([
+            [zoom, 0.0,  0.0, -self.camera_x * zoom],
+            [0.0,  zoom, 0.0, -self.camera_y * zoom],
+            [0.0,  0.0,  1.0, 0.0],
+            [0.0,  0.0,  0.0, 1.0],
+        ], dtype=np.float32)
+        self.view_projection = np.dot(self.projection, view)
+        self._matrix_current.discard(self.instanced_shader)
+
+    def _set_matrix(self, program: int, loc: int, matrix: np.ndarray):
+        """
+        Activate `program` and upload its projection uniform if stale.
+        
+        The matrices only change on resize or camera movement, but several
+        draw calls per frame use each program. The upload is skipped while
+        the program still holds the current matrix (dirty flag per program,
+        reset by update_projection/_update_view_projection).
+        """
+        GLState.use_program(program)
+        if program not in self._matrix_current:
+            # Row-major, so transpose=GL_TRUE (OpenGL expects column-major)
+            glUniformMatrix4fv(loc, 1, GL_TRUE, matrix)
+            self._matrix_current.add(program)
 
     # =========================================================================
     # TEXTURE MANAGEMENT
@@ -432,6 +741,16 @@ class OpenGLRenderer:
         In practice, most tiles share a small number of tileset textures,
         so this cache is very effective.
         
+        =======================================================================
+        WHY NO SIZE LIMIT?
+        =======================================================================
+        
+        Map tiles are packed into atlas pages; only tiles too big for a
+        page get a texture here, a handful per map. TilesetRenderer and the
+        static tile buffers hold on to each of them for the map's whole
+        life, so dropping one from this cache would free no GPU memory,
+        and preloading that GID again would upload a second copy.
+        
         Parameters:
         -----------
         gid : int
@@ -443,10 +762,17 @@ class OpenGLRenderer:
         --------
         Texture object (either cached or newly created)
         """
-        if gid not in self.texture_cache:
-            # Convert PIL image to OpenGL texture and cache it
-            self.texture_cache[gid] = Texture.from_pil(image)
-        return self.texture_cache[gid]
+        texture = self.texture_cache.get(gid)
+        if texture is not None:
+            return texture
+
+        # Convert PIL image to OpenGL texture and cache it. One tile per
+        # texture, so mip levels are safe (see Texture, MIPMAPS). Map tiles
+        # normally live in atlas pages, which have no mips; only tiles too
+        # big for a page come through here (TilesetRenderer._build_atlas)
+        texture = Texture.from_pil(image, mipmaps=True)
+        self.texture_cache[gid] = texture
+        return texture
 
     # =========================================================================
     # CAMERA CONTROL
@@ -463,12 +789,13 @@ class OpenGLRenderer:
         zoom : float
             Zoom factor (1.0 = normal, 2.0 = zoomed in, 0.5 = zoomed out)
             
-        Note: Camera transform is applied in draw_batched_tiles(), not here.
-        This just stores the values.
+        Note: The camera is not applied to tiles on the CPU. It is folded
+        into view_projection here, and the tile shader applies it.
         """
         self.camera_x = x
         self.camera_y = y
         self.camera_zoom = zoom
+        self._update_view_projection()
 
     # =========================================================================
     # FRAME MANAGEMENT
@@ -524,16 +851,12 @@ class OpenGLRenderer:
         =======================================================================
         
         1. Activate the textured shader program
-        2. Send projection matrix to GPU
+        2. Send projection matrix to GPU (only if it changed, see _set_matrix)
         3. For each texture:
-           a. Bind the texture
-           b. Begin batch accumulation
-           c. For each tile using this texture:
-              - Transform world coords to screen coords (apply camera)
-              - Add to batch
-              - If batch full, flush and continue
-           d. Flush remaining sprites
-        4. Deactivate shader
+           a. Pack its tiles into one instance record array (world coords)
+           b. Drop the rows outside the visible world rectangle
+        4. Upload every texture's rows at once and draw each texture's
+           range with one instanced call (see InstancedBatch.draw_many)
         
         =======================================================================
         CAMERA TRANSFORMATION
@@ -544,6 +867,10 @@ class OpenGLRenderer:
         
         This centers the view on camera_x, camera_y and scales by zoom factor.
         
+        It happens in the vertex shader: the camera is part of the
+        view_projection matrix uploaded below, so tile data goes to the
+        GPU exactly as the caller built it.
+        
         Parameters:
         -----------
         tile_batches : Dict[Texture, List[Tuple]]
@@ -552,64 +879,202 @@ class OpenGLRenderer:
             - x, y: World position
             - width, height: Tile size in world units
             - depth: Z-depth for layer ordering
+            optionally followed by a UV rect (u_left, v_top, u_right,
+            v_bottom) when the texture is an atlas (see AtlasBuilder).
+            Tiles of one texture must all use the same form.
         """
-        # Activate textured shader program
-        glUseProgram(self.shader_program)
-        
-        # Send projection matrix to GPU
-        # Note: .T transposes because OpenGL expects column-major order
-        glUniformMatrix4fv(self.proj_loc, 1, GL_FALSE, self.projection.T)
-        
-        # Tell shader to use texture unit 0
-        glUniform1i(self.tex_loc, 0)
+        # Activate instanced tile shader program and send camera +
+        # projection matrix to GPU (both skipped if already current)
+        self._set_matrix(self.instanced_shader, self.instanced_proj_loc,
+                         self.view_projection)
+        GLState.set_depth_test(True)   # Tiles are ordered by depth
+
+        # Visible world rectangle, for culling
+        view_min_x, view_min_y, view_max_x, view_max_y = self.visible_world_rect()
 
-        # Render each texture batch
+        # Cull each texture batch, then draw them all from one upload
+        visible_batches = []
         for texture, tiles in tile_batches.items():
-            if not tiles:
+            if len(tiles) == 0:
                 continue  # Skip empty batches
 
-            # Begin accumulating sprites for this texture
-            # This binds the texture to unit 0
-            self.batch.begin(texture)
-            
-            for x, y, w, h, depth in tiles:
-                # ---------------------------------------------------------
-                # CAMERA TRANSFORMATION
-                # ---------------------------------------------------------
-                # Convert world coordinates to screen coordinates:
-                # 1. Subtract camera position (translate)
-                # 2. Multiply by zoom (scale)
-                screen_x = (x - self.camera_x) * self.camera_zoom
-                screen_y = (y - self.camera_y) * self.camera_zoom
-                screen_w = w * self.camera_zoom
-                screen_h = h * self.camera_zoom
-
-                # Add sprite to batch
-                self.batch.add_sprite(screen_x, screen_y, screen_w, screen_h, depth)
-
-                # ---------------------------------------------------------
-                # BATCH OVERFLOW HANDLING
-                # ---------------------------------------------------------
-                # If batch is nearly full, flush it and start fresh.
-                # The "-1" ensures we don't overflow on the next add.
-                if self.batch.sprite_count >= self.batch.max_sprites - 1:
-                    self.batch.flush()
-                    self.batch.begin(texture)
-
-            # Flush remaining sprites in this batch
-            self.batch.flush()
-
-        # Deactivate shader (good practice to avoid state leakage)
-        glUseProgram(0)
+            # -----------------------------------------------------------------
+            # FRUSTUM CULLING
+            # -----------------------------------------------------------------
+            # Keep only rows whose rect overlaps the view. One vectorized
+            # test per batch; boolean indexing returns a contiguous copy,
+            # ready to upload.
+            records = _instance_records(tiles)
+            arr = records['rect']
+            mask = ((arr[:, 0] + arr[:, 2] >= view_min_x) & (arr[:, 0] <= view_max_x) &
+                    (arr[:, 1] + arr[:, 3] >= view_min_y) & (arr[:, 1] <= view_max_y))
+            visible_batches.append((texture, records[mask]))
+
+        # ---------------------------------------------------------------------
+        # INSTANCED DRAW
+        # ---------------------------------------------------------------------
+        # World-space rows ARE the instance records: one upload for all
+        # textures, one draw call per texture (see InstancedBatch.draw_many).
+        self.instanced_batch.draw_many(visible_batches)
+
+    def visible_world_rect(self) -> Tuple[float, float, float, float]:
+        """
+        World-space rectangle currently on screen.
+        
+        The camera maps (camera_x, camera_y) to the screen origin and
+        scales by zoom, so the screen covers screen_size / zoom world units.
+        
+        Returns:
+        --------
+        (min_x, min_y, max_x, max_y)
+        """
+        zoom = self.camera_zoom
+        return (self.camera_x, self.camera_y,
+                self.camera_x + self.screen_width / zoom,
+                self.camera_y + self.screen_height / zoom)
+
+    # =========================================================================
+    # STATIC TILE RENDERING
+    # =========================================================================
+
+    def upload_static_tiles(self, key, tile_batches: Dict[Texture, List[Tuple]]):
+        """
+        Upload tiles once into GPU buffers kept under `key`.
+        
+        =======================================================================
+        WHEN TO USE
+        =======================================================================
+        
+        draw_batched_tiles() uploads its tiles every call. For map tiles
+        that never change, upload them here once (e.g. one key per map
+        chunk) and draw them each frame with draw_static_tiles(), which
+        does no per-tile CPU work. Since the camera is in view_projection,
+        the world-space data stays valid while the camera moves.
+        
+        Uploading to an existing key replaces its buffers. Call
+        clear_static_tiles() when the map content or the view changes.
+        
+        Parameters:
+        -----------
+        key : hashable
+            Any identifier chosen by the caller
+        tile_batches : Dict[Texture, List[Tuple]]
+            Same format as draw_batched_tiles (world coordinates)
+        """
+        self.delete_static_tiles(key)
+        self._static_tiles[key] = [
+            (texture, self.instanced_batch.create_static(
+                _instance_records(tiles)))
+            for texture, tiles in tile_batches.items() if len(tiles)
+        ]
+
+    def has_static_tiles(self, key) -> bool:
+        """True if upload_static_tiles() was called for key"""
+        return key in self._static_tiles
+
+    def delete_static_tiles(self, key):
+        """Free the buffers of one key (no-op if absent)"""
+        for _, static in self._static_tiles.pop(key, ()):
+            self.instanced_batch.delete_static(static)
+
+    def clear_static_tiles(self):
+        """Free every static tile buffer"""
+        for key in list(self._static_tiles):
+            self.delete_static_tiles(key)
+
+    def draw_static_tiles(self, keys):
+        """
+        Draw previously uploaded static tiles.
+        
+        Parameters:
+        -----------
+        keys : Iterable
+            Keys to draw (unknown keys are skipped)
+        """
+        self._set_matrix(self.instanced_shader, self.instanced_proj_loc,
+                         self.view_projection)
+        GLState.set_depth_test(True)   # Tiles are ordered by depth
+
+        for key in keys:
+            for texture, static in self._static_tiles.get(key, ()):
+                self.instanced_batch.draw_static(texture, static)
+
+    # =========================================================================
+    # SPRITE RENDERING
+    # =========================================================================
+
+    def begin_sprites(self, texture):
+        """
+        Start a sprite batch (self.batch) in screen coordinates.
+        
+        Activates the sprite program matching the texture - the array
+        program for a TextureArray, whose sprites pick their layer (see
+        SpriteBatch, TEXTURE ARRAYS) - and calls batch.begin(texture).
+        Add sprites to self.batch and flush() it as usual.
+        
+        Parameters:
+        -----------
+        texture : Texture or TextureArray
+        """
+        if isinstance(texture, TextureArray):
+            self._set_matrix(self.array_shader_program, self.array_proj_loc,
+                             self.projection)
+        else:
+            self._set_matrix(self.shader_program, self.proj_loc, self.projection)
+        self.batch.begin(texture)
 
     # =========================================================================
     # DEBUG RENDERING (Lines and Rectangles)
     # =========================================================================
 
+    def _stage(self, kind: str, count: int) -> np.ndarray:
+        """
+        Reserve `count` vertices at the end of a staging array.
+        
+        Parameters:
+        -----------
+        kind : str
+            'tris' or 'lines'
+        count : int
+            Number of vertices to reserve
+        
+        Returns:
+        --------
+        Writable SIMPLE_VERTEX view of the reserved slots
+        """
+        used = self._simple_used[kind]
+        staging = self._simple_staging[kind]
+        if used + count > len(staging):
+            # Grow to the next power of two, keeping what's queued
+            grown = np.empty(1 << (used + count - 1).bit_length(), dtype=SIMPLE_VERTEX)
+            grown[:used] = staging[:used]
+            self._simple_staging[kind] = staging = grown
+            self._simple_staging_ptrs[kind] = ctypes.c_void_p(grown.ctypes.data)
+        self._simple_used[kind] = used + count
+        return staging[used:used + count]
+
+    def color_row(self, color: Tuple[int, ...]) -> np.ndarray:
+        """
+        RGB or RGBA color (0-255) as a cached uint8 RGBA array.
+        
+        The same few colors are used over and over (grid, collision boxes),
+        so each is converted once; assigning the array to vertices['col']
+        is then a plain broadcast copy, with no tuple-to-array conversion.
+        
+        Also handy for callers building per-rect color arrays for
+        draw_rects(). The returned array is shared: don't modify it.
+        """
+        row = self._color_cache.get(color)
+        if row is None:
+            row = np.array((*color[:3], color[3] if len(color) > 3 else 255),
+                           dtype=np.uint8)
+            self._color_cache[color] = row
+        return row
+
     def draw_lines(self, lines: List[Tuple[float, float, float, float]], 
                    color: Tuple[int, int, int]):
         """
-        Draw multiple lines in one call.
+        Queue multiple lines (drawn by flush_simple()).
         
         =======================================================================
         USE CASES
@@ -632,57 +1097,40 @@ class OpenGLRenderer:
         
         Parameters:
         -----------
-        lines : List[Tuple[float, float, float, float]]
-            List of line segments, each as (x1, y1, x2, y2)
+        lines : List[Tuple[float, float, float, float]] or np.ndarray
+            List of line segments, each as (x1, y1, x2, y2), or an (N, 4)
+            array
         color : Tuple[int, int, int]
             RGB color (0-255 range)
         """
-        if not lines:
+        if len(lines) == 0:
             return
 
-        # Convert color from 0-255 to 0.0-1.0 (OpenGL convention)
-        r, g, b = color[0]/255.0, color[1]/255.0, color[2]/255.0
-        
         # Build vertex array
-        # Format: [x1, y1, r, g, b, a, x2, y2, r, g, b, a, ...]
-        vertices = []
-        for x1, y1, x2, y2 in lines:
-            # Start point
-            vertices.extend([x1, y1, r, g, b, 1.0])
-            # End point
-            vertices.extend([x2, y2, r, g, b, 1.0])
-
-        vertices = np.array(vertices, dtype=np.float32)
-
-        # ---------------------------------------------------------------------
-        # RENDER PIPELINE
-        # ---------------------------------------------------------------------
-        
-        # 1. Activate simple (non-textured) shader
-        glUseProgram(self.simple_shader)
-        
-        # 2. Send projection matrix
-        glUniformMatrix4fv(self.simple_proj_loc, 1, GL_FALSE, self.projection.T)
-        
-        # 3. Upload vertex data to GPU
-        # glBufferSubData updates part of an existing buffer (faster than recreating)
-        glBindBuffer(GL_ARRAY_BUFFER, self.simple_vbo)
-        glBufferSubData(GL_ARRAY_BUFFER, 0, vertices.nbytes, vertices)
-        
-        # 4. Bind VAO (contains vertex format configuration)
-        glBindVertexArray(self.simple_vao)
-        
-        # 5. Draw! 2 vertices per line
-        glDrawArrays(GL_LINES, 0, len(lines) * 2)
-        
-        # 6. Cleanup
-        glBindVertexArray(0)
-        glUseProgram(0)
+        # Positions are rounded to whole pixels and clamped to int16 range
+        # (anything that far out is off-screen anyway). The 0-255 color is
+        # stored as-is; the GPU normalizes it.
+        lines = np.asarray(lines, dtype=np.float32).reshape(-1, 4)
+        # Staged for flush_simple(), which draws all debug geometry at once
+        vertices = self._stage('lines', len(lines) * 2)
+        if pack_lines is not None:
+            # Compiled (Numba): one pass straight into the staging array,
+            # through plain int16/uint8 views of its position/color bytes
+            pack_lines(lines, self.color_row(color)[None, :],
+                       vertices.view(np.int16).reshape(-1, 4),
+                       vertices.view(np.uint8).reshape(-1, 8))
+            return
+        # Each (x1, y1, x2, y2) row becomes two (x, y) points, written with
+        # slice assignments (no Python loop)
+        points = np.rint(lines.reshape(-1, 2))
+        np.clip(points, _INT16_MIN, _INT16_MAX, out=points)
+        vertices['pos'] = points
+        vertices['col'] = self.color_row(color)
 
     def draw_rects(self, rects: List[Tuple[float, float, float, float]],
                    color: Tuple[int, int, int, int]):
         """
-        Draw multiple filled rectangles with alpha.
+        Queue multiple filled rectangles with alpha (drawn by flush_simple()).
         
         =======================================================================
         USE CASES
@@ -721,49 +1169,128 @@ class OpenGLRenderer:
         
         Parameters:
         -----------
-        rects : List[Tuple[float, float, float, float]]
-            List of rectangles as (x, y, width, height)
-        color : Tuple[int, int, int, int]
-            RGBA color (0-255 range) - includes alpha for transparency
+        rects : List[Tuple[float, float, float, float]] or np.ndarray
+            List of rectangles as (x, y, width, height), or an (N, 4) array
+        color : Tuple[int, int, int, int] or np.ndarray
+            RGBA color (0-255 range) - includes alpha for transparency.
+            An (N, 4) uint8 array gives each rectangle its own color, so
+            differently colored overlays can be queued in one call.
         """
-        if not rects:
+        if len(rects) == 0:
             return
         
-        # Convert color from 0-255 to 0.0-1.0
-        r, g, b, a = color[0]/255.0, color[1]/255.0, color[2]/255.0, color[3]/255.0
-        
-        vertices = []
-        for x, y, w, h in rects:
-            # Triangle 1: top-left -> top-right -> bottom-right
-            vertices.extend([x, y, r, g, b, a])              # Top-left
-            vertices.extend([x + w, y, r, g, b, a])          # Top-right
-            vertices.extend([x + w, y + h, r, g, b, a])      # Bottom-right
-            
-            # Triangle 2: top-left -> bottom-right -> bottom-left
-            vertices.extend([x, y, r, g, b, a])              # Top-left
-            vertices.extend([x + w, y + h, r, g, b, a])      # Bottom-right
-            vertices.extend([x, y + h, r, g, b, a])          # Bottom-left
+        r = np.asarray(rects, dtype=np.float32).reshape(-1, 4)
+        
+        # Staged for flush_simple(), which draws all debug geometry at once
+        # (color stays 0-255, see draw_lines)
+        vertices = self._stage('tris', len(r) * 6)
+        if pack_rects is not None:
+            # Compiled (Numba), as in draw_lines
+            colors = color if isinstance(color, np.ndarray) else self.color_row(color)[None, :]
+            pack_rects(r, colors,
+                       vertices.view(np.int16).reshape(-1, 4),
+                       vertices.view(np.uint8).reshape(-1, 8))
+            return
         
-        vertices = np.array(vertices, dtype=np.float32)
+        # All rectangles at once, no Python loop: the 4 edges of each
+        # rectangle are rounded/clamped (4 values instead of 12 corner
+        # coordinates), then ONE gather through the fixed corner template
+        # gives the (N, 6, 2) vertex positions
+        edges = np.empty((len(r), 4), dtype=np.float32)
+        edges[:, 0:2] = r[:, 0:2]                  # left, top
+        edges[:, 2:4] = r[:, 0:2] + r[:, 2:4]      # right, bottom
+        np.rint(edges, out=edges)
+        np.clip(edges, _INT16_MIN, _INT16_MAX, out=edges)
+        vertices['pos'] = edges[:, _RECT_CORNERS].reshape(-1, 2)
+        if isinstance(color, np.ndarray):
+            vertices['col'] = np.repeat(color, 6, axis=0)   # One per corner
+        else:
+            vertices['col'] = self.color_row(color)
+
+    def flush_simple(self):
+        """
+        Draw every queued line and rectangle.
         
-        # Render pipeline (same as draw_lines but with triangles)
-        glUseProgram(self.simple_shader)
-        glUniformMatrix4fv(self.simple_proj_loc, 1, GL_FALSE, self.projection.T)
-        glBindBuffer(GL_ARRAY_BUFFER, self.simple_vbo)
-        glBufferSubData(GL_ARRAY_BUFFER, 0, vertices.nbytes, vertices)
-        glBindVertexArray(self.simple_vao)
+        =======================================================================
+        WHY QUEUE?
+        =======================================================================
         
-        # IMPORTANT: Disable depth test so UI draws on top of everything
-        glDisable(GL_DEPTH_TEST)
+        draw_lines()/draw_rects() are often called several times per frame
+        (one call per color, per level...). Drawing each call on its own
+        means: bind shader, upload projection, upload VBO, bind VAO, draw,
+        unbind - over and over for the same shader.
         
-        # Draw! 6 vertices per rectangle
-        glDrawArrays(GL_TRIANGLES, 0, len(rects) * 6)
+        Instead they only stage vertices (see _stage), and this method:
+        1. Uploads the staged triangles and lines back to back into the
+           next segment of the VBO ring (see _allocate_simple_ring),
+           straight from the staging arrays - no concatenation copy
+        2. Binds shader/projection/VAO ONCE
+        3. Issues one glDrawArrays for all triangles (depth test off, so
+           rectangles stay on top) and one for all lines
         
-        # Re-enable depth test for subsequent rendering
-        glEnable(GL_DEPTH_TEST)
+        Rectangles are drawn before lines, so a line is never hidden by a
+        rectangle queued later in the same frame.
         
-        glBindVertexArray(0)
-        glUseProgram(0)
+        Called by draw_text_lines() (so text stays on top of debug shapes);
+        call it yourself after the last debug draw if no text follows.
+        =======================================================================
+        """
+        tri_count = self._simple_used['tris']
+        line_count = self._simple_used['lines']
+        total = tri_count + line_count
+        if not total:
+            return
+
+        self._set_matrix(self.simple_shader, self.simple_proj_loc, self.projection)
+        GLState.bind_array_buffer(self.simple_vbo)
+
+        if total > self._simple_segment_vertices:
+            # Rare frame with a lot of debug geometry: grow the segments
+            self._simple_segment_vertices = 1 << (total - 1).bit_length()
+            self._allocate_simple_ring()
+
+        # Claim the next segment, once the GPU is done with it
+        segment = self._simple_segment
+        fence = self._simple_fences[segment]
+        if fence is not None:
+            glClientWaitSync(fence, GL_SYNC_FLUSH_COMMANDS_BIT, 1_000_000_000)
+            glDeleteSync(fence)
+        first = segment * self._simple_segment_vertices
+
+        if self._simple_mapped is not None:
+            # Persistently mapped: plain memory copies into the segment
+            mapped = self._simple_mapped
+            mapped[first:first + tri_count] = self._simple_staging['tris'][:tri_count]
+            mapped[first + tri_count:first + total] = self._simple_staging['lines'][:line_count]
+        else:
+            # Upload from the staging memory by raw pointer: no temporary
+            # array, and PyOpenGL skips its array conversion (pointers
+            # cached by _stage, nothing allocated here)
+            size = SIMPLE_VERTEX.itemsize
+            offset = first * size
+            for kind, count in (('tris', tri_count), ('lines', line_count)):
+                if count:
+                    glBufferSubData(GL_ARRAY_BUFFER, offset, count * size,
+                                    self._simple_staging_ptrs[kind])
+                    offset += count * size
+        GLState.bind_vertex_array(self.simple_vao)
+
+        if tri_count:
+            # IMPORTANT: Disable depth test so rectangles draw on top
+            GLState.set_depth_test(False)
+            glDrawArrays(GL_TRIANGLES, first, tri_count)
+
+        if line_count:
+            # Lines keep depth testing against the scene
+            GLState.set_depth_test(True)
+            glDrawArrays(GL_LINES, first + tri_count, line_count)
+
+        self._simple_fences[segment] = glFenceSync(GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+        self._simple_segment = (segment + 1) % SIMPLE_RING_SEGMENTS
+
+        # Everything is on the GPU - the staging arrays can be refilled
+        self._simple_used['tris'] = 0
+        self._simple_used['lines'] = 0
 
     # =========================================================================
     # TEXT RENDERING
@@ -771,7 +1298,7 @@ class OpenGLRenderer:
 
     def draw_text_lines(self, text_lines: List[str], x: int, y: int):
         """
-        Draw text using PIL-rendered texture (optimized).
+        Draw text from a glyph atlas (optimized).
         
         =======================================================================
         WHY PIL FOR TEXT?
@@ -782,32 +1309,34 @@ class OpenGLRenderer:
         2. Signed distance field fonts (complex but scalable)
         3. System font rendering (PIL, FreeType, etc.)
         
-        We use PIL because:
+        We combine 1 and 3: PIL rasterizes each character of a system font
+        ONCE into a shared glyph atlas (see GlyphAtlas), which then works
+        like a bitmap font:
         - Simple to implement
         - No additional dependencies (PIL already used for images)
         - Good enough for debug/UI text
         - Handles any system font
         
         =======================================================================
-        CACHING OPTIMIZATION
+        WHY NOT RENDER THE WHOLE BLOCK?
         =======================================================================
         
-        Text rendering is expensive:
-        1. PIL renders text to image (CPU)
-        2. Image uploaded to GPU texture
-        3. Texture drawn as quad
+        Rendering the whole text block into an image means, for ANY change:
+        1. PIL renders every line again (CPU)
+        2. A new 350xN texture is uploaded to the GPU
         
-        If we did this every frame, performance would suffer.
+        With the atlas a text change only changes quads: one per visible
+        character, plus one for the background panel (drawn with the
+        atlas's solid white cell, tinted). Everything goes out in a single
+        draw call, and the cost no longer depends on how much of the text
+        changed.
         
-        SOLUTION: Cache the rendered texture!
-        - Only re-render if text content changes
-        - FPS counter changes every frame, but we skip FPS lines when
-          checking if cache is valid
-        - Update FPS display every 6 frames (~10Hz) - fast enough to be
-          useful, slow enough to not hurt performance
+        Each line's quads are laid out once and kept in an LRU cache
+        (_text_cache), so unchanged lines don't even walk their characters.
         
-        _text_frame_counter tracks frames since last update.
-        _text_cache_key stores hash of non-FPS text content.
+        The FPS lines are still only refreshed every 6 frames (~10Hz):
+        numbers changing every frame would be unreadable.
+        _text_frame_counter tracks frames since the last FPS update.
         
         =======================================================================
         
@@ -818,98 +1347,137 @@ class OpenGLRenderer:
         x, y : int
             Screen position (top-left of text block)
         """
+        # Debug shapes queued so far go first, so the text ends up on top
+        self.flush_simple()
+        
         # ---------------------------------------------------------------------
-        # CACHE INVALIDATION LOGIC
+        # FPS lines (change constantly) first, then the other text
         # ---------------------------------------------------------------------
+        fps_lines = tuple(l for l in text_lines if l.startswith("FPS:"))
+        base_lines = tuple(l for l in text_lines if not l.startswith("FPS:"))
         
-        # Separate FPS line (changes constantly) from other text (changes rarely)
-        # FPS lines start with "FPS:" prefix
-        base_lines = [l for l in text_lines if not l.startswith("FPS:")]
-        cache_key = "|".join(base_lines)
+        self._text_frame_counter += 1
+        if (len(fps_lines) != len(self._fps_lines) or
+                self._text_frame_counter >= 6):
+            self._text_frame_counter = 0
+            self._fps_lines = fps_lines
         
-        # Initialize frame counter if not exists
-        self._text_frame_counter = getattr(self, '_text_frame_counter', 0) + 1
+        lines = self._fps_lines + base_lines
+        if not lines:
+            return
         
-        # Decide if we need to re-render the text texture
-        needs_update = (
-            cache_key != self._text_cache_key or     # Text content changed
-            self._text_texture is None or            # No cached texture
-            self._text_frame_counter >= 6            # Time to update FPS (~10 Hz)
-        )
+        glyphs = self._glyph_atlas
         
-        if needs_update:
-            self._text_frame_counter = 0
-            self._text_cache_key = cache_key
-            
-            # Import here to avoid circular imports and startup cost
-            from PIL import ImageDraw, ImageFont
-            
-            # -----------------------------------------------------------------
-            # FONT LOADING (cached)
-            # -----------------------------------------------------------------
-            # Loading fonts is slow, so we cache the font object.
-            # Try to use DejaVu Sans Mono (common on Linux), fall back to default.
-            if not hasattr(self, '_cached_font'):
-                try:
-                    self._cached_font = ImageFont.truetype(
-                        "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf", 14)
-                except:
-                    # Fallback to PIL's built-in bitmap font
-                    self._cached_font = ImageFont.load_default()
-            
-            # -----------------------------------------------------------------
-            # TEXT IMAGE CREATION
-            # -----------------------------------------------------------------
-            line_height = 18  # Pixels per line
-            max_width = 350   # Fixed width for text background
-            total_height = len(text_lines) * line_height + 10  # +10 for padding
-            
-            # Create image with semi-transparent black background
-            # RGBA mode: (R, G, B, A) where A=180 gives ~70% opacity
-            img = Image.new('RGBA', (max_width, total_height), (0, 0, 0, 180))
-            draw = ImageDraw.Draw(img)
-            
-            # Draw each line of text
-            for i, line in enumerate(text_lines):
-                draw.text(
-                    (5, 5 + i * line_height),  # Position with 5px padding
-                    line, 
-                    font=self._cached_font, 
-                    fill=(255, 255, 255, 255)  # White, fully opaque
-                )
-            
-            # Convert PIL image to OpenGL texture
-            # add_border=False because text doesn't need edge bleed prevention
-            self._text_texture = Texture.from_pil(img, add_border=False)
+        # Same text at the same place as last frame (the usual case - the
+        # FPS lines only change every 6 frames): reuse last frame's quads.
+        # Comparing the tuples is cheap: equal lines are mostly the very
+        # same string objects, and `is` is checked before the characters.
+        key = (lines, x, y)
+        if key != self._text_quads_key:
+            self._text_quads = self._layout_text(lines, x, y, glyphs)
+            self._text_quads_key = key
         
         # ---------------------------------------------------------------------
-        # RENDER TEXT TEXTURE
+        # RENDER: panel + glyphs, one texture
         # ---------------------------------------------------------------------
+        # Disable depth test so text always appears on top (and leave it
+        # off: whatever draws next and needs it turns it back on)
+        GLState.set_depth_test(False)
+        
+        # depth=9999 is a high value (far from camera in our inverted system)
+        # but it doesn't matter since depth testing is disabled
+        self.begin_sprites(glyphs.texture)
+        for quads, quad_uvs, color in self._text_quads:
+            done = 0
+            while done < len(quads):
+                done += self.batch.add_quads(quads[done:], quad_uvs[done:],
+                                             color, depth=9999)
+                if done < len(quads):
+                    self.batch.flush()   # Batch full
+        self.batch.flush()
+
+    def _layout_text(self, lines: Tuple[str, ...], x: int, y: int,
+                     glyphs: GlyphAtlas) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Quads of a text block: the panel, then one per visible character.
         
-        if self._text_texture:
-            glUseProgram(self.shader_program)
-            glUniformMatrix4fv(self.proj_loc, 1, GL_FALSE, self.projection.T)
-            glUniform1i(self.tex_loc, 0)
-            
-            # Disable depth test so text always appears on top
-            glDisable(GL_DEPTH_TEST)
-            
-            # Draw as single sprite
-            # depth=9999 is a high value (far from camera in our inverted system)
-            # but it doesn't matter since depth testing is disabled
-            # border=0 because text texture has no border padding
-            self.batch.begin(self._text_texture)
-            self.batch.add_sprite(
-                x, y, 
-                self._text_texture.width, self._text_texture.height, 
-                depth=9999, 
-                border=0
-            )
-            self.batch.flush()
-            
-            # Re-enable depth test
-            glEnable(GL_DEPTH_TEST)
-            glUseProgram(0)
+        Returns:
+        --------
+        [(rects, uvs, color), ...] : arguments for SpriteBatch.add_quads
+        """
+        # ---------------------------------------------------------------------
+        # LAYOUT: one quad per visible character
+        # ---------------------------------------------------------------------
+        # Twice if the atlas fills up (and is cleared) during the layout
+        for _ in range(2):
+            if self._text_generation != glyphs.generation:
+                # Atlas was cleared - cached UVs point at other glyphs now
+                self._text_cache.clear()
+                self._text_generation = glyphs.generation
+            layouts = [self._layout_text_line(line, glyphs) for line in lines]
+            if self._text_generation == glyphs.generation:
+                break
+        
+        glyphs.upload()   # Glyphs first seen this frame
+        
+        # Into the reused text buffers (grown as needed) - the previous
+        # layout is no longer drawn, so its quads can be overwritten
+        counts = [len(line_rects) for line_rects, _ in layouts]
+        total = sum(counts)
+        if total > len(self._text_rects):
+            size = 1 << (total - 1).bit_length()
+            self._text_rects = np.empty((size, 4), dtype=np.float32)
+            self._text_uvs = np.empty((size, 4), dtype=np.uint16)
+        rects = self._text_rects[:total]
+        uvs = self._text_uvs[:total]
+        np.concatenate([line_rects for line_rects, _ in layouts], out=rects)
+        np.concatenate([line_uvs for _, line_uvs in layouts], out=uvs)
+        rects[:, 0] += x + TEXT_PADDING
+        rects[:, 1] += y + TEXT_PADDING + np.repeat(
+            np.arange(len(lines), dtype=np.float32) * TEXT_LINE_HEIGHT, counts)
+        
+        # Semi-transparent black panel behind the text (A=180: ~70% opacity)
+        panel = self._text_panel
+        panel[0] = (x, y, TEXT_PANEL_WIDTH,
+                    len(lines) * TEXT_LINE_HEIGHT + 2 * TEXT_PADDING)
+        panel_uv = self._text_panel_uv
+        panel_uv[0] = pack_uvs(glyphs.white_uv)
+        
+        return [(panel, panel_uv, TEXT_PANEL_COLOR),
+                (rects, uvs, TEXT_COLOR)]
+
+    def _layout_text_line(self, line: str,
+                          glyphs: GlyphAtlas) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Quads of one line of text, relative to the line's top-left corner.
+        
+        Returns:
+        --------
+        (rects, uvs) : (N, 4) arrays for SpriteBatch.add_quads - float32
+            rects, uint16 UVs (pack_uvs, converted once here) - one row
+            per visible character. Cached per line (LRU).
+        """
+        layout = self._text_cache.get(line)
+        if layout is not None:
+            self._text_cache.move_to_end(line)
+            return layout
+        
+        rects = []
+        uvs = []
+        pen = 0
+        for char in line:
+            advance, uv = glyphs.glyph(char)
+            if uv is not None:
+                rects.append((pen, 0, advance, TEXT_LINE_HEIGHT))
+                uvs.append(uv)
+            pen += advance
+        
+        layout = (np.array(rects, dtype=np.float32).reshape(-1, 4),
+                  pack_uvs(np.array(uvs, dtype=np.float32).reshape(-1, 4)))
+        self._text_cache[line] = layout
+        if len(self._text_cache) > TEXT_CACHE_SIZE:
+            self._text_cache.popitem(last=False)
+        return layout
 
     # =========================================================================
     # WINDOW MANAGEMENT
@@ -929,6 +1497,10 @@ class OpenGLRenderer:
         width, height : int
             New window dimensions in pixels
         """
+        # Some window managers send resize events without a size change
+        if (width, height) == (self.screen_width, self.screen_height):
+            return
+        
         self.screen_width = width
         self.screen_height = height
         
@@ -29,29 +29,71 @@ HOW THIS CLASS WORKS
 =============================================================================
 
 1. Call begin(texture) - Sets which texture to use, resets counter
-2. Call add_sprite() multiple times - Accumulates vertex data in CPU array
+2. Call add_sprite() multiple times - Accumulates sprite data in CPU arrays
 3. Call flush() - Uploads data to GPU and issues single draw call
 
-The vertex data stays in a CPU-side numpy array until flush(), when it's
+The sprite data stays in CPU-side numpy arrays until flush(), when it's
 sent to the GPU all at once. This is more efficient than many small uploads.
 
 =============================================================================
 MEMORY LAYOUT
 =============================================================================
 
-Each sprite is a QUAD (rectangle) made of 4 vertices and 6 indices.
+Each sprite is ONE record, drawn as an instance of a 4-vertex triangle
+strip: the vertex shader works out which corner it is from gl_VertexID
+and places it from the sprite's rect, so the CPU never writes (or even
+keeps) per-corner data - there is no vertex buffer for the corners.
 
-Vertices (4 per sprite):
-    [0]---[1]     Indices define two triangles:
-     |   / |      Triangle 1: 0, 1, 2
-     |  /  |      Triangle 2: 0, 2, 3
-     | /   |
-    [3]---[2]
+    gl_VertexID:  0 = (0,0)---(1,0) = 1      corner = (id & 1, id >> 1)
+                      |    /  |
+                      |  /    |
+                  2 = (0,1)---(1,1) = 3
 
-Each vertex has 9 floats (36 bytes):
-    [x, y, u, v, r, g, b, a, depth]
-     ^^^^  ^^^^  ^^^^^^^^^^  ^^^^^
-     pos   tex   color       z-order
+The records are kept as a STRUCTURE OF ARRAYS - one array (and one
+region of the GPU buffer) per attribute, instead of interleaving them:
+
+    rects  [x, y, w, h]                   4 floats  16 bytes
+    uvs    [u_left, v_top, u_right, v_bottom]
+                                          4 uint16   8 bytes
+    colors [r, g, b, a]                   4 uint8    4 bytes
+    depths [depth]                        1 float    4 bytes
+    layers [layer]                        1 uint8    1 byte
+                                                    --------
+                                                    33 bytes per sprite
+
+versus 4 vertices × 36 bytes = 144 bytes when every corner carried its
+own copy of the color and depth. Each array is filled with whole-column
+stores, and a stream is uploaded as one contiguous block.
+
+Colors are stored as 0-255 bytes (GL_UNSIGNED_BYTE, normalized: the
+shader still sees 0.0-1.0). A tint never needs more than 8 bits per
+channel - the framebuffer doesn't have more - and it is 4 bytes instead
+of 16. add_sprite() and friends still take 0.0-1.0 floats (or ready
+uint8 rows, see add_quads).
+
+UVs are stored the same way as 0-65535 (GL_UNSIGNED_SHORT, normalized).
+One step is 1/65535 of the texture: 1/16 of a texel even on a 4096 pixel
+atlas page, so sampling lands on the same texels as with floats, at half
+the size. pack_uvs() converts ready-made UV rects once (see add_quads).
+
+=============================================================================
+TEXTURE ARRAYS
+=============================================================================
+
+A batch draws from ONE texture, so sprites from two tilesets (or two
+atlas pages) need a flush in between. begin() also accepts a
+TextureArray - many same-sized images as layers of one texture - and each
+sprite then names its layer (the `layer` argument of the add_* methods).
+Sprites from every layer join the same batch and the same draw call:
+
+    begin(tileset_a); add...; flush()        begin(array)
+    begin(tileset_b); add...; flush()   ->   add(layer=0)...; add(layer=1)...
+    begin(tileset_c); add...; flush()        flush()
+
+The layer is stored as one byte (GL_UNSIGNED_BYTE, not normalized: the
+shader sees 0.0-255.0), which covers the 256 layers every GL 3.3 driver
+supports. With a plain Texture it is ignored. The renderer picks the
+shader program matching the texture (see OpenGLRenderer.begin_sprites).
 
 =============================================================================
 """
@@ -59,8 +101,47 @@ Each vertex has 9 floats (36 bytes):
 import ctypes
 import numpy as np
 from OpenGL.GL import *
-from typing import Optional, Tuple
-from .texture import Texture
+from typing import Dict, Optional, Tuple, Union
+from .arena import ArrayArena
+from .gl_state import GLState
+from .texture import Texture, TextureArray
+from ._kernels import fill_sprites, write_sprite
+
+# One white tint row for fill_sprites (see add_sprites)
+_WHITE = np.full((1, 4), 255, dtype=np.uint8)
+
+# CPU-side sprite memory of non-persistent batches, shared by all of them:
+# a batch that grows, or is replaced by a new one, hands its old memory
+# to the next batch of that size instead of leaving it to the allocator
+_STAGING = ArrayArena(np.uint8)
+
+
+def _rgba8(color) -> np.ndarray:
+    """
+    0.0-1.0 RGBA (tuple or (N, 4) array) as 0-255 bytes; uint8 passes through.
+
+    Out-of-range channels are clamped, as GL clamps float colors, and
+    rounded half up like _kernels.write_sprite, so every add_* entry
+    point stores the same bytes for the same tint.
+    """
+    color = np.asarray(color)
+    if color.dtype == np.uint8:
+        return color
+    return np.floor(np.clip(color, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8)
+
+
+def pack_uvs(uvs) -> np.ndarray:
+    """
+    0.0-1.0 UV rects as the 0-65535 uint16 SpriteBatch stores.
+
+    add_quads() converts float UVs itself; callers that draw the same UV
+    rects every frame (glyph quads) can convert them once with this and
+    pass the uint16 array, which is then copied as it is.
+    """
+    uvs = np.asarray(uvs)
+    if uvs.dtype == np.uint16:
+        return uvs
+    return np.rint(np.clip(uvs, 0.0, 1.0) * 65535.0).astype(np.uint16)
 
 
 class SpriteBatch:
@@ -92,34 +173,46 @@ class SpriteBatch:
     1. FIXED MAXIMUM SIZE: Pre-allocate for max_sprites to avoid dynamic
        allocation during rendering. Memory is cheap, frame drops are not.
     
-    2. CPU-SIDE VERTEX BUFFER: We keep vertices in a numpy array and only
+    2. CPU-SIDE ARRAYS: We keep sprite records in numpy arrays and only
        upload to GPU on flush(). This is faster than many small GPU writes.
     
-    3. PRE-GENERATED INDICES: Index buffer never changes (always 0,1,2,0,2,3
-       pattern), so we generate it once at startup.
+    3. ONE RECORD PER SPRITE: The corners are built by the vertex shader
+       from gl_VertexID (see MEMORY LAYOUT).
     
     4. SINGLE TEXTURE PER BATCH: All sprites in a batch share one texture.
-       The renderer groups tiles by texture before calling us.
+       The renderer groups tiles by texture before calling us - or puts
+       the textures in one TextureArray (see TEXTURE ARRAYS).
     
     ==========================================================================
     """
     
     # =========================================================================
-    # CONSTANTS - Define the vertex format
+    # CONSTANTS - Define the sprite format
     # =========================================================================
     
-    # How many float values per vertex
-    # Layout: [x, y, u, v, r, g, b, a, depth] = 9 floats
-    FLOATS_PER_VERTEX = 9
+    # Per-sprite attribute streams, in buffer order:
+    # (array name, attribute location, components, numpy dtype,
+    #  GL type, normalized)
+    STREAMS = (
+        ("rects", 0, 4, np.float32, GL_FLOAT, GL_FALSE),    # x, y, w, h
+        ("uvs", 1, 4, np.uint16, GL_UNSIGNED_SHORT, GL_TRUE),   # u_left, v_top, u_right, v_bottom
+        ("colors", 2, 4, np.uint8, GL_UNSIGNED_BYTE, GL_TRUE),  # r, g, b, a (0-255 -> 0.0-1.0)
+        ("depths", 3, 1, np.float32, GL_FLOAT, GL_FALSE),   # z-order
+        ("layers", 4, 1, np.uint8, GL_UNSIGNED_BYTE, GL_FALSE),  # texture array layer
+    )
+    
+    # Segments of the persistently mapped sprite ring (see _setup_ring)
+    RING_SEGMENTS = 3
     
-    # Each sprite (quad) has 4 corners
-    VERTICES_PER_SPRITE = 4
+    # Packed UV rects kept by add_sprite, one per (width, height, border);
+    # cleared when it grows past this (tile maps use a handful of sizes).
+    # The same bound applies to its packed colors, one per tint tuple
+    UV_CACHE_SIZE = 256
     
-    # Each sprite needs 6 indices (2 triangles × 3 vertices each)
-    # But we reuse 2 vertices, so 4 vertices + 6 indices = efficient!
-    INDICES_PER_SPRITE = 6
+    # Largest batch auto_grow may reach (33 MB of sprite data)
+    MAX_SPRITES_CAP = 1 << 20
     
-    def __init__(self, max_sprites: int = 20000):
+    def __init__(self, max_sprites: int = 20000, auto_grow: bool = False):
         """
         Initialize the sprite batch.
         
@@ -130,105 +223,82 @@ class SpriteBatch:
             Default 20,000 is enough for most screens:
             - 1920x1080 / 16x16 tiles = ~8,000 tiles max visible
             - 20,000 gives comfortable headroom
-            
+        auto_grow : bool
+            If True, a full batch doubles its capacity (up to
+            MAX_SPRITES_CAP) instead of refusing sprites, see _grow().
+            Off by default: the caller flushes when add_* report a full
+            batch.
+        
         Memory usage:
-        - Vertex data: 20000 × 4 vertices × 9 floats × 4 bytes = 2.88 MB
-        - Index data:  20000 × 6 indices × 4 bytes = 0.48 MB
-        - Total: ~3.4 MB - very reasonable for modern systems
+        - Sprite data: 20000 × 33 bytes = 0.66 MB
         """
         self.max_sprites = max_sprites
         self.sprite_count = 0  # Current number of sprites in batch
+        self.auto_grow = auto_grow
         
-        # ---------------------------------------------------------------------
-        # PRE-ALLOCATE VERTEX ARRAY (CPU-side)
-        # ---------------------------------------------------------------------
-        # This numpy array holds all vertex data before upload to GPU.
-        # Pre-allocation avoids memory allocation during rendering.
-        # 
-        # Total floats = max_sprites × 4 vertices × 9 floats per vertex
-        self.vertices = np.zeros(
-            max_sprites * self.VERTICES_PER_SPRITE * self.FLOATS_PER_VERTEX,
-            dtype=np.float32  # OpenGL expects 32-bit floats
-        )
-        
-        # ---------------------------------------------------------------------
-        # PRE-GENERATE INDEX ARRAY
-        # ---------------------------------------------------------------------
-        # Indices never change - they always follow the same pattern.
-        # Generate once at startup, upload to GPU once, never touch again.
-        self.indices = self._create_indices(max_sprites)
+        # Bytes per sprite of each stream, and of all of them
+        self._row_bytes = {name: components * np.dtype(dtype).itemsize
+                           for name, _, components, dtype, _, _ in self.STREAMS}
+        self.sprite_bytes = sum(self._row_bytes.values())
         
         # Currently bound texture (set in begin())
-        self.current_texture: Optional[Texture] = None
+        self.current_texture: Optional[Union[Texture, TextureArray]] = None
+        # One color / depth for the whole batch, or None (set in begin())
+        self.shared_color: Optional[Tuple[float, float, float, float]] = None
+        self.shared_depth: Optional[float] = None
+        
+        # (width, height, border) -> packed UV rect (see add_sprite)
+        self._uv_cache: Dict[Tuple[float, float, int], Tuple[int, int, int, int]] = {}
+        # (r, g, b, a) -> the same as 0-255 bytes (see add_sprite)
+        self._color_cache: Dict[Tuple[float, ...], Tuple[int, int, int, int]] = {}
+        
+        # Tint of add_sprite calls that pass no color (see set_color)
+        self.set_color((1.0, 1.0, 1.0, 1.0))
         
         # Create OpenGL buffer objects
         self._setup_buffers()
 
-    def _create_indices(self, max_sprites: int) -> np.ndarray:
+    def _stream_offsets(self, segments: int) -> dict:
         """
-        Pre-generate index buffer for all possible sprites.
-        
-        =======================================================================
-        WHY INDEXED DRAWING?
-        =======================================================================
-        
-        A quad has 4 corners but needs 6 vertices to draw as triangles:
-        
-        Without indices (GL_TRIANGLES with 6 vertices):
-            Triangle 1: v0, v1, v2  (top-left, top-right, bottom-right)
-            Triangle 2: v3, v4, v5  (top-left, bottom-right, bottom-left)
-            
-            Notice v0==v3 and v2==v4 - we're duplicating data!
-            6 vertices × 9 floats = 54 floats per sprite
-        
-        With indices (4 vertices + 6 indices):
-            Vertices: v0, v1, v2, v3 (the 4 corners)
-            Indices: 0, 1, 2, 0, 2, 3 (which vertices to use)
-            
-            4 vertices × 9 floats + 6 indices = 36 floats + 6 ints per sprite
-            
-        SAVINGS: ~25% less data to upload per sprite!
-        
-        =======================================================================
-        INDEX PATTERN
-        =======================================================================
+        Byte offset of each stream in a buffer of `segments` batches.
         
-        For each sprite, vertices are arranged:
+        The buffer is stream-major - all the rects, then all the UVs, and
+        so on - so one stream of one batch is a single contiguous block:
         
-            0-------1      Indices for triangles:
-            |     / |      - Triangle 1: 0, 1, 2 (top-left, top-right, bottom-right)
-            |   /   |      - Triangle 2: 0, 2, 3 (top-left, bottom-right, bottom-left)
-            | /     |
-            3-------2
-        
-        For sprite N, vertex indices start at N*4:
-            Sprite 0: vertices 0,1,2,3  -> indices 0,1,2,0,2,3
-            Sprite 1: vertices 4,5,6,7  -> indices 4,5,6,4,6,7
-            Sprite 2: vertices 8,9,10,11 -> indices 8,9,10,8,10,11
-            ...
+            [ rects: seg 0 | seg 1 | ... ][ uvs: seg 0 | seg 1 | ... ] ...
+        """
+        offsets = {}
+        offset = 0
+        for name, _, _, _, _, _ in self.STREAMS:
+            offsets[name] = offset
+            offset += segments * self.max_sprites * self._row_bytes[name]
+        return offsets
+
+    def _bind_views(self, memory: np.ndarray, offsets: dict, segment: int):
+        """
+        Point self.rects, self.uvs, ... at one segment of a byte buffer.
         
         Parameters:
         -----------
-        max_sprites : int
-            Number of sprites to generate indices for
-            
-        Returns:
-        --------
-        numpy array of uint32 indices
+        memory : np.ndarray
+            uint8 array laid out as in _stream_offsets
+        offsets : dict
+            Stream offsets of that layout
+        segment : int
+            Which batch-sized segment of each stream to use
         """
-        indices = []
-        for i in range(max_sprites):
-            # Starting vertex index for this sprite
-            offset = i * 4
-            
-            # Two triangles forming the quad
-            indices.extend([
-                offset + 0, offset + 1, offset + 2,  # Triangle 1
-                offset + 0, offset + 2, offset + 3   # Triangle 2
-            ])
-        
-        # uint32 because we might have > 65535 vertices (uint16 max)
-        return np.array(indices, dtype=np.uint32)
+        for name, _, components, dtype, _, _ in self.STREAMS:
+            size = self.max_sprites * self._row_bytes[name]
+            start = offsets[name] + segment * size
+            view = memory[start:start + size].view(dtype)
+            if components > 1:
+                view = view.reshape(self.max_sprites, components)
+            setattr(self, name, view)
+        
+        # The same place for _kernels.write_sprite, which takes the whole
+        # buffer: rows per stream, and the segment's first row
+        self._stride = len(memory) // self.sprite_bytes
+        self._first_row = segment * self.max_sprites
 
     def _setup_buffers(self):
         """
@@ -241,137 +311,226 @@ class SpriteBatch:
         1. VAO (Vertex Array Object):
            - Stores the "format" of vertex data (what attributes, what types)
            - Bind VAO once, and all attribute setup is remembered
-           
-        2. VBO (Vertex Buffer Object):
-           - Stores actual vertex DATA on GPU
-           - GL_DYNAMIC_DRAW: We'll update this frequently (every frame)
-           
-        3. EBO (Element Buffer Object / Index Buffer):
-           - Stores indices that reference vertices
-           - GL_STATIC_DRAW: Generated once, never changes
+        
+        2. Sprite VBO: the per-sprite streams, rewritten every flush
+           (a persistent ring, or GL_DYNAMIC_DRAW)
         
         =======================================================================
         VERTEX ATTRIBUTE LAYOUT
         =======================================================================
         
-        Each vertex is 9 floats (36 bytes):
+        Attribute 0: rect (vec4)           - "rects" stream
+        Attribute 1: uv rect (vec4)        - "uvs" stream
+                                             (uint16, normalized)
+        Attribute 2: color (vec4)          - "colors" stream
+                                             (uint8, normalized)
+        Attribute 3: depth (float)         - "depths" stream
+        Attribute 4: layer (float)         - "layers" stream
+                                             (uint8, not normalized)
         
-        Offset (bytes):  0    8    16   20   24   28   32
-                         |    |    |    |    |    |    |
-        Data:           [x,y][u,v][r   ,g   ,b   ,a  ][depth]
-                        └──┘ └──┘ └────────────────┘  └────┘
-        Attribute:        0    1           2            3
-        Components:       2    2           4            1
-        
-        Stride = 36 bytes (distance between same attribute in consecutive vertices)
+        All have divisor 1: they advance once per INSTANCE (sprite) and
+        stay the same for its 4 vertices. No attribute is per vertex; the
+        corner comes from gl_VertexID. Each stream is tightly packed, so
+        its stride is just its own size.
         
         =======================================================================
         """
         # Generate OpenGL objects
-        self.vao = glGenVertexArrays(1)  # Vertex Array Object
-        self.vbo = glGenBuffers(1)        # Vertex Buffer Object
-        self.ebo = glGenBuffers(1)        # Element Buffer Object (indices)
-
+        self.vao = glGenVertexArrays(1)   # Vertex Array Object
+        self.vbo = glGenBuffers(1)        # Per-sprite streams
+        
         # ---------------------------------------------------------------------
         # CONFIGURE VAO (this "records" the following attribute setup)
         # ---------------------------------------------------------------------
-        glBindVertexArray(self.vao)
+        GLState.bind_vertex_array(self.vao)
         
         # ---------------------------------------------------------------------
-        # SETUP VBO (vertex data buffer)
+        # SPRITE STREAMS
         # ---------------------------------------------------------------------
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        GLState.bind_array_buffer(self.vbo)
+        
+        # Prefer a persistently mapped ring; otherwise allocate GPU memory
+        # for one batch but don't fill it yet (data=None), and keep the
+        # CPU-side arrays in a plain numpy buffer of the same layout
+        self.persistent = self._setup_ring()
+        if not self.persistent:
+            self._offsets = self._stream_offsets(1)
+            self._memory = _STAGING.acquire(self.max_sprites * self.sprite_bytes)
+            self._bind_views(self._memory, self._offsets, 0)
+            glBufferData(GL_ARRAY_BUFFER, self._memory.nbytes, None, GL_DYNAMIC_DRAW)
+            
+            # Where each stream starts in _memory, for flush(): as plain
+            # ints (memmove) and as ready c_void_p (glBufferSubData), so a
+            # flush builds no ctypes objects - _memory.ctypes alone makes
+            # a new helper object on every access
+            address = self._memory.ctypes.data
+            self._sources = [(name, address + self._offsets[name],
+                              ctypes.c_void_p(address + self._offsets[name]))
+                             for name, _, _, _, _, _ in self.STREAMS]
+        
+        for name, location, components, _, gl_type, normalized in self.STREAMS:
+            glEnableVertexAttribArray(location)
+            glVertexAttribPointer(
+                location,                            # Attribute index
+                components,                          # Number of components
+                gl_type,                             # Data type
+                normalized,                          # Normalize to 0-1?
+                self._row_bytes[name],               # Stride: tightly packed
+                ctypes.c_void_p(self._offsets[name]) # Start of the stream
+            )
+            glVertexAttribDivisor(location, 1)       # Once per sprite
+        
+        # Color and depth arrays are enabled (see _use_shared_values)
+        self._shared = (False, False)
         
-        # Allocate GPU memory but don't fill it yet (data=None)
-        # GL_DYNAMIC_DRAW tells the driver we'll update this frequently
-        glBufferData(GL_ARRAY_BUFFER, self.vertices.nbytes, None, GL_DYNAMIC_DRAW)
-
-        # Stride: bytes between consecutive vertices
-        # 9 floats × 4 bytes per float = 36 bytes
-        stride = self.FLOATS_PER_VERTEX * 4
+        # Unbind VAO to prevent accidental modification
+        GLState.bind_vertex_array(0)
 
-        # -----------------------------------------------------------------
-        # ATTRIBUTE 0: Position (vec2) - x, y
-        # -----------------------------------------------------------------
-        # Location: attribute 0 in vertex shader
-        # Size: 2 components (x, y)
-        # Offset: 0 bytes (starts at beginning)
-        glEnableVertexAttribArray(0)
-        glVertexAttribPointer(
-            0,                      # Attribute index
-            2,                      # Number of components (x, y)
-            GL_FLOAT,               # Data type
-            GL_FALSE,               # Don't normalize
-            stride,                 # Bytes to next vertex's position
-            ctypes.c_void_p(0)      # Offset from start of vertex
-        )
+    def _setup_ring(self) -> bool:
+        """
+        Create the sprite VBO as a persistently mapped ring, if the driver can.
         
-        # -----------------------------------------------------------------
-        # ATTRIBUTE 1: Texture Coordinates (vec2) - u, v
-        # -----------------------------------------------------------------
-        # Location: attribute 1 in vertex shader
-        # Size: 2 components (u, v)
-        # Offset: 8 bytes (after x, y = 2 floats × 4 bytes)
-        glEnableVertexAttribArray(1)
-        glVertexAttribPointer(
-            1,                      # Attribute index
-            2,                      # Number of components (u, v)
-            GL_FLOAT,               # Data type
-            GL_FALSE,               # Don't normalize
-            stride,                 # Bytes to next vertex's texcoord
-            ctypes.c_void_p(8)      # Offset: 2 floats × 4 bytes = 8
-        )
+        =======================================================================
+        WHY A PERSISTENT MAPPING?
+        =======================================================================
         
-        # -----------------------------------------------------------------
-        # ATTRIBUTE 2: Color (vec4) - r, g, b, a
-        # -----------------------------------------------------------------
-        # Location: attribute 2 in vertex shader
-        # Size: 4 components (r, g, b, a)
-        # Offset: 16 bytes (after x, y, u, v = 4 floats × 4 bytes)
-        glEnableVertexAttribArray(2)
-        glVertexAttribPointer(
-            2,                      # Attribute index
-            4,                      # Number of components (r, g, b, a)
-            GL_FLOAT,               # Data type
-            GL_FALSE,               # Don't normalize
-            stride,                 # Bytes to next vertex's color
-            ctypes.c_void_p(16)     # Offset: 4 floats × 4 bytes = 16
-        )
+        With glBufferSubData every flush hands the driver a pointer to our
+        numpy arrays, and the driver copies them (and may wait for the GPU
+        to stop using the buffer first).
         
-        # -----------------------------------------------------------------
-        # ATTRIBUTE 3: Depth (float) - z-order for layer sorting
-        # -----------------------------------------------------------------
-        # Location: attribute 3 in vertex shader
-        # Size: 1 component (depth)
-        # Offset: 32 bytes (after x, y, u, v, r, g, b, a = 8 floats × 4 bytes)
-        glEnableVertexAttribArray(3)
-        glVertexAttribPointer(
-            3,                      # Attribute index
-            1,                      # Number of components (depth)
-            GL_FLOAT,               # Data type
-            GL_FALSE,               # Don't normalize
-            stride,                 # Bytes to next vertex's depth
-            ctypes.c_void_p(32)     # Offset: 8 floats × 4 bytes = 32
-        )
+        With glBufferStorage + GL_MAP_PERSISTENT_BIT the buffer is mapped
+        into our address space ONCE and stays mapped. self.rects, self.uvs,
+        ... become numpy views of that memory, so add_sprite() writes
+        straight into GPU-visible memory and flush() has nothing left to
+        upload.
+        
+        =======================================================================
+        THE RING
+        =======================================================================
+        
+        The GPU may still be drawing the previous batch while we fill the
+        next one, so each stream holds RING_SEGMENTS full batches:
+        
+            [ segment 0 | segment 1 | segment 2 ]
+               drawing     drawing     filling
+        
+        Each flush draws its segment with glDrawArraysInstancedBaseInstance
+        (the attribute pointers stay the same, only the first instance
+        moves), drops a fence, and moves on. Before a segment is reused its
+        fence is waited on - normally it signalled long ago and the wait is
+        free.
+        
+        glBufferStorage is OpenGL 4.4 (or ARB_buffer_storage) and base
+        instances are 4.2. On a plain 3.3 driver they aren't loaded, and we
+        keep the upload-per-flush path.
+        
+        Returns:
+        --------
+        bool : True if the ring was created (VBO must be bound)
+        """
+        if not (bool(glBufferStorage) and bool(glDrawArraysInstancedBaseInstance)):
+            return False
+        
+        flags = GL_MAP_WRITE_BIT | GL_MAP_PERSISTENT_BIT | GL_MAP_COHERENT_BIT
+        total_bytes = self.max_sprites * self.sprite_bytes * self.RING_SEGMENTS
+        glBufferStorage(GL_ARRAY_BUFFER, total_bytes, None, flags)
+        ptr = glMapBufferRange(GL_ARRAY_BUFFER, 0, total_bytes, flags)
+        if not ptr:
+            # Storage is immutable - start over with a fresh buffer object
+            glDeleteBuffers(1, [self.vbo])
+            GLState.forget_array_buffer(self.vbo)
+            self.vbo = glGenBuffers(1)
+            GLState.bind_array_buffer(self.vbo)
+            return False
+        
+        self._offsets = self._stream_offsets(self.RING_SEGMENTS)
+        self._memory = np.ctypeslib.as_array(
+            ctypes.cast(ptr, ctypes.POINTER(ctypes.c_uint8)), shape=(total_bytes,))
+        self._ring_fences = [None] * self.RING_SEGMENTS
+        self._ring_segment = 0
+        self._use_segment(0)
+        return True
 
-        # ---------------------------------------------------------------------
-        # SETUP EBO (index buffer)
-        # ---------------------------------------------------------------------
-        # Bind to the VAO so it's remembered
-        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ebo)
+    def _use_segment(self, segment: int):
+        """Point the stream arrays at a ring segment, waiting until the GPU is done with it"""
+        fence = self._ring_fences[segment]
+        if fence is not None:
+            glClientWaitSync(fence, GL_SYNC_FLUSH_COMMANDS_BIT, 1_000_000_000)
+            glDeleteSync(fence)
+            self._ring_fences[segment] = None
+        
+        self._ring_segment = segment
+        self._bind_views(self._memory, self._offsets, segment)
+
+    def _grow(self, needed: int) -> bool:
+        """
+        Make room for `needed` sprites, keeping the ones already added.
         
-        # Upload index data - GL_STATIC_DRAW because indices never change
-        glBufferData(GL_ELEMENT_ARRAY_BUFFER, self.indices.nbytes, 
-                     self.indices, GL_STATIC_DRAW)
+        =======================================================================
+        WHY GROW?
+        =======================================================================
         
-        # Unbind VAO to prevent accidental modification
-        glBindVertexArray(0)
+        When more sprites are visible than max_sprites, a full batch has to
+        be flushed mid-frame: one extra draw call, every frame, for as long
+        as the view stays that busy. Growing instead (like XNA's
+        SpriteBatch) pays for ONE reallocation, and doubling keeps the
+        total cost of all reallocations proportional to the final size.
+        
+        The GL buffers can't be resized in place (a persistent ring's
+        storage is immutable), so they are released and created again at
+        the new size, and the sprites of the current batch copied over.
+        
+        Returns:
+        --------
+        bool : True if there is now room, False if auto_grow is off or the
+        cap is reached (the caller flushes as usual)
+        """
+        if not self.auto_grow or self.max_sprites >= self.MAX_SPRITES_CAP:
+            return False
+        
+        kept = {name: getattr(self, name)[:self.sprite_count].copy()
+                for name, _, _, _, _, _ in self.STREAMS}
+        self._release_buffers()
+        self.max_sprites = min(self.MAX_SPRITES_CAP,
+                               max(self.max_sprites * 2, needed))
+        self._setup_buffers()
+        for name, rows in kept.items():
+            getattr(self, name)[:len(rows)] = rows
+        return True
+
+    def _release_buffers(self):
+        """
+        Delete the VAO and sprite VBO (and the ring's fences), and return
+        the CPU-side memory of a non-persistent batch to _STAGING.
+        """
+        if self.persistent:
+            for fence in self._ring_fences:
+                if fence is not None:
+                    glDeleteSync(fence)
+            GLState.bind_array_buffer(self.vbo)
+            glUnmapBuffer(GL_ARRAY_BUFFER)
+        else:
+            _STAGING.release(self._memory)
+        glDeleteVertexArrays(1, [self.vao])
+        glDeleteBuffers(1, [self.vbo])
+        GLState.forget_vertex_array(self.vao)
+        GLState.forget_array_buffer(self.vbo)
+
+    def __del__(self):
+        """Release the buffers when the batch is garbage collected (see Texture.__del__)"""
+        if hasattr(self, 'vbo'):
+            try:
+                self._release_buffers()
+            except:
+                pass   # OpenGL context might already be destroyed
 
     # =========================================================================
     # BATCH OPERATIONS
     # =========================================================================
-
-    def begin(self, texture: Texture):
+    
+    def begin(self, texture: Union[Texture, TextureArray],
+              color: Optional[Tuple[float, float, float, float]] = None,
+              depth: Optional[float] = None):
         """
         Start a new batch with the given texture.
         
@@ -380,11 +539,30 @@ class SpriteBatch:
         
         Parameters:
         -----------
-        texture : Texture
+        texture : Texture or TextureArray
             The texture to use for all sprites in this batch.
             All sprites MUST share the same texture - this is the key
-            constraint that enables batching.
-            
+            constraint that enables batching. With a TextureArray each
+            sprite picks its layer (see TEXTURE ARRAYS).
+        color : Tuple[float, float, float, float] or None
+            RGBA tint (0.0-1.0) of EVERY sprite of the batch, or None to
+            use each sprite's own color.
+        depth : float or None
+            Depth of every sprite of the batch, or None for each sprite's
+            own depth.
+        
+        =======================================================================
+        SHARED COLOR / DEPTH
+        =======================================================================
+        
+        A layer of map tiles is usually all white and all at one depth.
+        Given here, that value replaces the color (or depth) stream for
+        the batch: flush() turns the attribute's array off and sets the
+        value OpenGL then feeds every instance (glVertexAttrib*), so the
+        stream is neither uploaded nor read by the GPU - 8 of the 33 bytes
+        per sprite for both. The shader is the same; the add_* methods
+        still fill the stream, which is simply ignored.
+        
         Note:
         -----
         If you need to draw sprites with different textures, you must:
@@ -399,14 +577,59 @@ class SpriteBatch:
         """
         self.sprite_count = 0  # Reset counter for new batch
         self.current_texture = texture
+        self.shared_color = color
+        self.shared_depth = depth
+
+    def _use_shared_values(self):
+        """
+        Feed attributes 2 (color) and 3 (depth) from their streams, or
+        from the values given to begin(). Needs the batch's VAO bound.
+        """
+        shared = (self.shared_color is not None, self.shared_depth is not None)
+        if shared != self._shared:
+            # Enabled arrays are VAO state: only switched when that changes
+            for location, on in zip((2, 3), shared):
+                if on:
+                    glDisableVertexAttribArray(location)
+                else:
+                    glEnableVertexAttribArray(location)
+            self._shared = shared
+        # What an attribute without an array reads (context state)
+        if shared[0]:
+            glVertexAttrib4f(2, *self.shared_color)
+        if shared[1]:
+            glVertexAttrib1f(3, self.shared_depth)
+
+    def set_color(self, color: Tuple[float, float, float, float]):
+        """
+        Set the tint add_sprite uses when it is given no color.
+        
+        Nearly all the sprites of a batch share one tint (usually white).
+        Set it once here and call add_sprite without `color`: the tint is
+        then already unpacked and converted, so add_sprite skips the
+        tuple unpacking and the color cache lookup on every call.
+        
+        Stays in effect, across batches, until set again. White (no
+        tinting) initially.
+        
+        Parameters:
+        -----------
+        color : Tuple[float, float, float, float]
+            RGBA color multiplier (0.0 to 1.0 range)
+        """
+        self._r, self._g, self._b, self._a = (float(c) for c in color)
+        # Clamped like any other tint (see _rgba8)
+        self._rgba = tuple(_rgba8(color).tolist())
 
     def add_sprite(
         self,
         x: float, y: float,
         width: float, height: float,
         depth: float = 0.0,
-        color: Tuple[float, float, float, float] = (1, 1, 1, 1),
-        border: int = 1
+        color: Optional[Tuple[float, float, float, float]] = None,
+        border: int = 1,
+        layer: int = 0,
+        uv_rect: Optional[Tuple[float, float, float, float]] = None
     ) -> bool:
         """
         Add a sprite to the current batch.
@@ -417,24 +640,37 @@ class SpriteBatch:
         
         x, y : float
             Top-left corner position in screen coordinates.
-            
+        
         width, height : float
             Size of the sprite in pixels.
-            
+        
         depth : float
-            Z-depth for layer ordering. Lower values = closer to camera.
+            Z-depth for layer ordering. Higher values = closer to camera.
             Used by depth buffer to automatically handle overlapping sprites.
-            
-        color : Tuple[float, float, float, float]
+        
+        color : Tuple[float, float, float, float] or None
             RGBA color multiplier (0.0 to 1.0 range).
-            Default (1,1,1,1) = white = no tinting.
+            (1,1,1,1) = white = no tinting.
             (1,0,0,1) = tint red, (0.5,0.5,0.5,1) = 50% darker, etc.
-            
+            None (default) = the batch tint from set_color(), white
+            unless set - the fastest choice for same-tinted sprites.
+        
         border : int
             Pixel border added around tile for bleeding prevention.
             Default 1 = 1 pixel border on each side.
             See UV coordinate section for details.
-            
+        
+        layer : int
+            Layer of a TextureArray to sample (0-255). Ignored with a
+            plain Texture.
+        
+        uv_rect : (u_left, v_top, u_right, v_bottom) or None
+            A precomputed region of the texture to show - an atlas cell
+            from AtlasBuilder.build(), or texture_uv() - instead of the
+            whole texture minus `border` (which is then ignored). Each
+            distinct rect is packed once and cached, so passing the same
+            tuple objects every frame costs a dict lookup, no math.
+        
         Returns:
         --------
         bool : True if sprite was added, False if batch is full.
@@ -463,22 +699,8 @@ class SpriteBatch:
             |B +------------+ B|
             |B B B B B B B B B |
             +------------------+
-            
-        UV range: u_min = 1/18, u_max = 17/18 (skipping border)
-        
-        =======================================================================
-        VERTEX LAYOUT
-        =======================================================================
         
-        We add 4 vertices per sprite (one per corner):
-        
-            v0 (x,y)-------v1 (x+w, y)
-               |               |
-               |               |
-               |               |
-            v3 (x, y+h)----v2 (x+w, y+h)
-        
-        Each vertex has: [x, y, u, v, r, g, b, a, depth]
+        UV range: u_min = 1/18, u_max = 17/18 (skipping border)
         
         =======================================================================
         UV COORDINATE FLIPPING
@@ -497,78 +719,354 @@ class SpriteBatch:
         =======================================================================
         """
         # Check if batch is full
-        if self.sprite_count >= self.max_sprites:
+        if (self.sprite_count >= self.max_sprites and
+                not self._grow(self.sprite_count + 1)):
             return False
-
+        
+        i = self.sprite_count
+        if write_sprite is not None and uv_rect is None:
+            # Compiled writer (_kernels.write_sprite): the UV math and the
+            # stores below in machine code, no Python floats or tuples.
+            # One buffer argument instead of five stream arrays: each
+            # array passed costs the call more than the stores themselves
+            if color is None:
+                write_sprite(self._memory, self._stride, self._first_row + i,
+                             x, y, width, height, border,
+                             self._r, self._g, self._b, self._a, depth, layer)
+            else:
+                r, g, b, a = color
+                write_sprite(self._memory, self._stride, self._first_row + i,
+                             x, y, width, height, border, r, g, b, a, depth, layer)
+            self.sprite_count += 1
+            return True
+        
         # -----------------------------------------------------------------
-        # CALCULATE UV COORDINATES (with border adjustment)
+        # UV COORDINATES (with border adjustment)
         # -----------------------------------------------------------------
+        # They only depend on the size: the thousands of same-sized tiles
+        # of a map share ONE cached, already packed UV rect. A given
+        # uv_rect is its own key (4 values, never equal to a 3-value
+        # size key) and only needs packing
+        key = (width, height, border) if uv_rect is None else uv_rect
+        uv = self._uv_cache.get(key)
+        if uv is None:
+            if uv_rect is None:
+                # Total texture size including border
+                total_width = width + border * 2
+                total_height = height + border * 2
+                
+                # UV coordinates that skip the border
+                # Map [border, border+width] to [0, total_width] normalized
+                u_min = border / total_width          # Left edge of content
+                v_min = border / total_height         # Top edge of content
+                u_max = (border + width) / total_width    # Right edge of content
+                v_max = (border + height) / total_height  # Bottom edge of content
+                
+                # IMPORTANT: v_max and v_min are SWAPPED!
+                # The top of the UV rect is v_max, the bottom v_min (flipped)
+                # This corrects for OpenGL's bottom-up texture orientation.
+                uv_rect = (u_min, v_max, u_max, v_min)
+            uv = tuple(int(c * 65535.0 + 0.5) for c in uv_rect)
+            if len(self._uv_cache) >= self.UV_CACHE_SIZE:
+                self._uv_cache.clear()
+            self._uv_cache[key] = uv
         
-        # Total texture size including border
-        total_width = width + border * 2
-        total_height = height + border * 2
-
-        # UV coordinates that skip the border
-        # Map [border, border+width] to [0, total_width] normalized
-        u_min = border / total_width          # Left edge of content
-        v_min = border / total_height         # Top edge of content
-        u_max = (border + width) / total_width    # Right edge of content
-        v_max = (border + height) / total_height  # Bottom edge of content
-
         # -----------------------------------------------------------------
-        # CALCULATE BUFFER INDEX
+        # WRITE THE SPRITE RECORD
         # -----------------------------------------------------------------
+        # Colors the same way: nearly every sprite uses one of a few tints
+        # (mostly the default white), so they are converted to 0-255 bytes
+        # once instead of building a new list of four ints per sprite.
+        # The batch tint (set_color) is converted already
+        if color is None:
+            rgba = self._rgba
+        else:
+            rgba = self._color_cache.get(color)
+            if rgba is None:
+                rgba = tuple(_rgba8(color).tolist())
+                if len(self._color_cache) >= self.UV_CACHE_SIZE:
+                    self._color_cache.clear()
+                self._color_cache[color] = rgba
+        
+        self.rects[i] = (x, y, width, height)
+        self.uvs[i] = uv
+        self.colors[i] = rgba
+        self.depths[i] = depth
+        self.layers[i] = layer
+        
+        self.sprite_count += 1
+        return True
+
+    def add_sprites(self, tiles: np.ndarray, border: int = 1, layer: int = 0) -> int:
+        """
+        Add many sprites at once from an array (vectorized add_sprite).
+        
+        =======================================================================
+        WHY A BULK VERSION?
+        =======================================================================
+        
+        Calling add_sprite() once per tile means one trip through the Python
+        interpreter per tile: tuple unpacking, UV math and the record writes.
+        With tens of thousands of tiles that dominates the frame.
+        
+        Here every column of the batch is written with ONE numpy slice
+        assignment over the stream arrays (see add_sprites_bulk), so the
+        cost no longer grows with Python overhead per tile.
         
-        # Where in the vertex array to write this sprite's data
-        # Each sprite = 4 vertices × 9 floats = 36 floats
-        idx = self.sprite_count * self.VERTICES_PER_SPRITE * self.FLOATS_PER_VERTEX
+        If Numba is installed, a compiled parallel kernel
+        (_kernels.fill_sprites) writes the records instead, in one pass
+        with no temporary arrays.
         
-        # Unpack color for faster access
-        r, g, b, a = color
+        The result is identical to calling add_sprite() for each row with
+        the default white color (same UV rects, same flipped V coordinates).
+        
+        Parameters:
+        -----------
+        tiles : np.ndarray
+            (N, 5) float32 array, one row per sprite: x, y, width, height,
+            depth - already in screen coordinates.
+        border : int
+            Pixel border around each tile texture (see add_sprite).
+        layer : int
+            TextureArray layer of every sprite (see add_sprite).
+        
+        Returns:
+        --------
+        int : How many sprites were added. If the batch fills up this is
+        less than N; the caller flushes and passes the remaining rows again.
+        """
+        if self.sprite_count + len(tiles) > self.max_sprites:
+            self._grow(self.sprite_count + len(tiles))
+        n = min(len(tiles), self.max_sprites - self.sprite_count)
+        if n <= 0:
+            return 0
+        
+        if fill_sprites is not None:
+            rows = slice(self.sprite_count, self.sprite_count + n)
+            fill_sprites(tiles[:n], np.float32(border), _WHITE, self.rects[rows],
+                         self.uvs[rows], self.colors[rows], self.depths[rows])
+            self.layers[rows] = layer
+            self.sprite_count += n
+            return n
+        
+        return self.add_sprites_bulk(*tiles[:n].T, border=border, layers=layer)
 
-        # -----------------------------------------------------------------
-        # WRITE VERTEX DATA
-        # -----------------------------------------------------------------
-        # 4 vertices × 9 floats each = 36 consecutive floats
-        #
-        # IMPORTANT: v_max and v_min are SWAPPED!
-        # Top vertices use v_max, bottom use v_min (flipped)
-        # This corrects for OpenGL's bottom-up texture orientation.
-        
-        # Vertex 0: Top-left corner
-        self.vertices[idx:idx+9] = [
-            x, y,                    # Position
-            u_min, v_max,            # Texture coords (note: v_max at TOP)
-            r, g, b, a,              # Color
-            depth                    # Depth for z-ordering
-        ]
-        
-        # Vertex 1: Top-right corner
-        self.vertices[idx+9:idx+18] = [
-            x + width, y,            # Position
-            u_max, v_max,            # Texture coords
-            r, g, b, a,              # Color
-            depth                    # Depth
-        ]
-        
-        # Vertex 2: Bottom-right corner
-        self.vertices[idx+18:idx+27] = [
-            x + width, y + height,   # Position
-            u_max, v_min,            # Texture coords (note: v_min at BOTTOM)
-            r, g, b, a,              # Color
-            depth                    # Depth
-        ]
-        
-        # Vertex 3: Bottom-left corner
-        self.vertices[idx+27:idx+36] = [
-            x, y + height,           # Position
-            u_min, v_min,            # Texture coords
-            r, g, b, a,              # Color
-            depth                    # Depth
-        ]
+    def add_sprites_bulk(self, xs: np.ndarray, ys: np.ndarray,
+                         ws: np.ndarray, hs: np.ndarray, depths: np.ndarray,
+                         colors: Optional[np.ndarray] = None,
+                         border: int = 1, layers=0) -> int:
+        """
+        Add many sprites from separate columns, with optional per-sprite tint.
+        
+        The column form of add_sprites(), for callers that keep their
+        sprites as one array per field (and the numpy path of add_sprites
+        itself). Every component is written with ONE slice assignment over
+        its stream array:
+        
+            rects[start:start+N, 0] = xs          <- a whole column of
+            rects[start:start+N, 1] = ys             sprites per store
+            ...
+        
+        With Numba, the columns are stacked and written by the same
+        compiled kernel as add_sprites() instead.
+        
+        Parameters:
+        -----------
+        xs, ys, ws, hs, depths : np.ndarray
+            (N,) arrays: top-left corner, size and depth of each sprite,
+            already in screen coordinates
+        colors : np.ndarray or None
+            (N, 4) RGBA tints (0.0-1.0, or 0-255 uint8), one per sprite;
+            None = white
+        border : int
+            Pixel border around each tile texture (see add_sprite)
+        layers : int or np.ndarray
+            TextureArray layer of every sprite, or an (N,) array of one
+            per sprite (see add_sprite)
+        
+        Returns:
+        --------
+        int : How many sprites were added (less than N if the batch is full;
+        the caller flushes and passes the remaining rows again)
+        """
+        if self.sprite_count + len(xs) > self.max_sprites:
+            self._grow(self.sprite_count + len(xs))
+        n = min(len(xs), self.max_sprites - self.sprite_count)
+        if n <= 0:
+            return 0
+        
+        rows = slice(self.sprite_count, self.sprite_count + n)
+        if fill_sprites is not None:
+            tiles = np.column_stack((xs[:n], ys[:n], ws[:n], hs[:n], depths[:n]))
+            tint = _WHITE if colors is None else np.ascontiguousarray(_rgba8(colors[:n]))
+            fill_sprites(tiles.astype(np.float32, copy=False), np.float32(border),
+                         tint, self.rects[rows],
+                         self.uvs[rows], self.colors[rows], self.depths[rows])
+            self.layers[rows] = layers if np.ndim(layers) == 0 else layers[:n]
+            self.sprite_count += n
+            return n
+        
+        x, y, w, h = xs[:n], ys[:n], ws[:n], hs[:n]
+        total_w = w + border * 2
+        total_h = h + border * 2
+        
+        rects = self.rects[rows]
+        rects[:, 0] = x
+        rects[:, 1] = y
+        rects[:, 2] = w
+        rects[:, 3] = h
+        uvs = self.uvs[rows]
+        uvs[:, 0] = pack_uvs(border / total_w)            # u_min
+        uvs[:, 1] = pack_uvs((border + h) / total_h)      # v_max (flipped V: top)
+        uvs[:, 2] = pack_uvs((border + w) / total_w)      # u_max
+        uvs[:, 3] = pack_uvs(border / total_h)            # v_min
+        if colors is None:
+            self.colors[rows] = 255             # White = no tint
+        else:
+            self.colors[rows] = _rgba8(colors[:n])
+        self.depths[rows] = depths[:n]
+        self.layers[rows] = layers if np.ndim(layers) == 0 else layers[:n]
+        
+        self.sprite_count += n
+        return n
 
-        self.sprite_count += 1
-        return True
+    def add_sprites_block(self, tiles: np.ndarray, border: int = 1, layer: int = 0):
+        """
+        Add any number of sprites from an array, flushing as the batch fills.
+        
+        add_sprites() stops when the batch is full and leaves the rest to
+        the caller. This does the bookkeeping itself: the rows are written
+        in blocks of whatever room is left (max_sprites - sprite_count),
+        with a flush() after each full block, so a caller with 50,000 tiles
+        makes ONE Python call instead of a begin/add/flush loop.
+        
+        Sprites still in the batch when this returns are drawn by the
+        caller's final flush(), as usual.
+        
+        Parameters:
+        -----------
+        tiles : np.ndarray
+            (K, 5) array of x, y, width, height, depth rows, already in
+            screen coordinates (converted to float32 if needed)
+        border : int
+            Pixel border around the texture (see add_sprite)
+        layer : int
+            TextureArray layer of every sprite (see add_sprite)
+        """
+        tiles = np.asarray(tiles, dtype=np.float32)
+        done = 0
+        while done < len(tiles):
+            done += self.add_sprites(tiles[done:], border, layer)
+            if done < len(tiles):
+                self.flush()   # Batch full - draw it, keep the texture
+
+    def add_sprites_culled(self, xs: np.ndarray, ys: np.ndarray,
+                           ws: np.ndarray, hs: np.ndarray, depths: np.ndarray,
+                           view_rect: Tuple[float, float, float, float],
+                           colors: Optional[np.ndarray] = None,
+                           border: int = 1, layers=0) -> int:
+        """
+        Add the sprites that overlap a view rectangle, skipping the rest.
+        
+        Testing each sprite against the view in Python costs a few
+        comparisons in the interpreter per sprite. Here the whole set is
+        tested with one vectorized mask, and only the visible rows are
+        passed on to add_sprites_bulk() - flushing as the batch fills, like
+        add_sprites_block().
+        
+            visible = (x + w >= vx) & (x <= vx + vw) &
+                      (y + h >= vy) & (y <= vy + vh)
+        
+        Parameters:
+        -----------
+        xs, ys, ws, hs, depths : np.ndarray
+            (N,) arrays: top-left corner, size and depth of each sprite,
+            in screen coordinates
+        view_rect : (x, y, width, height)
+            Visible area, in the same coordinates
+        colors : np.ndarray or None
+            (N, 4) RGBA tints, one per sprite (see add_sprites_bulk)
+        border : int
+            Pixel border around the texture (see add_sprite)
+        layers : int or np.ndarray
+            TextureArray layer(s), as in add_sprites_bulk
+        
+        Returns:
+        --------
+        int : How many sprites were visible (and added)
+        """
+        vx, vy, vw, vh = view_rect
+        visible = np.flatnonzero((xs + ws >= vx) & (xs <= vx + vw) &
+                                 (ys + hs >= vy) & (ys <= vy + vh))
+        xs, ys, ws, hs, depths = (xs[visible], ys[visible], ws[visible],
+                                  hs[visible], depths[visible])
+        if colors is not None:
+            colors = colors[visible]
+        if np.ndim(layers):
+            layers = layers[visible]
+        
+        done = 0
+        while done < len(visible):
+            done += self.add_sprites_bulk(
+                xs[done:], ys[done:], ws[done:], hs[done:], depths[done:],
+                None if colors is None else colors[done:], border,
+                layers if np.ndim(layers) == 0 else layers[done:])
+            if done < len(visible):
+                self.flush()   # Batch full - draw it, keep the texture
+        return len(visible)
+
+    def add_quads(self, rects: np.ndarray, uvs: np.ndarray,
+                  color=(1.0, 1.0, 1.0, 1.0), depth=0.0,
+                  layer=0) -> int:
+        """
+        Add many quads with explicit UV rectangles (vectorized).
+        
+        add_sprite()/add_sprites() always show a WHOLE texture (minus its
+        border). This is for quads showing PART of a texture - glyphs of a
+        font atlas, tiles of an atlas page. Gathered into arrays once per
+        frame, a whole layer of atlas tiles (each with its own cell, depth
+        and tint) goes in with this one call: every stream is written
+        with a single block copy, whatever N is.
+        
+        Parameters:
+        -----------
+        rects : np.ndarray
+            (N, 4) float32 array of x, y, width, height (screen coordinates)
+        uvs : np.ndarray
+            (N, 4) float32 array of u_left, v_top, u_right, v_bottom - the
+            region of the texture shown, in the texture's flipped V
+            convention (top of the image = high v, see atlas.UVRect).
+            uint16 arrays from pack_uvs() are copied without conversion.
+        color : tuple or np.ndarray
+            RGBA tint (0.0-1.0) for all quads, or an (N, 4) array. uint8
+            arrays (0-255) are stored as they are, without conversion.
+        depth : float or np.ndarray
+            Depth for all quads, or an (N,) array of one per quad
+        layer : int or np.ndarray
+            TextureArray layer of all quads, or an (N,) array (see
+            add_sprite)
+        
+        Returns:
+        --------
+        int : How many quads were added (less than N if the batch is full)
+        """
+        if self.sprite_count + len(rects) > self.max_sprites:
+            self._grow(self.sprite_count + len(rects))
+        n = min(len(rects), self.max_sprites - self.sprite_count)
+        if n <= 0:
+            return 0
+        
+        # The streams hold exactly these columns: plain block copies
+        rows = slice(self.sprite_count, self.sprite_count + n)
+        self.rects[rows] = rects[:n]
+        self.uvs[rows] = pack_uvs(uvs[:n])
+        color = _rgba8(color)
+        self.colors[rows] = color[:n] if color.ndim == 2 else color
+        self.depths[rows] = depth if np.ndim(depth) == 0 else depth[:n]
+        self.layers[rows] = layer if np.ndim(layer) == 0 else layer[:n]
+        
+        self.sprite_count += n
+        return n
 
     def flush(self):
         """
@@ -580,32 +1078,42 @@ class SpriteBatch:
         
         1. Skip if nothing to draw (early exit optimization)
         2. Bind the texture to texture unit 0
-        3. Upload vertex data from CPU (numpy array) to GPU (VBO)
+        3. Upload each stream's filled rows from CPU (numpy) to GPU (VBO)
         4. Bind VAO (which sets up all vertex attributes)
+           (streams replaced by a shared color/depth are skipped, see
+           begin)
         5. Issue ONE draw call for ALL sprites
         6. Reset sprite count (ready for next batch)
         
         =======================================================================
-        WHY glBufferSubData INSTEAD OF glBufferData?
+        UPLOADING WITHOUT WAITING (orphan and map)
         =======================================================================
         
-        - glBufferData: Allocates AND uploads data. Would reallocate every frame!
-        - glBufferSubData: Just uploads to existing allocation. Much faster!
+        The buffer was allocated once in _setup_buffers(); each flush only
+        replaces its contents. But the GPU may still be drawing the
+        PREVIOUS flush from it, and glBufferSubData into a buffer in use
+        can make the driver wait for that draw to finish.
         
-        We allocated the buffer once in _setup_buffers() with glBufferData,
-        now we just update its contents each frame with glBufferSubData.
+        Instead the buffer is mapped with GL_MAP_INVALIDATE_BUFFER_BIT
+        ("orphaning"): we promise to overwrite what we map, so the driver
+        hands back fresh memory while the pending draw keeps the old one.
+        GL_MAP_UNSYNCHRONIZED_BIT then skips the (now pointless) check for
+        pending draws. One memmove per stream fills it, glUnmapBuffer
+        hands it back.
+        
+        If mapping fails we fall back to glBufferSubData.
         
         =======================================================================
         DRAW CALL EXPLANATION
         =======================================================================
         
-        glDrawElements(GL_TRIANGLES, count, type, offset):
-        - GL_TRIANGLES: Every 3 indices form one triangle
-        - count: How many indices to use (6 per sprite × sprite_count)
-        - GL_UNSIGNED_INT: Index data type (32-bit unsigned integers)
-        - None: Start at index 0 (offset is null pointer)
+        glDrawArraysInstanced(GL_TRIANGLE_STRIP, 0, 4, count):
+        - GL_TRIANGLE_STRIP: the 4 corners form 2 triangles
+        - 0, 4: gl_VertexID runs 0-3 (no vertex buffer is read for it)
+        - count: how many instances = sprites; every attribute advances
+          once per instance
         
-        For 1000 sprites: ONE draw call renders 2000 triangles = 6000 indices
+        For 1000 sprites: ONE draw call renders 2000 triangles
         
         =======================================================================
         """
@@ -617,45 +1125,62 @@ class SpriteBatch:
         if self.current_texture:
             self.current_texture.bind(0)
         
+        if self.persistent:
+            # Sprites are already in the mapped segment - just draw it,
+            # fence it and move on to the next segment
+            GLState.bind_vertex_array(self.vao)
+            self._use_shared_values()
+            glDrawArraysInstancedBaseInstance(
+                GL_TRIANGLE_STRIP, 0, 4, self.sprite_count,
+                self._ring_segment * self.max_sprites)
+            self._ring_fences[self._ring_segment] = glFenceSync(
+                GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+            self._use_segment((self._ring_segment + 1) % self.RING_SEGMENTS)
+            self.sprite_count = 0
+            return
+        
         # ---------------------------------------------------------------------
-        # UPLOAD VERTEX DATA TO GPU
+        # UPLOAD SPRITE DATA TO GPU
         # ---------------------------------------------------------------------
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
-        
-        # Calculate how many bytes of data we actually need to upload
-        # Only upload what we've written, not the entire pre-allocated buffer
-        # This is a micro-optimization: less data transfer = faster
-        data_size = (self.sprite_count * 
-                    self.VERTICES_PER_SPRITE * 
-                    self.FLOATS_PER_VERTEX * 
-                    4)  # 4 bytes per float
-        
-        # Upload vertex data (only the portion we've filled)
-        # Slice the numpy array to only include active sprite data
-        active_data = self.vertices[:self.sprite_count * 
-                                     self.VERTICES_PER_SPRITE * 
-                                     self.FLOATS_PER_VERTEX]
-        glBufferSubData(GL_ARRAY_BUFFER, 0, data_size, active_data)
+        GLState.bind_array_buffer(self.vbo)
+        
+        # Only upload the rows we've written, not the whole pre-allocated
+        # streams: one block per stream, each at its offset in the buffer
+        ptr = glMapBufferRange(
+            GL_ARRAY_BUFFER, 0, self._memory.nbytes,
+            GL_MAP_WRITE_BIT | GL_MAP_INVALIDATE_BUFFER_BIT | GL_MAP_UNSYNCHRONIZED_BIT)
+        # Raw addresses, not numpy slices: PyOpenGL would otherwise go
+        # through the array interface (and its checks) for every stream.
+        # They were worked out once, in _setup_buffers
+        skipped = ('colors' if self.shared_color is not None else None,
+                   'depths' if self.shared_depth is not None else None)
+        for name, source, source_ptr in self._sources:
+            if name in skipped:
+                continue   # Replaced by one value (see begin)
+            offset = self._offsets[name]
+            size = self.sprite_count * self._row_bytes[name]
+            if ptr:
+                ctypes.memmove(ptr + offset, source, size)
+            else:
+                glBufferSubData(GL_ARRAY_BUFFER, offset, size, source_ptr)
+        if ptr:
+            glUnmapBuffer(GL_ARRAY_BUFFER)
         
         # ---------------------------------------------------------------------
         # DRAW!
         # ---------------------------------------------------------------------
         
         # Bind VAO (restores all vertex attribute configurations)
-        glBindVertexArray(self.vao)
+        # Skipped by GLState if it is still bound from the previous flush
+        GLState.bind_vertex_array(self.vao)
+        self._use_shared_values()
         
         # Issue the draw call
         # This ONE call renders all sprites in the batch!
-        glDrawElements(
-            GL_TRIANGLES,                              # Primitive type
-            self.sprite_count * self.INDICES_PER_SPRITE,  # Index count
-            GL_UNSIGNED_INT,                           # Index type
-            None                                       # Start at index 0
-        )
+        glDrawArraysInstanced(GL_TRIANGLE_STRIP, 0, 4, self.sprite_count)
         
-        # Unbind VAO (good practice)
-        glBindVertexArray(0)
+        # The VAO is left bound: the next flush most likely needs it again
         
         # Reset for next batch
-        # Note: We don't zero the vertex array - just overwrite next time
+        # Note: We don't zero the arrays - just overwrite next time
         self.sprite_count = 0
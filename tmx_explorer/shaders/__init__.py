@@ -2,14 +2,18 @@
 
 from .sources import (
     VERTEX_SHADER,
+    INSTANCED_VERTEX_SHADER,
     FRAGMENT_SHADER, 
+    ARRAY_FRAGMENT_SHADER,
     SIMPLE_VERTEX_SHADER,
     SIMPLE_FRAGMENT_SHADER,
 )
 
 __all__ = [
     "VERTEX_SHADER",
+    "INSTANCED_VERTEX_SHADER",
     "FRAGMENT_SHADER",
+    "ARRAY_FRAGMENT_SHADER",
     "SIMPLE_VERTEX_SHADER", 
     "SIMPLE_FRAGMENT_SHADER",
 ]
@@ -2,19 +2,48 @@
 Shader source code for OpenGL rendering
 """
 
+# Sprites (SpriteBatch): one record per sprite, drawn as an instance of a
+# 4-vertex triangle strip. The corner comes from gl_VertexID (0, 1, 2, 3 =
+# top-left, top-right, bottom-left, bottom-right), the per-sprite rect places
+# it and the UV rect (u_left, v_top, u_right, v_bottom) picks the texture
+# region. No per-vertex attributes at all. The layer only matters with a
+# texture array (ARRAY_FRAGMENT_SHADER); FRAGMENT_SHADER ignores it.
 VERTEX_SHADER = """
 #version 330 core
-layout (location = 0) in vec2 aPos;
-layout (location = 1) in vec2 aTexCoord;
+layout (location = 0) in vec4 aRect;
+layout (location = 1) in vec4 aUV;
 layout (location = 2) in vec4 aColor;
 layout (location = 3) in float aDepth;
+layout (location = 4) in float aLayer;
 out vec2 TexCoord;
 out vec4 Color;
+flat out float Layer;
 uniform mat4 projection;
 void main() {
-    gl_Position = projection * vec4(aPos, aDepth, 1.0);
-    TexCoord = aTexCoord;
+    vec2 corner = vec2(float(gl_VertexID & 1), float(gl_VertexID >> 1));
+    gl_Position = projection * vec4(aRect.xy + aRect.zw * corner, aDepth, 1.0);
+    TexCoord = mix(aUV.xy, aUV.zw, corner);
     Color = aColor;
+    Layer = aLayer;
+}
+"""
+
+# Instanced tiles: a unit quad (per vertex) scaled and moved by a per-instance
+# rect. The per-instance UV rect (u_left, v_top, u_right, v_bottom) selects the
+# tile inside its texture - the whole texture minus its border, or an atlas cell.
+INSTANCED_VERTEX_SHADER = """
+#version 330 core
+layout (location = 0) in vec2 aCorner;
+layout (location = 1) in vec4 aRect;
+layout (location = 2) in float aDepth;
+layout (location = 3) in vec4 aUV;
+out vec2 TexCoord;
+out vec4 Color;
+uniform mat4 projection;
+void main() {
+    gl_Position = projection * vec4(aRect.xy + aRect.zw * aCorner, aDepth, 1.0);
+    TexCoord = mix(aUV.xy, aUV.zw, aCorner);
+    Color = vec4(1.0);
 }
 """
 
@@ -31,6 +60,22 @@ void main() {
 }
 """
 
+# Same as FRAGMENT_SHADER, sampling one layer of a texture array
+# (TextureArray): sprites from several tilesets in one draw call.
+ARRAY_FRAGMENT_SHADER = """
+#version 330 core
+in vec2 TexCoord;
+in vec4 Color;
+flat in float Layer;
+out vec4 FragColor;
+uniform sampler2DArray texture0;
+void main() {
+    vec4 texColor = texture(texture0, vec3(TexCoord, Layer));
+    FragColor = texColor * Color;
+    if (FragColor.a < 0.01) discard;
+}
+"""
+
 SIMPLE_VERTEX_SHADER = """
 #version 330 core
 layout (location = 0) in vec2 aPos;
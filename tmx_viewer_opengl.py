@@ -16,6 +16,7 @@ from tmx_manager import TiledMap, TileLayer, ObjectGroup, LayerGroup
 from OpenGL.GL import *
 from OpenGL.GL.shaders import compileProgram, compileShader
 import ctypes
+import struct
 from collections import defaultdict
 
 # Colors
@@ -57,6 +58,31 @@ void main() {
 }
 """
 
+# Tiles without vertex attributes: each sprite is two RGBA32F texels in a
+# buffer texture, (x, y, w, h) and (depth, -, -, -), and the six vertices of
+# its quad are generated from gl_VertexID
+QUAD_VERTEX_SHADER = """
+#version 330 core
+out vec2 TexCoord;
+out vec4 Color;
+uniform mat4 projection;
+uniform samplerBuffer sprites;
+const vec2 corners[6] = vec2[6](
+    vec2(0.0, 0.0), vec2(1.0, 0.0), vec2(1.0, 1.0),
+    vec2(0.0, 0.0), vec2(1.0, 1.0), vec2(0.0, 1.0));
+void main() {
+    int sid = gl_VertexID / 6;
+    vec2 corner = corners[gl_VertexID % 6];
+    vec4 rect = texelFetch(sprites, sid * 2);
+    float depth = texelFetch(sprites, sid * 2 + 1).x;
+    gl_Position = projection * vec4(rect.xy + corner * rect.zw, depth, 1.0);
+    // Inset to the center of the texture, past its 1px border
+    vec2 border = 1.0 / (rect.zw + 2.0);
+    TexCoord = mix(border, 1.0 - border, corner);
+    Color = vec4(1.0);
+}
+"""
+
 SIMPLE_VERTEX_SHADER = """
 #version 330 core
 layout (location = 0) in vec2 aPos;
@@ -82,6 +108,18 @@ void main() { FragColor = Color; }
 # ============================================================================
 
 class Texture:
+    # Two pixel unpack buffers shared by every upload. Alternating between them
+    # lets the driver DMA one surface while the CPU prepares the next one.
+    _upload_pbos = None
+    _upload_index = 0
+
+    @classmethod
+    def _next_upload_pbo(cls):
+        if cls._upload_pbos is None:
+            cls._upload_pbos = glGenBuffers(2)
+        cls._upload_index ^= 1
+        return cls._upload_pbos[cls._upload_index]
+
     def __init__(self, surface):
         self.width = surface.get_width()
         self.height = surface.get_height()
@@ -98,8 +136,13 @@ class Texture:
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST_MIPMAP_NEAREST)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
 
+        # Stage the pixels in a PBO; glTexImage2D then sources from the bound
+        # buffer (offset 0) and returns without waiting for the copy
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, self._next_upload_pbo())
+        glBufferData(GL_PIXEL_UNPACK_BUFFER, len(texture_data), texture_data, GL_STREAM_DRAW)
         glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, self.width, self.height,
-                     0, GL_RGBA, GL_UNSIGNED_BYTE, texture_data)
+                     0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
 
         # Generate mipmaps for better quality at different zoom levels
         # Using NEAREST_MIPMAP_NEAREST prevents interpolation between tiles
@@ -124,6 +167,11 @@ class Texture:
 # ============================================================================
 
 class SpriteBatch:
+    # One sprite = 4 vertices x 9 floats, packed straight into the vertex buffer
+    # by a precompiled struct (a single C-level store instead of 4 numpy slices)
+    _pack_sprite = struct.Struct('36f').pack_into
+    SPRITE_BYTES = 4 * 9 * 4
+
     def __init__(self, max_sprites=20000):
         self.max_sprites = max_sprites
         self.sprite_count = 0
@@ -164,33 +212,37 @@ class SpriteBatch:
         self.sprite_count = 0
         self.current_texture = texture
 
-    def add_sprite(self, x, y, width, height, depth=0.0, color=(1, 1, 1, 1)):
+    def add_sprite(self, x, y, width, height, depth=0.0, color=(1, 1, 1, 1), uv=None):
         if self.sprite_count >= self.max_sprites:
             return False
 
-        # Account for 1px border in texture
-        # The actual tile content is in the center, surrounded by 1px border
-        border = 1.0
-        total_width = width + border * 2
-        total_height = height + border * 2
+        if uv is not None:
+            # Explicit (u_min, v_min, u_max, v_max), e.g. a region of an atlas
+            u_min, v_min, u_max, v_max = uv
+        else:
+            # Account for 1px border in texture
+            # The actual tile content is in the center, surrounded by 1px border
+            border = 1.0
+            total_width = width + border * 2
+            total_height = height + border * 2
+
+            # UV coordinates that map to the center of the bordered texture
+            u_min = border / total_width
+            v_min = border / total_height
+            u_max = (border + width) / total_width
+            v_max = (border + height) / total_height
 
-        # UV coordinates that map to the center of the bordered texture
-        u_min = border / total_width
-        v_min = border / total_height
-        u_max = (border + width) / total_width
-        v_max = (border + height) / total_height
-
-        idx = self.sprite_count * 4 * 9
         r, g, b, a = color
+        x2 = x + width
+        y2 = y + height
 
-        # Top-left
-        self.vertices[idx:idx+9] = [x, y, u_min, v_min, r, g, b, a, depth]
-        # Top-right
-        self.vertices[idx+9:idx+18] = [x + width, y, u_max, v_min, r, g, b, a, depth]
-        # Bottom-right
-        self.vertices[idx+18:idx+27] = [x + width, y + height, u_max, v_max, r, g, b, a, depth]
-        # Bottom-left
-        self.vertices[idx+27:idx+36] = [x, y + height, u_min, v_max, r, g, b, a, depth]
+        # Top-left, top-right, bottom-right, bottom-left
+        self._pack_sprite(
+            self.vertices, self.sprite_count * self.SPRITE_BYTES,
+            x, y, u_min, v_min, r, g, b, a, depth,
+            x2, y, u_max, v_min, r, g, b, a, depth,
+            x2, y2, u_max, v_max, r, g, b, a, depth,
+            x, y2, u_min, v_max, r, g, b, a, depth)
 
         self.sprite_count += 1
         return True
@@ -210,6 +262,183 @@ class SpriteBatch:
         self.sprite_count = 0
 
 
+# ============================================================================
+# QUAD BATCH (VERTEX-ID EXPANSION)
+# ============================================================================
+
+class QuadBatch:
+    """Tile batch that uploads one record per sprite instead of four vertices.
+    QUAD_VERTEX_SHADER expands every record to a quad; no index buffer needed."""
+
+    FLOATS_PER_SPRITE = 8  # Two RGBA32F texels: x, y, w, h | depth, unused x3
+
+    def __init__(self, max_sprites=20000):
+        self.max_sprites = max_sprites
+        self.sprite_count = 0
+        self.records = np.zeros((max_sprites, self.FLOATS_PER_SPRITE), dtype=np.float32)
+
+        # The core profile needs a VAO bound to draw, even with no attributes
+        self.vao = glGenVertexArrays(1)
+
+        self.buffer = glGenBuffers(1)
+        glBindBuffer(GL_TEXTURE_BUFFER, self.buffer)
+        glBufferData(GL_TEXTURE_BUFFER, self.records.nbytes, None, GL_STREAM_DRAW)
+        self.buffer_texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_BUFFER, self.buffer_texture)
+        glTexBuffer(GL_TEXTURE_BUFFER, GL_RGBA32F, self.buffer)
+        glBindTexture(GL_TEXTURE_BUFFER, 0)
+        glBindBuffer(GL_TEXTURE_BUFFER, 0)
+        self.current_texture = None
+
+    def begin(self, texture):
+        self.sprite_count = 0
+        self.current_texture = texture
+
+    def add_sprites(self, tiles):
+        """Add sprites from an (N, 5) float32 array of x, y, w, h, depth.
+        Returns how many fit; the caller flushes and passes the rest again."""
+        n = min(len(tiles), self.max_sprites - self.sprite_count)
+        if n <= 0:
+            return 0
+        # The first five floats of a record are exactly a tile row
+        self.records[self.sprite_count:self.sprite_count + n, 0:5] = tiles[:n]
+        self.sprite_count += n
+        return n
+
+    def flush(self):
+        if self.sprite_count == 0:
+            return
+        if self.current_texture:
+            self.current_texture.bind(0)
+        glActiveTexture(GL_TEXTURE1)
+        glBindTexture(GL_TEXTURE_BUFFER, self.buffer_texture)
+        glBindBuffer(GL_TEXTURE_BUFFER, self.buffer)
+        glBufferSubData(GL_TEXTURE_BUFFER, 0, self.sprite_count * self.FLOATS_PER_SPRITE * 4,
+                        self.records[:self.sprite_count])
+        glBindVertexArray(self.vao)
+        glDrawArrays(GL_TRIANGLES, 0, self.sprite_count * 6)
+        glBindVertexArray(0)
+        glActiveTexture(GL_TEXTURE0)
+        self.sprite_count = 0
+
+
+# ============================================================================
+# UI PANEL ATLAS
+# ============================================================================
+
+class PanelAtlas:
+    """One RGBA texture shared by every UI panel, packed in shelves.
+    Only the region of a panel whose content changed is re-uploaded."""
+
+    ROUND = 16  # Region sizes are rounded up so small text changes reuse them
+
+    def __init__(self, size=1024):
+        self.width = size
+        self.height = size
+        self.id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.id)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, size, size,
+                     0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+        # key -> [x, y, capacity_w, capacity_h, w, h, content_key]
+        self.regions = {}
+        # key -> RGBA bytes of the stored panel, to repack it (see _repack)
+        self._pixels = {}
+        self._reset()
+
+    def _reset(self):
+        self.regions.clear()
+        self._shelf_x = 0
+        self._shelf_y = 0
+        self._shelf_h = 0
+
+    def _allocate(self, w, h):
+        w = -(-w // self.ROUND) * self.ROUND
+        h = -(-h // self.ROUND) * self.ROUND
+        if self._shelf_x + w > self.width:
+            self._shelf_x = 0
+            self._shelf_y += self._shelf_h
+            self._shelf_h = 0
+        if w > self.width or self._shelf_y + h > self.height:
+            return None
+        region = [self._shelf_x, self._shelf_y, w, h, 0, 0, None]
+        self._shelf_x += w
+        self._shelf_h = max(self._shelf_h, h)
+        return region
+
+    def is_current(self, key, content_key):
+        region = self.regions.get(key)
+        return region is not None and region[6] == content_key
+
+    def update(self, key, content_key, surface):
+        """Store the panel surface under key, uploading only its rectangle"""
+        w, h = surface.get_size()
+        region = self.regions.get(key)
+        if region is None or w > region[2] or h > region[3]:
+            region = self._allocate(w, h)
+            if region is None:
+                # Full (regions outgrown by their panels are never reused):
+                # pack the live panels again from the start, then retry
+                self.regions.pop(key, None)
+                self._repack()
+                region = self._allocate(w, h)
+                if region is None:
+                    self._pixels.pop(key, None)
+                    return
+            self.regions[key] = region
+
+        region[4], region[5], region[6] = w, h, content_key
+        data = pygame.image.tostring(surface, "RGBA", False)
+        self._pixels[key] = data
+        self._upload(region, data)
+
+    def _repack(self):
+        """Move every stored panel to a fresh shelf layout, dropping the
+        space of abandoned regions. Panels already queued this frame keep
+        drawing; one that no longer fits is re-rendered when next drawn."""
+        live = list(self.regions.items())
+        self._reset()
+        for key, (_, _, _, _, w, h, content_key) in live:
+            region = self._allocate(w, h)
+            if region is None:
+                continue
+            region[4], region[5], region[6] = w, h, content_key
+            self.regions[key] = region
+            self._upload(region, self._pixels[key])
+        self._pixels = {key: self._pixels[key] for key in self.regions}
+
+    def _upload(self, region, data):
+        glBindTexture(GL_TEXTURE_2D, self.id)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, region[0], region[1], region[4], region[5],
+                        GL_RGBA, GL_UNSIGNED_BYTE, data)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def get(self, key):
+        """(w, h, (u_min, v_min, u_max, v_max)) of a stored panel, or None"""
+        region = self.regions.get(key)
+        if region is None:
+            return None
+        x, y, _, _, w, h, _ = region
+        return w, h, (x / self.width, y / self.height,
+                      (x + w) / self.width, (y + h) / self.height)
+
+    def bind(self, slot=0):
+        glActiveTexture(GL_TEXTURE0 + slot)
+        glBindTexture(GL_TEXTURE_2D, self.id)
+
+    def __del__(self):
+        if hasattr(self, 'id'):
+            try:
+                glDeleteTextures([self.id])
+            except:
+                pass
+
+
 # ============================================================================
 # OPENGL RENDERER (Optimized)
 # ============================================================================
@@ -217,9 +446,10 @@ class SpriteBatch:
 class OpenGLRenderer:
     """Ultra-optimized OpenGL renderer"""
 
-    def __init__(self, screen_width, screen_height):
+    def __init__(self, screen_width, screen_height, depth_test=True):
         self.screen_width = screen_width
         self.screen_height = screen_height
+        self.depth_test = depth_test
 
         pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MAJOR_VERSION, 3)
         pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MINOR_VERSION, 3)
@@ -237,20 +467,44 @@ class OpenGLRenderer:
         self.tex_loc = glGetUniformLocation(self.shader_program, "texture0")
         self.simple_proj_loc = glGetUniformLocation(self.simple_shader, "projection")
 
+        self.quad_shader = self._compile_quad_shaders()
+        self.quad_proj_loc = glGetUniformLocation(self.quad_shader, "projection")
+        # Samplers never change: tile texture on unit 0, sprite records on unit 1
+        glUseProgram(self.quad_shader)
+        glUniform1i(glGetUniformLocation(self.quad_shader, "texture0"), 0)
+        glUniform1i(glGetUniformLocation(self.quad_shader, "sprites"), 1)
+        glUseProgram(0)
+        # Now that the samplers sit on different units the program can validate
+        self.quad_shader.check_validate()
+
         self.batch = SpriteBatch(max_sprites=20000)
+        self.quad_batch = QuadBatch(max_sprites=20000)
         self._setup_simple_vao()
 
+        # Estado GL cacheado: programa activo, versión de proyección subida
+        # a cada programa y unidad de textura del sampler
+        self._cur_program = 0
+        self._proj_id = 0
+        self._last_proj_id = {}
+        self._last_tex_unit = None
+
         self.projection = np.eye(4, dtype=np.float32)
         self.update_projection()
 
         self.camera_x = 0
         self.camera_y = 0
         self.camera_zoom = 1.0
+        # Camera as a reusable float32 vector for the vectorized tile transform
+        self._cam_vec = np.zeros(2, dtype=np.float32)
+        self._zoom = np.float32(1.0)
+
+        # (r, g, b) de 0-255 -> normalizado, para draw_lines
+        self._color_cache = {}
 
         glEnable(GL_BLEND)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        glEnable(GL_DEPTH_TEST)
         glDepthFunc(GL_LESS)
+        self.set_depth_test(depth_test)
         glDisable(GL_CULL_FACE)
 
         self.font = pygame.font.Font(None, 18)
@@ -258,9 +512,9 @@ class OpenGLRenderer:
         # Cache de texturas
         self.texture_cache = {}
 
-        # Texturas de UI
-        self.ui_panel_texture = None
-        self.ui_panel_cache_key = ""
+        # Paneles de UI: un atlas compartido y la cola de paneles del frame
+        self.ui_atlas = PanelAtlas()
+        self._ui_queue = []
 
         print(f"OpenGL Renderer: {glGetString(GL_VERSION).decode()}")
 
@@ -269,21 +523,40 @@ class OpenGLRenderer:
         f = compileShader(FRAGMENT_SHADER, GL_FRAGMENT_SHADER)
         return compileProgram(v, f)
 
+    def _compile_quad_shaders(self):
+        v = compileShader(QUAD_VERTEX_SHADER, GL_VERTEX_SHADER)
+        f = compileShader(FRAGMENT_SHADER, GL_FRAGMENT_SHADER)
+        # Both samplers default to unit 0 until __init__ assigns them, and a
+        # sampler2D and a samplerBuffer on the same unit fail validation
+        return compileProgram(v, f, validate=False)
+
     def _compile_simple_shaders(self):
         v = compileShader(SIMPLE_VERTEX_SHADER, GL_VERTEX_SHADER)
         f = compileShader(SIMPLE_FRAGMENT_SHADER, GL_FRAGMENT_SHADER)
         return compileProgram(v, f)
 
+    # Simple vertex layout: [x, y | r, g, b, a], offsets derived from the
+    # component counts so the stride and color offset can't drift apart
+    SIMPLE_POS_COMPONENTS = 2
+    SIMPLE_COLOR_COMPONENTS = 4
+    SIMPLE_FLOATS_PER_VERTEX = SIMPLE_POS_COMPONENTS + SIMPLE_COLOR_COMPONENTS
+
     def _setup_simple_vao(self):
+        float_size = ctypes.sizeof(ctypes.c_float)
+        stride = self.SIMPLE_FLOATS_PER_VERTEX * float_size
+        color_offset = self.SIMPLE_POS_COMPONENTS * float_size
+
         self.simple_vao = glGenVertexArrays(1)
         self.simple_vbo = glGenBuffers(1)
         glBindVertexArray(self.simple_vao)
         glBindBuffer(GL_ARRAY_BUFFER, self.simple_vbo)
         glBufferData(GL_ARRAY_BUFFER, 10 * 1024 * 1024, None, GL_DYNAMIC_DRAW)
         glEnableVertexAttribArray(0)
-        glVertexAttribPointer(0, 2, GL_FLOAT, GL_FALSE, 6 * 4, ctypes.c_void_p(0))
+        glVertexAttribPointer(0, self.SIMPLE_POS_COMPONENTS, GL_FLOAT, GL_FALSE,
+                              stride, ctypes.c_void_p(0))
         glEnableVertexAttribArray(1)
-        glVertexAttribPointer(1, 4, GL_FLOAT, GL_FALSE, 6 * 4, ctypes.c_void_p(8))
+        glVertexAttribPointer(1, self.SIMPLE_COLOR_COMPONENTS, GL_FLOAT, GL_FALSE,
+                              stride, ctypes.c_void_p(color_offset))
         glBindVertexArray(0)
 
     def _ortho_matrix(self, left, right, bottom, top, near, far):
@@ -300,6 +573,22 @@ class OpenGLRenderer:
     def update_projection(self):
         # Proyección ortográfica con rango Z amplio para depth buffer
         self.projection = self._ortho_matrix(0, self.screen_width, self.screen_height, 0, -10000, 10000)
+        self._proj_id += 1
+
+    def _use_program(self, program, proj_loc):
+        """Bind program and upload projection only when they changed"""
+        if self._cur_program != program:
+            glUseProgram(program)
+            self._cur_program = program
+        if self._last_proj_id.get(program) != self._proj_id:
+            glUniformMatrix4fv(proj_loc, 1, GL_FALSE, self.projection.T)
+            self._last_proj_id[program] = self._proj_id
+
+    def _use_sprite_program(self):
+        self._use_program(self.shader_program, self.proj_loc)
+        if self._last_tex_unit != 0:
+            glUniform1i(self.tex_loc, 0)
+            self._last_tex_unit = 0
 
     def get_or_create_texture(self, surface):
         """Get texture from cache or create new one"""
@@ -314,64 +603,101 @@ class OpenGLRenderer:
             self.texture_cache[gid] = Texture(surface)
         return self.texture_cache[gid]
 
+    def set_depth_test(self, enabled):
+        """Z-buffer on, or off with tiles sorted by depth on the CPU"""
+        self.depth_test = enabled
+        if enabled:
+            glEnable(GL_DEPTH_TEST)
+        else:
+            # Sin Z-buffer: los tiles se ordenan por profundidad en CPU
+            glDisable(GL_DEPTH_TEST)
+
     def set_camera(self, x, y, zoom):
         self.camera_x = x
         self.camera_y = y
         self.camera_zoom = zoom
+        self._cam_vec[0] = x
+        self._cam_vec[1] = y
+        self._zoom = np.float32(zoom)
 
     def begin_frame(self):
         glClearColor(0.0, 0.0, 0.0, 1.0)
-        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        if self.depth_test:
+            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        else:
+            glClear(GL_COLOR_BUFFER_BIT)
 
     def end_frame(self):
+        self.flush_ui_panels()
         pygame.display.flip()
 
     def draw_sprite_immediate(self, texture, x, y, w, h):
         """Draw sprite immediately (for UI elements)"""
-        glUseProgram(self.shader_program)
-        glUniformMatrix4fv(self.proj_loc, 1, GL_FALSE, self.projection.T)
-        glUniform1i(self.tex_loc, 0)
+        self._use_sprite_program()
 
         self.batch.begin(texture)
         self.batch.add_sprite(x, y, w, h)
         self.batch.flush()
 
-        glUseProgram(0)
-
     def draw_batched_tiles(self, tile_batches):
         """Draw all tiles grouped by texture with depth"""
-        glUseProgram(self.shader_program)
-        glUniformMatrix4fv(self.proj_loc, 1, GL_FALSE, self.projection.T)
-        glUniform1i(self.tex_loc, 0)
+        if not any(tile_batches.values()):
+            return
+
+        if not self.depth_test:
+            self._use_sprite_program()
+            self._draw_tiles_back_to_front(tile_batches)
+            return
+
+        self._use_program(self.quad_shader, self.quad_proj_loc)
+        batch = self.quad_batch
+        cam, zoom = self._cam_vec, self._zoom
 
         for texture, tiles in tile_batches.items():
             if not tiles:
                 continue
 
-            self.batch.begin(texture)
-            for x, y, w, h, depth in tiles:
-                # Apply camera transform
-                screen_x = (x - self.camera_x) * self.camera_zoom
-                screen_y = (y - self.camera_y) * self.camera_zoom
-                screen_w = w * self.camera_zoom
-                screen_h = h * self.camera_zoom
-
-                self.batch.add_sprite(screen_x, screen_y, screen_w, screen_h, depth)
-
-                if self.batch.sprite_count >= self.batch.max_sprites - 1:
-                    self.batch.flush()
-                    self.batch.begin(texture)
-
-            self.batch.flush()
-
-        glUseProgram(0)
+            # Camera transform for the whole batch: (xy - cam) * zoom, wh * zoom
+            arr = np.array(tiles, dtype=np.float32)
+            arr[:, 0:2] -= cam
+            arr[:, 0:4] *= zoom
+
+            batch.begin(texture)
+            done = 0
+            while done < len(arr):
+                done += batch.add_sprites(arr[done:])
+                batch.flush()
+
+    def _draw_tiles_back_to_front(self, tile_batches):
+        """Painter's algorithm: all tiles sorted by depth, one batch per texture run"""
+        ordered = sorted(
+            ((tile, texture) for texture, tiles in tile_batches.items() for tile in tiles),
+            key=lambda item: item[0][4])
+
+        batch = self.batch
+        add_sprite = batch.add_sprite
+        cam_x, cam_y, zoom = self.camera_x, self.camera_y, self.camera_zoom
+        flush_at = batch.max_sprites - 1
+        current = None
+
+        for (x, y, w, h, depth), texture in ordered:
+            if texture is not current or batch.sprite_count >= flush_at:
+                batch.flush()
+                batch.begin(texture)
+                current = texture
+            add_sprite((x - cam_x) * zoom, (y - cam_y) * zoom, w * zoom, h * zoom, depth)
+
+        batch.flush()
 
     def draw_lines(self, lines, color):
         """Draw multiple lines in one call"""
         if not lines:
             return
 
-        r, g, b = color[0]/255.0, color[1]/255.0, color[2]/255.0
+        rgb = self._color_cache.get(color)
+        if rgb is None:
+            rgb = self._color_cache[color] = (color[0]/255.0, color[1]/255.0, color[2]/255.0)
+        r, g, b = rgb
         vertices = []
         for x1, y1, x2, y2 in lines:
             vertices.extend([x1, y1, r, g, b, 1.0])
@@ -379,21 +705,20 @@ class OpenGLRenderer:
 
         vertices = np.array(vertices, dtype=np.float32)
 
-        glUseProgram(self.simple_shader)
-        glUniformMatrix4fv(self.simple_proj_loc, 1, GL_FALSE, self.projection.T)
+        self._use_program(self.simple_shader, self.simple_proj_loc)
         glBindBuffer(GL_ARRAY_BUFFER, self.simple_vbo)
         glBufferSubData(GL_ARRAY_BUFFER, 0, vertices.nbytes, vertices)
         glBindVertexArray(self.simple_vao)
         glDrawArrays(GL_LINES, 0, len(lines) * 2)
         glBindVertexArray(0)
-        glUseProgram(0)
 
-    def draw_ui_panel(self, text_lines, x, y):
-        """Draw UI panel with cached texture"""
+    def draw_ui_panel(self, text_lines, x, y, panel_id=None):
+        """Queue a UI panel; its texture lives in the shared panel atlas"""
+        key = panel_id if panel_id is not None else (x, y)
         cache_key = "|".join(text_lines)
 
-        # Only recreate texture if text changed
-        if cache_key != self.ui_panel_cache_key:
+        # Only re-render (and re-upload the panel's region) if text changed
+        if not self.ui_atlas.is_current(key, cache_key):
             texts = []
             for text in text_lines:
                 surf = self.font.render(text, True, WHITE)
@@ -412,17 +737,24 @@ class OpenGLRenderer:
                 panel_surface.blit(surf, (8, y_offset))
                 y_offset += surf.get_height() + 2
 
-            # Delete old texture
-            if self.ui_panel_texture:
-                del self.ui_panel_texture
+            self.ui_atlas.update(key, cache_key, panel_surface)
+
+        self._ui_queue.append((key, x, y))
 
-            self.ui_panel_texture = Texture(panel_surface)
-            self.ui_panel_cache_key = cache_key
+    def flush_ui_panels(self):
+        """Draw every queued panel with a single texture bind and draw call"""
+        if not self._ui_queue:
+            return
 
-        # Draw cached panel
-        self.draw_sprite_immediate(self.ui_panel_texture, x, y,
-                                   self.ui_panel_texture.width,
-                                   self.ui_panel_texture.height)
+        self._use_sprite_program()
+        self.batch.begin(self.ui_atlas)
+        for key, x, y in self._ui_queue:
+            panel = self.ui_atlas.get(key)
+            if panel is not None:
+                w, h, uv = panel
+                self.batch.add_sprite(x, y, w, h, uv=uv)
+        self.batch.flush()
+        self._ui_queue.clear()
 
     def resize(self, width, height):
         """Resize suave sin golpes"""
@@ -510,6 +842,9 @@ class TilesetRenderer:
                         except pygame.error as e:
                             print(f"  Warning: {e}")
 
+        # Kick off all queued PBO transfers in one go
+        glFlush()
+
     def _preload_tileset_tiles(self, tileset, tileset_surface):
         """Pre-load and cache ALL tiles from a tileset with 1px border to prevent bleeding"""
         if tileset.columns <= 0:
@@ -800,6 +1135,9 @@ class TMXExplorer:
                 elif event.key == pygame.K_p:
                     self.show_profiling = not self.show_profiling
                     print(f"Profiling: {'ON' if self.show_profiling else 'OFF'}")
+                elif event.key == pygame.K_z:
+                    self.renderer.set_depth_test(not self.renderer.depth_test)
+                    print(f"Z-Buffer: {'ON' if self.renderer.depth_test else 'OFF (CPU sort)'}")
                 elif event.key == pygame.K_PAGEUP:
                     old_z = self.current_z
                     self.current_z = min(self.current_z + 1, self.map_3d.H - 1)
@@ -942,7 +1280,7 @@ class TMXExplorer:
                 f"Zoom: {self.camera.zoom:.2f}x | FPS: {int(self.clock.get_fps())}",
                 f"Height: {self.current_z}/{self.map_3d.H-1} (level={level_value})",
                 f"Textures: {len(self.renderer.texture_cache)}",
-                f"Z-Buffer: ON | Depth = offset + y + z + n*0.1",
+                f"Z-Buffer: {'ON' if self.renderer.depth_test else 'OFF (CPU sort)'} | Depth = offset + y + z + n*0.1",
             ]
 
             if self.show_profiling:
@@ -951,10 +1289,12 @@ class TMXExplorer:
                         avg = sum(self.frame_times[key][-60:]) / min(60, len(self.frame_times[key]))
                         info_lines.append(f"{key}: {avg*1000:.1f}ms")
 
-            self.renderer.draw_ui_panel(info_lines, 10, 10)
+            self.renderer.draw_ui_panel(info_lines, 10, 10, panel_id='info')
+
+        help_lines = ["Mouse: Drag | Wheel: Zoom | PgUp/PgDn: Height | G: Grid | I: Info | P: Profile | Z: Z-Buffer | ESC: Quit"]
+        self.renderer.draw_ui_panel(help_lines, 10, self.screen_height - 35, panel_id='help')
 
-        help_lines = ["Mouse: Drag | Wheel: Zoom | PgUp/PgDn: Height | G: Grid | I: Info | P: Profile | ESC: Quit"]
-        self.renderer.draw_ui_panel(help_lines, 10, self.screen_height - 35)
+        self.renderer.flush_ui_panels()
 
     def draw(self):
         import time